@@ -0,0 +1,179 @@
+"""乘客到达轨迹：一次生成、存盘，之后在任意仿真器中确定性地回放
+
+文件格式（小端、按列存储）：
+
+    偏移 0   : 头部 32 字节 = 魔数 b"ELVTRACE" | 版本 u32 | 标志 u32 | 条数 u64 | 保留 8 字节
+    偏移 32  : time        float64 × n   到达时刻，单位由使用方约定（引擎为 ticks，pygame 版为秒）
+    其后     : origin      int32   × n   起始楼层
+    其后     : destination int32   × n   目标楼层
+    其后     : group_size  uint16  × n   同行人数（仅当标志含 FLAG_GROUP_SIZE 时存在）
+
+楼层编号沿用目标仿真器自己的约定：引擎为楼层下标（0 为顶层），elevator_simulation2 为楼层号 1..n，
+elevator13-4 为楼层号且地下层为负数、没有 0 层（-2, -1, 1, 2, ...），三者各有对应的 record_*_trace()。
+load_trace() 用 np.memmap 映射各列，百万级轨迹也无需先解析成 Python 对象：
+
+    record_engine_trace("day.trace", engine.n_floors, 1440, start_time=engine.time + 1, seed=1)
+    trace = load_trace("day.trace")
+    engine.load_arrivals(trace.as_arrivals(), trace.group_sizes)
+"""
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from arrivals import ArrivalGenerator, Arrivals
+
+MAGIC = b"ELVTRACE"
+VERSION = 1
+FLAG_GROUP_SIZE = 1
+_HEADER = struct.Struct("<8sIIQ8x")
+
+TIME_DTYPE = np.dtype("<f8")
+FLOOR_DTYPE = np.dtype("<i4")
+GROUP_DTYPE = np.dtype("<u2")
+
+
+class ArrivalTrace:
+    def __init__(self, times, origins, destinations, group_sizes=None):
+        self.times = times
+        self.origins = origins
+        self.destinations = destinations
+        self.group_sizes = group_sizes
+
+    def __len__(self):
+        return len(self.times)
+
+    def window(self, start, end) -> Tuple[int, int]:
+        """返回到达时刻落在 [start, end) 内的记录下标范围"""
+        return (int(np.searchsorted(self.times, start, side="left")),
+                int(np.searchsorted(self.times, end, side="left")))
+
+    def as_arrivals(self) -> Arrivals:
+        """以 (ticks, origins, destinations) 形式交给 ElevatorEngine.load_arrivals()"""
+        return Arrivals(self.times, self.origins, self.destinations)
+
+
+def save_trace(path, times, origins, destinations, group_sizes=None):
+    """按到达时刻（稳定）排序后写入轨迹文件"""
+    times = np.asarray(times, dtype=TIME_DTYPE)
+    origins = np.asarray(origins, dtype=FLOOR_DTYPE)
+    destinations = np.asarray(destinations, dtype=FLOOR_DTYPE)
+    n = len(times)
+    if len(origins) != n or len(destinations) != n:
+        raise ValueError("各列长度不一致")
+    if group_sizes is not None:
+        group_sizes = np.asarray(group_sizes, dtype=GROUP_DTYPE)
+        if len(group_sizes) != n:
+            raise ValueError("各列长度不一致")
+    if n and np.any(np.diff(times) < 0):
+        order = np.argsort(times, kind="stable")
+        times, origins, destinations = times[order], origins[order], destinations[order]
+        if group_sizes is not None:
+            group_sizes = group_sizes[order]
+
+    flags = FLAG_GROUP_SIZE if group_sizes is not None else 0
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, flags, n))
+        for column in (times, origins, destinations, group_sizes):
+            if column is not None:
+                f.write(column.tobytes())
+
+
+def load_trace(path) -> ArrivalTrace:
+    """以内存映射方式打开轨迹文件，各列为只读的 np.memmap"""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} 不是到达轨迹文件")
+    magic, version, flags, n = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} 不是到达轨迹文件")
+    if version != VERSION:
+        raise ValueError(f"不支持的轨迹版本: {version}")
+
+    dtypes = [TIME_DTYPE, FLOOR_DTYPE, FLOOR_DTYPE]
+    if flags & FLAG_GROUP_SIZE:
+        dtypes.append(GROUP_DTYPE)
+    columns = []
+    offset = _HEADER.size
+    for dtype in dtypes:
+        if n:
+            columns.append(np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,)))
+        else:
+            columns.append(np.empty(0, dtype=dtype))
+        offset += dtype.itemsize * n
+    if len(columns) == 3:
+        columns.append(None)
+    return ArrivalTrace(*columns)
+
+
+def record_engine_trace(path, n_floors: int, n_ticks: int,
+                        peak_periods: Optional[Dict[str, Tuple[int, int]]] = None,
+                        start_time: int = 0, seed=None) -> int:
+    """按 ElevatorEngine 的高峰/平峰模型生成 n_ticks 个时间单位的到达并存盘，返回条数"""
+    arrivals = ArrivalGenerator(n_floors, peak_periods, seed=seed).generate(n_ticks, start_time)
+    save_trace(path, arrivals.ticks, arrivals.origins, arrivals.destinations)
+    return len(arrivals)
+
+
+def record_building_trace(path, total_floors: int, duration: float, arrival_rate: float = 0.1,
+                          seed=None) -> int:
+    """按 elevator_simulation2.Building 的模型（泊松到达、楼层 1..total_floors 均匀）生成并存盘"""
+    rng = np.random.default_rng(seed)
+    # 先按期望条数多抽一些间隔，不够再补
+    expected = int(duration * arrival_rate)
+    gaps = rng.exponential(1 / arrival_rate, expected + 4 * int(expected ** 0.5) + 16)
+    times = np.cumsum(gaps)
+    while times[-1] < duration:
+        more = np.cumsum(rng.exponential(1 / arrival_rate, len(gaps))) + times[-1]
+        times = np.concatenate([times, more])
+    times = times[times < duration]
+    origins = rng.integers(1, total_floors + 1, len(times))
+    # 目标楼层在其余 total_floors-1 层中均匀抽取
+    destinations = rng.integers(1, total_floors, len(times))
+    destinations += destinations >= origins
+    save_trace(path, times, origins, destinations)
+    return len(times)
+
+
+def qt_floors(total_floors: int, basement_floors: int = 0):
+    """elevator13-4 的楼层号：地下层为 -basement_floors..-1，地上层为 1..total_floors，没有 0 层"""
+    return [f for f in range(-basement_floors, total_floors + 1) if f != 0]
+
+
+def record_qt_trace(path, total_floors: int, basement_floors: int, n_steps: int, seed=None) -> int:
+    """按 elevator13_model.SimulationModel 的生成规则记录 n_steps 个仿真步的到达并存盘，返回条数
+
+    与 SimulationModel.step() 一致：高峰时段每 1 个仿真分钟、其余每 2 个仿真分钟生成一批 1~5（高峰）
+    或 1~3 人，起始楼层 1 层占 70%、-1 和 -2 层各 10%，其余楼层各 1 份，目标楼层在其余楼层中均匀抽取。
+    同一批中起止楼层相同的乘客合并为一条记录，人数写入 group_size 列。
+    模型回放轨迹时不受每层 5 人的上限约束，因此人数略多于直接运行的模型。
+    """
+    rng = np.random.default_rng(seed)
+    floors = np.array(qt_floors(total_floors, basement_floors))
+    weights = np.where(floors == 1, 70, np.where((floors == -1) | (floors == -2), 10, 1))
+    weights = weights / weights.sum()
+
+    times, origins, destinations, group_sizes = [], [], [], []
+    last_generation = 0
+    # 模型每分钟只在该分钟的第一个仿真步（simulation_time 为 60 的倍数）满足生成条件
+    for minute in range(1, n_steps // 60 + 1):
+        hour = minute % 24  # 与 step() 相同：current_hour = (simulation_time // 60) % 24
+        is_peak = 8 <= hour < 9 or 18 <= hour < 21
+        if minute - last_generation < (1 if is_peak else 2):
+            continue
+        last_generation = minute
+        count = int(rng.integers(1, (5 if is_peak else 3) + 1))
+        start = rng.choice(len(floors), count, p=weights)
+        end = rng.integers(0, len(floors) - 1, count)
+        end += end >= start
+        batch = {}
+        for o, d in zip(floors[start], floors[end]):
+            batch[o, d] = batch.get((o, d), 0) + 1
+        for (o, d), size in batch.items():
+            times.append(minute * 60)
+            origins.append(o)
+            destinations.append(d)
+            group_sizes.append(size)
+    save_trace(path, times, origins, destinations, group_sizes)
+    return len(times)
@@ -0,0 +1,76 @@
+"""向量化的乘客到达生成器（NumPy）
+
+按楼层配置和高峰时段一次性预计算到达率与起止楼层分布，再用 NumPy 整批抽样，
+得到按时间排序的 (ticks, origins, destinations) 数组，交给 ElevatorEngine.load_arrivals() 回放：
+
+    engine = ElevatorEngine(n_elevators=6, n_up=100, n_down=5, seed=1)
+    gen = ArrivalGenerator(engine.n_floors, engine.peak_periods, seed=1)
+    engine.load_arrivals(gen.generate(1440, start_time=engine.time + 1))
+    engine.run_until(1440)
+
+分布与 ElevatorEngine.generate_passengers 相同：每个时间单位每层以 base_rate（高峰为 peak_rate）
+的概率来一位乘客；顶层只下行、最底层只上行、中间层上下各半；目标楼层在该方向上均匀分布。
+楼层一律用下标表示，0 为顶层。
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from elevator_engine import DEFAULT_PEAK_PERIODS
+
+
+class Arrivals(NamedTuple):
+    ticks: np.ndarray         # 到达的时间单位（自开始以来的 ticks，非递减）
+    origins: np.ndarray       # 起始楼层下标
+    destinations: np.ndarray  # 目标楼层下标
+
+    def __len__(self):
+        return len(self.ticks)
+
+
+class ArrivalGenerator:
+    # 单次抽样最多覆盖的时间单位数，避免超长时段一次申请过大的随机矩阵
+    chunk_ticks = 1440
+
+    def __init__(self, n_floors: int, peak_periods: Optional[Dict[str, Tuple[int, int]]] = None,
+                 base_rate: float = 0.025, peak_rate: float = 0.075, seed=None):
+        if n_floors < 2:
+            raise ValueError("楼层数至少为 2")
+        self.n_floors = n_floors
+        self.rng = np.random.default_rng(seed)
+        periods = peak_periods if peak_periods is not None else DEFAULT_PEAK_PERIODS
+        minutes = np.arange(1440)
+        peak = np.zeros(1440, dtype=bool)
+        for start, end in periods.values():
+            peak |= (minutes >= start) & (minutes < end)
+        # 一天中每分钟的每层到达概率
+        self.rate_by_minute = np.where(peak, peak_rate, base_rate)
+        # 每层选择上行（去下标更小的楼层）的概率
+        self.p_up = np.full(n_floors, 0.5)
+        self.p_up[0] = 0.0
+        self.p_up[-1] = 1.0
+
+    def generate(self, n_ticks: int, start_time: int = 0, first_tick: int = 0) -> Arrivals:
+        """生成 n_ticks 个时间单位内的全部到达
+
+        start_time 为第一个时间单位对应的一天中的分钟数，first_tick 为其 ticks 编号。
+        """
+        chunks = []
+        for offset in range(0, n_ticks, self.chunk_ticks):
+            size = min(self.chunk_ticks, n_ticks - offset)
+            chunks.append(self._generate_chunk(size, start_time + offset, first_tick + offset))
+        if not chunks:
+            empty = np.empty(0, dtype=np.int64)
+            return Arrivals(empty, empty, empty)
+        return Arrivals(*(np.concatenate(column) for column in zip(*chunks)))
+
+    def _generate_chunk(self, size, start_time, first_tick):
+        rates = self.rate_by_minute[(start_time + np.arange(size)) % 1440]
+        hits = self.rng.random((size, self.n_floors)) < rates[:, None]
+        tick_offsets, origins = np.nonzero(hits)  # 行优先，结果按时间、楼层排序
+        going_up = self.rng.random(len(origins)) < self.p_up[origins]
+        u = self.rng.random(len(origins))
+        above = (u * origins).astype(np.int64)
+        below = origins + 1 + (u * (self.n_floors - 1 - origins)).astype(np.int64)
+        destinations = np.where(going_up, above, below)
+        return tick_offsets + first_tick, origins, destinations
@@ -0,0 +1,64 @@
+"""乘客对象内存基准：比较 __slots__ 版 Passenger 与同字段的普通（__dict__）类每个实例占用的字节数
+
+    python bench_memory.py [乘客数量]
+
+"普通类" 由同一个 __init__ 构造，只是去掉 __slots__，相当于改动前的写法。
+"""
+import importlib.util
+import os
+import sys
+import tracemalloc
+
+# (模块文件, 构造参数)
+TARGETS = [
+    ("elevator_engine.py", (3, 0, "up")),
+    ("building_model.py", (3, 7)),
+    ("elevat20-db6.py", (3, 0, "up")),
+    ("elevator13_model.py", (3, 7)),
+]
+
+
+def load_module(filename):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def dict_backed(cls):
+    """构造与 cls 字段相同、但不带 __slots__ 的普通类"""
+    namespace = {k: v for k, v in vars(cls).items()
+                 if k not in cls.__slots__ and k not in ("__slots__", "__dict__", "__weakref__")}
+    return type(cls.__name__ + "Dict", (), namespace)
+
+
+def bytes_per_instance(cls, args, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls(*args) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # 扣除列表本身每项一个指针的开销
+    per_instance = (after - before) / count - 8
+    del objects
+    return per_instance
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'模块':<26}{'普通类(字节/人)':>16}{'slots(字节/人)':>16}{'节省':>8}")
+    for filename, args in TARGETS:
+        try:
+            module = load_module(filename)
+        except ImportError as e:
+            print(f"{filename:<26}跳过（{e}）")
+            continue
+        cls = module.Passenger
+        slotted = bytes_per_instance(cls, args, count)
+        plain = bytes_per_instance(dict_backed(cls), args, count)
+        print(f"{filename:<26}{plain:>16.0f}{slotted:>16.0f}{1 - slotted / plain:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""改派（整体重新分配呼梯）耗时基准
+
+    python bench_reassign.py [--cars 16] [--calls 100] [--floors 60] [-n 20]
+
+先用事件驱动模式运行一段时间得到有乘客、有停靠目标的电梯状态，再补充候梯乘客，
+直到待分配的呼梯（同层、可乘电梯相同的乘客算一个）达到 --calls 个，
+然后多次调用 Building.reoptimize_assignments()，报告中位数耗时；另报告同样规模的单次
+min_cost_assignment 耗时。电梯按四组分区：全楼层、低区、中区、高区（分区梯都停 1 层）。
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from assignment import min_cost_assignment
+from building_model import Building, Elevator, Passenger
+
+
+def build(n_cars, total_floors):
+    building = Building(total_floors)
+    third = total_floors // 3
+    zones = [list(range(1, total_floors + 1)),
+             [1] + list(range(2, third + 1)),
+             [1] + list(range(third, 2 * third + 1)),
+             [1] + list(range(2 * third, total_floors + 1))]
+    for i in range(n_cars):
+        building.add_elevator(Elevator(i + 1, zones[i % len(zones)], 15, 2.5, 1.0))
+    return building
+
+
+def pending_calls(building):
+    reachable = [set(e.accessible_floors) for e in building.elevators]
+    return {(floor, tuple(k for k, floors in enumerate(reachable)
+                          if floor in floors and p.destination_floor in floors))
+            for floor, passengers in building.waiting_passengers.items() for p in passengers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="改派耗时基准")
+    parser.add_argument("--cars", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=100, help="待分配的呼梯数")
+    parser.add_argument("--floors", type=int, default=60)
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    building = build(args.cars, args.floors)
+    building.run_events(300, arrival_rate=args.cars * 0.1, rng=rng)
+    while len(pending_calls(building)) < args.calls:
+        start, destination = building._random_trip(rng)
+        building.add_passenger(Passenger(start, destination))
+
+    waiting = sum(len(p) for p in building.waiting_passengers.values())
+    riding = sum(len(e.passengers) for e in building.elevators)
+    times = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        building.reoptimize_assignments()
+        times.append((time.perf_counter() - start) * 1000)
+
+    cost = np.random.default_rng(args.seed).random((args.cars, args.calls)) * 100
+    solve = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        min_cost_assignment(cost)
+        solve.append((time.perf_counter() - start) * 1000)
+
+    print(f"{args.cars} 部电梯, {args.floors} 层, {len(pending_calls(building))} 个呼梯"
+          f"（候梯 {waiting} 人, 车内 {riding} 人）")
+    print(f"reoptimize_assignments   中位数 {statistics.median(times):7.2f} ms   最大 {max(times):7.2f} ms")
+    print(f"min_cost_assignment {args.cars}x{args.calls}  中位数 {statistics.median(solve):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""界面启动时间基准：每个界面脚本在全新的子进程中导入并构造主窗口，报告多次运行的中位数
+
+    python bench_startup.py [-n 次数] [脚本 ...]
+
+默认测量下列 Tk / pygame 界面。也可以传入其他版本的脚本文件（如 git show 导出的旧版本）做对比，
+脚本按本目录的模块解析导入。没有图形显示时 Tk 窗口无法构造，只报告导入时间；
+pygame 使用 dummy 视频驱动。"已加载"一列说明启动后 matplotlib / numpy 是否已被导入。
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (脚本, 主窗口类型)
+TARGETS = [
+    ("elevator_system_gui.py", "tk"),
+    ("elevat20-3.py", "tk"),
+    ("elevat20-db1.py", "tk"),
+    ("elevat20-db3.py", "tk"),
+    ("elevat20-db6.py", "tk"),
+    ("elevator_simulation2.py", "pygame"),
+]
+
+
+def construct_tk(module):
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return False
+    root.withdraw()
+    module.ElevatorSystemGUI(root)
+    root.update_idletasks()
+    root.destroy()
+    return True
+
+
+def construct_pygame(module):
+    simulator = module.ElevatorSimulator(total_floors=20)
+    simulator.setup()
+    return True
+
+
+CONSTRUCTORS = {"tk": construct_tk, "pygame": construct_pygame}
+
+
+def measure_child(path, kind):
+    """在当前（全新的）进程中导入并构造一次，结果以 JSON 打印到标准输出"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    sys.path.insert(0, HERE)
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("startup_target", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    constructed = CONSTRUCTORS[kind](module)
+    end = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "construct_ms": (end - imported) * 1000 if constructed else None,
+        "matplotlib": "matplotlib" in sys.modules,
+        "numpy": "numpy" in sys.modules,
+    }))
+
+
+def measure(path, kind, runs):
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", kind, path],
+                             capture_output=True, text=True, check=True, cwd=HERE)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    construct = [r["construct_ms"] for r in results if r["construct_ms"] is not None]
+    construct_ms = statistics.median(construct) if construct else None
+    return import_ms, construct_ms, results[-1]["matplotlib"], results[-1]["numpy"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="界面脚本启动时间（导入 + 构造主窗口）")
+    parser.add_argument("scripts", nargs="*", help="要测量的脚本，默认测量全部界面")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="每个脚本运行次数，取中位数")
+    parser.add_argument("--child", metavar="KIND", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_child(args.scripts[0], args.child)
+        return
+
+    kinds = dict(TARGETS)
+    if args.scripts:
+        # 其他版本的脚本按文件名对应到已知界面的类型，未知的按 Tk 处理
+        targets = [(path, kinds.get(os.path.basename(path), "tk")) for path in args.scripts]
+    else:
+        targets = [(os.path.join(HERE, name), kind) for name, kind in TARGETS]
+
+    print(f"{'脚本':<28}{'导入(ms)':>10}{'构造(ms)':>10}{'合计(ms)':>10}  已加载")
+    for path, kind in targets:
+        import_ms, construct_ms, has_mpl, has_np = measure(path, kind, args.runs)
+        loaded = ", ".join(name for name, flag in (("matplotlib", has_mpl), ("numpy", has_np)) if flag) or "-"
+        if construct_ms is None:
+            print(f"{os.path.basename(path):<28}{import_ms:>10.1f}{'-':>10}{import_ms:>10.1f}  {loaded}")
+        else:
+            total = import_ms + construct_ms
+            print(f"{os.path.basename(path):<28}{import_ms:>10.1f}{construct_ms:>10.1f}{total:>10.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
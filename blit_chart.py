@@ -0,0 +1,58 @@
+"""matplotlib 图表的 blit 增量刷新
+
+坐标轴、刻度、标题等静态部分只在 redraw() 时完整绘制一次，绘制完立即把整张图缓存为背景；
+之后每次 refresh() 只恢复背景、重绘登记过的动态元素（柱子、折线）并 blit 到界面，
+不再 ax.clear() / tight_layout() / 全量 draw()：
+
+    chart = BlitChart(canvas_chart)
+    bars = chart.add(ax.bar(labels, [0] * len(labels)))
+    chart.redraw()
+    ...
+    bars[0].set_height(3)
+    chart.refresh()
+
+改了坐标范围、标签、配色等静态内容后需调用 redraw()；窗口缩放时后端自己会全量重绘，背景随之更新。
+"""
+from typing import Iterable
+
+
+class BlitChart:
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.artists = []
+        self.background = None
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def add(self, artists):
+        """登记动态元素（单个 Artist 或其容器，如 ax.bar 的返回值），原样返回"""
+        for artist in artists if isinstance(artists, Iterable) else (artists,):
+            artist.set_animated(True)
+            self.artists.append(artist)
+        return artists
+
+    def clear(self):
+        self.artists.clear()
+        self.background = None
+
+    def _on_draw(self, event):
+        # 全量绘制会跳过 animated 元素，此时的画面正好作为背景，再补画动态元素
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+
+    def redraw(self):
+        """全量重绘（静态内容变化后调用）"""
+        self.canvas.draw()
+
+    def refresh(self):
+        """只重绘动态元素；尚无背景时退化为一次全量重绘"""
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.figure.bbox)
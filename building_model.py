@@ -0,0 +1,986 @@
+"""elevator_simulation2.py 的仿真模型：电梯（梯形速度曲线）、乘客、Building 的派梯与推进逻辑
+
+不依赖 pygame / matplotlib，可在无界面环境中导入；elevator_simulation2.py 只负责显示：
+
+    building = Building(20)
+    for elevator in create_default_elevators(20):
+        building.add_elevator(elevator)
+    stats = building.run_events(3600, arrival_rate=0.1, rng=random.Random(1))
+"""
+import heapq
+import itertools
+import logging
+import math
+import random
+from collections import Counter
+from enum import Enum
+
+import numpy as np
+
+from assignment import min_cost_assignment
+from streaming_stats import TripStats
+from trip_store import TripStore
+from zoning import ZoneMap, members
+
+# 诊断信息（无法到达的楼层、满载）走 logging，不写标准输出，免得混进 elevator_cli 的 JSON 结果
+logger = logging.getLogger(__name__)
+
+# 方向枚举
+class Direction(Enum):
+    IDLE = 0
+    UP = 1
+    DOWN = -1
+
+# 电梯类
+class Elevator:
+    __slots__ = ("elevator_id", "current_floor", "target_floor", "direction", "destination_floors",
+                 "accessible_floors", "capacity", "passengers", "is_door_open", "door_timer",
+                 "door_open_time", "speed", "acceleration", "current_speed", "position",
+                 "moving_progress", "leg", "event_version", "travel_table", "floor_bits")
+
+    def __init__(self, elevator_id, accessible_floors, capacity=10, speed=1, acceleration=0.5):
+        self.elevator_id = elevator_id
+        self.current_floor = 1
+        self.target_floor = 1
+        self.direction = Direction.IDLE
+        self.destination_floors = []  # 目标楼层列表
+        self.accessible_floors = accessible_floors  # 可到达的楼层列表
+        self.floor_bits = sum(1 << floor for floor in set(accessible_floors))  # 同上，按位存放，判断是否停靠用
+        self.capacity = capacity  # 电梯容量
+        self.passengers = []  # 电梯内的乘客
+        self.is_door_open = False
+        self.door_timer = 0
+        self.door_open_time = 3  # 门保持打开的时间（秒）
+        self.speed = speed  # 电梯速度（层/秒）
+        self.acceleration = acceleration  # 电梯加速度
+        self.current_speed = 0  # 当前速度
+        self.position = 1.0  # 精确位置（浮点数）
+        self.moving_progress = 0  # 移动进度（0-1）
+        # 事件驱动模式下的当前行程：(出发时刻, 起点, 初速度, 方向, 峰值速度, 加速段, 匀速段, 减速段, 目标楼层)
+        self.leg = None
+        self.event_version = 0  # 用于作废已排入队列的旧事件
+        self.travel_table = []  # travel_table[d]：静止出发、行驶 d 层后停稳所需秒数，见 build_travel_table
+        
+    def add_destination(self, floor):
+        # 检查楼层是否可到达
+        if not self.floor_bits >> floor & 1:
+            logger.debug("电梯 %s 无法到达楼层 %s", self.elevator_id, floor)
+            return
+        
+        # 如果楼层不在目标列表中，则添加
+        if floor not in self.destination_floors:
+            self.destination_floors.append(floor)
+            
+            # 根据当前位置和方向对目标楼层进行排序
+            self._sort_destination_floors()
+    
+    def _sort_destination_floors(self):
+        if not self.destination_floors:
+            return
+        self.destination_floors[:], self.direction = self._ordered_destinations(self.destination_floors)
+
+    def _ordered_destinations(self, floors):
+        """按当前位置和方向给出 floors 的停靠顺序及随之确定的运行方向（不修改电梯状态）"""
+        order = list(floors)
+        direction = self.direction
+        # 如果电梯静止，根据最近楼层排序
+        if direction == Direction.IDLE:
+            order.sort(key=lambda x: abs(x - self.current_floor))
+            direction = Direction.UP if order[0] > self.current_floor else Direction.DOWN
+        # 如果电梯上升，按升序排列
+        elif direction == Direction.UP:
+            order.sort()
+            # 如果当前楼层高于所有目标楼层，改变方向
+            if self.current_floor > order[-1]:
+                direction = Direction.DOWN
+                order.sort(reverse=True)
+        # 如果电梯下降，按降序排列
+        elif direction == Direction.DOWN:
+            order.sort(reverse=True)
+            # 如果当前楼层低于所有目标楼层，改变方向
+            if self.current_floor < order[-1]:
+                direction = Direction.UP
+                order.sort()
+        return order, direction
+
+    def planned_route(self, floor):
+        """再加上 floor 这一目标后的停靠顺序，与 add_destination(floor) 之后的 destination_floors 一致"""
+        if floor in self.destination_floors:
+            return list(self.destination_floors)
+        return self._ordered_destinations(self.destination_floors + [floor])[0]
+
+    def build_travel_table(self, max_distance):
+        """按梯形速度曲线（与 plan_leg 相同的 speed/acceleration）预先算出 0..max_distance 层的行程时间"""
+        a, v = self.acceleration, self.speed
+        table = [0.0]
+        for distance in range(1, max_distance + 1):
+            if distance >= v * v / a:
+                # 能加速到最大速度：加速、减速各 v/a 秒，共走 v²/a 层，其余匀速
+                table.append(distance / v + v / a)
+            else:
+                # 三角形速度曲线
+                table.append(2 * math.sqrt(distance / a))
+        self.travel_table = table
+    
+    def move(self, dt):
+        # 如果门是打开的，等待一段时间再关闭
+        if self.is_door_open:
+            self.door_timer += dt
+            if self.door_timer >= self.door_open_time:
+                self.is_door_open = False
+                self.door_timer = 0
+            return
+            
+        # 如果没有目标楼层，电梯静止
+        if not self.destination_floors:
+            self.direction = Direction.IDLE
+            self.current_speed = 0
+            self.position = self.current_floor
+            return
+            
+        # 获取下一个目标楼层；行驶中排到最前的新目标已来不及停靠时，仍驶向原目标（与事件模式的 _retarget 一致）
+        next_floor = self.destination_floors[0]
+        if (self.current_speed > 0 and next_floor != self.target_floor
+                and self.target_floor in self.destination_floors):
+            sign = 1 if self.target_floor > self.position else -1
+            if (next_floor - self.position) * sign < self.current_speed ** 2 / (2 * self.acceleration):
+                next_floor = self.target_floor
+        self.target_floor = next_floor
+        
+        # 物理模拟移动
+        if self.position == next_floor:
+            # 到达目标楼层
+            self.destination_floors.remove(next_floor)
+            self.is_door_open = True  # 到达目标楼层后开门
+            self.current_speed = 0
+            self.position = self.current_floor
+            
+            # 重新排序目标楼层
+            self._sort_destination_floors()
+            
+            return
+        else:
+            # 计算方向
+            direction = 1 if next_floor > self.position else -1
+            
+            # 计算到目标楼层的剩余距离
+            remaining = (next_floor - self.position) * direction
+            
+            # 与 plan_leg 相同的梯形速度曲线：加速至最大速度，且不超过在剩余距离内刹停的速度 sqrt(2·a·剩余距离)
+            braking_speed = math.sqrt(2 * self.acceleration * max(remaining, 0))
+            self.current_speed = min(self.current_speed + self.acceleration * dt, self.speed, braking_speed)
+            
+            # 更新位置；这一帧就能走完剩余距离时直接停在目标楼层，下一帧开门
+            step = self.current_speed * dt
+            if step >= remaining:
+                self.position = next_floor
+                self.current_floor = next_floor
+                self.current_speed = 0
+            else:
+                self.position += direction * step
+                self.current_floor = int(math.floor(self.position + 0.5))
+    
+    def plan_leg(self, now, target):
+        """从当前位置和速度出发，按梯形速度曲线（加速-匀速-减速）规划到 target 停稳的行程，返回到达时刻。
+
+        与 move() 使用同一组 speed/acceleration 参数，但直接解析求解，不逐帧积分。
+        """
+        x0, v0 = self.position, self.current_speed
+        distance = abs(target - x0)
+        a, v_max = self.acceleration, self.speed
+        # 峰值速度：能加速到最大速度就匀速一段，否则是三角形速度曲线
+        v_peak = min(v_max, math.sqrt(a * distance + v0 * v0 / 2))
+        t_acc = (v_peak - v0) / a
+        d_acc = (v_peak * v_peak - v0 * v0) / (2 * a)
+        t_dec = v_peak / a
+        d_dec = v_peak * v_peak / (2 * a)
+        t_cruise = max(distance - d_acc - d_dec, 0) / v_peak if v_peak > 0 else 0
+        sign = 1 if target > x0 else -1
+        self.leg = (now, x0, v0, sign, v_peak, t_acc, t_cruise, t_dec, target)
+        self.direction = Direction.UP if sign > 0 else Direction.DOWN
+        return now + t_acc + t_cruise + t_dec
+
+    def can_stop_at(self, floor):
+        """行驶中能否在 floor 停下：必须在前方，且剩余距离不小于制动距离"""
+        if self.leg is None:
+            return True
+        sign = self.leg[3]
+        ahead = (floor - self.position) * sign
+        return ahead >= self.current_speed * self.current_speed / (2 * self.acceleration)
+
+    def sync_position(self, now):
+        """按当前行程把 position / current_speed / current_floor 推到时刻 now"""
+        if self.leg is None:
+            return
+        start, x0, v0, sign, v_peak, t_acc, t_cruise, t_dec, target = self.leg
+        tau = now - start
+        a = self.acceleration
+        if tau <= t_acc:
+            travelled = v0 * tau + 0.5 * a * tau * tau
+            speed = v0 + a * tau
+        elif tau <= t_acc + t_cruise:
+            travelled = (v_peak * v_peak - v0 * v0) / (2 * a) + v_peak * (tau - t_acc)
+            speed = v_peak
+        else:
+            tau_dec = min(tau - t_acc - t_cruise, t_dec)
+            travelled = ((v_peak * v_peak - v0 * v0) / (2 * a) + v_peak * t_cruise
+                         + v_peak * tau_dec - 0.5 * a * tau_dec * tau_dec)
+            speed = max(v_peak - a * tau_dec, 0)
+        self.position = x0 + sign * travelled
+        self.current_speed = speed
+        self.current_floor = int(math.floor(self.position + 0.5))
+
+    def get_status(self):
+        direction_text = "静止"
+        if self.direction == Direction.UP:
+            direction_text = "上升"
+        elif self.direction == Direction.DOWN:
+            direction_text = "下降"
+            
+        return {
+            "id": self.elevator_id,
+            "current_floor": self.current_floor,
+            "direction": direction_text,
+            "is_door_open": self.is_door_open,
+            "passenger_count": len(self.passengers),
+            "capacity": self.capacity,
+            "destination_floors": self.destination_floors,
+            "position": self.position
+        }
+    
+    def add_passenger(self, passenger):
+        # 检查电梯是否已满
+        if len(self.passengers) >= self.capacity:
+            logger.debug("电梯 %s 已满，无法添加乘客", self.elevator_id)
+            return False
+            
+        self.passengers.append(passenger)
+        passenger.in_elevator = True
+        # 添加乘客的目标楼层
+        self.add_destination(passenger.destination_floor)
+        return True
+    
+    def remove_passengers(self):
+        # 移除目的地是当前楼层的乘客
+        remaining_passengers = []
+        removed_passengers = []
+        
+        for passenger in self.passengers:
+            if passenger.destination_floor == self.current_floor:
+                removed_passengers.append(passenger)
+            else:
+                remaining_passengers.append(passenger)
+                
+        self.passengers = remaining_passengers
+        return removed_passengers
+
+# 乘客类
+class Passenger:
+    # 乘客数量大时按固定字段存储；等待动画由界面根据 waiting_time 计算，不存放在乘客对象上
+    __slots__ = ("start_floor", "destination_floor", "waiting_time", "travel_time", "in_elevator",
+                 "passenger_id", "assigned_elevator", "spawn_time", "board_time",
+                 "final_destination", "first_leg")
+    _next_id = itertools.count(1)
+
+    def __init__(self, start_floor, destination_floor, passenger_id=None):
+        self.start_floor = start_floor
+        self.destination_floor = destination_floor
+        self.waiting_time = 0
+        self.travel_time = 0
+        self.in_elevator = False
+        self.passenger_id = passenger_id or next(Passenger._next_id)
+        self.assigned_elevator = None
+        # 事件驱动模式下用时间戳计算等待/乘梯时间
+        self.spawn_time = None
+        self.board_time = None
+        # 需要换乘时 destination_floor 为换乘楼层，final_destination 为最终目的楼层；
+        # 换乘后 first_leg 记下 (原起始楼层, 首次上梯时刻)，全程完成时按此记一条行程
+        self.final_destination = None
+        self.first_leg = None
+    
+    def update_time(self, dt):
+        if not self.in_elevator:
+            self.waiting_time += dt
+        else:
+            self.travel_time += dt
+
+# 建筑物类
+class Building:
+    def __init__(self, total_floors=20):
+        self.total_floors = total_floors
+        self.elevators = []
+        self.waiting_passengers = {i: [] for i in range(1, total_floors + 1)}
+        # 已完成行程按列存储，等待/行程时间由产生、上梯、下梯时刻求得
+        self.completed_trips = TripStore()
+        self.trip_stats = TripStats()
+        
+        # 统计信息
+        self.total_passengers = 0
+        
+        # 模拟数据收集
+        self.waiting_times_history = []
+        self.travel_times_history = []
+        self.passenger_count_history = []
+        self.time_history = []
+        self.current_time = 0
+
+        # 事件驱动模式的事件队列：(时刻, 序号, 事件类型, 电梯, 事件版本)
+        self.events = None
+        self.event_seq = itertools.count()
+        self.next_sample_time = 1
+
+        # 回放用的到达轨迹（arrival_trace.ArrivalTrace，时间单位为秒），为 None 时随机生成
+        self.arrival_trace = None
+        self.trace_cursor = 0
+
+        # 改派模式：每隔 reassign_interval 秒把所有候梯乘客整体重新分配一次（见 reoptimize_assignments），
+        # 并允许先到的顺路电梯接走分给别的电梯的乘客；None 为关闭。需在开始运行前设置
+        self.reassign_interval = None
+        self.reassign_margin = 2.0  # 把乘客换到另一部电梯时每人附加的代价（秒），避免来回改派
+        self.next_reassign_time = 0
+        # 目的楼层派梯：登记时按目的楼层把同去向的乘客归到同一部电梯，减少每趟停靠（见 _destination_cost）
+        self.destination_dispatch = False
+        # 分区路线表（zoning.ZoneMap）：按电梯可停靠楼层预先算好每对起止楼层可乘的电梯和换乘楼层，加入电梯时作废
+        self.zones = None
+        self.transfers = 0  # 在换乘楼层转乘的人次
+    
+    def add_elevator(self, elevator):
+        # 行程时间表只在加入时建一次，派梯打分时直接查表
+        elevator.build_travel_table(self.total_floors)
+        self.elevators.append(elevator)
+        self.zones = None
+
+    def zone_map(self):
+        if self.zones is None:
+            self.zones = ZoneMap([elevator.accessible_floors for elevator in self.elevators])
+        return self.zones
+    
+    def add_passenger(self, passenger):
+        if passenger.spawn_time is None:
+            passenger.spawn_time = self.current_time
+        self.waiting_passengers[passenger.start_floor].append(passenger)
+        self.total_passengers += 1
+        
+        # 为乘客分配电梯
+        self._assign_elevator(passenger)
+    
+    def _assign_elevator(self, passenger):
+        start_floor = passenger.start_floor
+        # 按分区查可从起始楼层直达目标楼层的电梯；没有时先乘到换乘楼层（空中大堂）再转乘
+        cars, transfer = self.zone_map().route(start_floor, passenger.destination_floor)
+        if transfer is not None:
+            passenger.final_destination = passenger.destination_floor
+            passenger.destination_floor = transfer
+        direction = Direction.UP if passenger.destination_floor > start_floor else Direction.DOWN
+        
+        best_elevator = None
+        min_score = float('inf')
+        
+        for k in members(cars):
+            elevator = self.elevators[k]
+            # 计算电梯得分
+            score = self._calculate_elevator_score(elevator, start_floor, direction)
+            if self.destination_dispatch:
+                score += self._destination_cost(elevator, passenger)
+            
+            if score < min_score:
+                min_score = score
+                best_elevator = elevator
+                
+        if best_elevator:
+            # 为电梯添加目标楼层
+            best_elevator.add_destination(start_floor)
+            # 记录乘客被分配到的电梯
+            passenger.assigned_elevator = best_elevator.elevator_id
+    
+    def _calculate_elevator_score(self, elevator, floor, direction):
+        """估算把 floor 层呼梯派给 elevator 的代价（秒）：该乘客的预计等待时间，加上其他乘客因此多等的时间
+
+        按加入该目标后的停靠顺序逐段查行程时间表，途中每停一站再加一次开门时间；
+        到达时若仍满载（途中上下车后的人数，含已派给它、尚在候梯的乘客），乘客只能等它跑完其余停靠再回来。
+        floor 是新增的停靠时，此后才下车或上车的乘客都要多等一次开门和绕停的时间。
+        """
+        table = elevator.travel_table
+        door_time = elevator.door_open_time
+        eid = elevator.elevator_id
+        eta = max(door_time - elevator.door_timer, 0) if elevator.is_door_open else 0.0
+        route = elevator.planned_route(floor)
+        riders = len(elevator.passengers)
+        position = elevator.current_floor
+        remaining = iter(route)
+        for stop in remaining:
+            eta += table[abs(stop - position)]
+            if stop == floor:
+                break
+            position = stop
+            eta += door_time
+            riders -= sum(1 for p in elevator.passengers if p.destination_floor == stop)
+            riders += sum(1 for p in self.waiting_passengers[stop] if p.assigned_elevator == eid)
+        later = list(remaining)
+        if floor not in elevator.destination_floors:
+            delayed = riders + sum(1 for stop in later for p in self.waiting_passengers[stop]
+                                   if p.assigned_elevator == eid)
+            extra = door_time + table[abs(floor - position)]
+            if later:
+                extra += table[abs(later[0] - floor)] - table[abs(later[0] - position)]
+            eta += delayed * extra
+        if riders >= elevator.capacity:
+            position = floor
+            for stop in later:
+                eta += door_time + table[abs(stop - position)]
+                position = stop
+            eta += door_time + table[abs(floor - position)]
+        return eta
+
+    def _destination_cost(self, elevator, passenger):
+        """目的楼层派梯的附加代价（秒）
+
+        该电梯车内和已分给它的乘客的目的楼层里已有乘客的目的楼层时，不增加停靠；否则比他坐得更远的人
+        都要多等一次停靠（开门时间加一次减速、起步的损失 speed/acceleration）；他的目的楼层超出这些人
+        最远的目的楼层时，本趟往返也要拉长这一段的来回行程。
+        """
+        destination = passenger.destination_floor
+        if destination in elevator.destination_floors:
+            return 0.0
+        eid = elevator.elevator_id
+        planned = [p.destination_floor for p in elevator.passengers]
+        for passengers in self.waiting_passengers.values():
+            planned.extend(p.destination_floor for p in passengers if p.assigned_elevator == eid)
+        if destination in planned:
+            return 0.0
+        # 沿乘客行进方向度量：比他更远的目的楼层
+        sign = 1 if destination > passenger.start_floor else -1
+        ahead = [(floor - passenger.start_floor) * sign for floor in planned]
+        distance = (destination - passenger.start_floor) * sign
+        beyond = sum(1 for d in ahead if d > distance)
+        if beyond:
+            return beyond * (elevator.door_open_time + elevator.speed / elevator.acceleration)
+        farthest = max([d for d in ahead if d > 0], default=0)
+        if not farthest:
+            return 0.0
+        table = elevator.travel_table
+        return 2 * (table[distance] - table[farthest])
+
+    def _call_costs(self, elevator, stops, boarders):
+        """_calculate_elevator_score 的整层向量版：elevator 需停靠 stops 各层、boarders[楼层] 人将在该层上梯时，
+        对每一层新增呼梯算出 (该乘客的预计等待时间, 其他乘客因此多等的时间, 到达时是否仍满载)，均按楼层下标"""
+        current = elevator.current_floor
+        floors = np.arange(self.total_floors + 1)
+        if elevator.direction == Direction.IDLE:
+            return self._insertion_costs(elevator, sorted(stops, key=lambda x: abs(x - current)),
+                                         boarders, lambda x: np.abs(x - current), floors)
+        # 与 _ordered_destinations 相同：上行时当前楼层高于全部目标（含新呼梯）才改为降序，下行同理
+        if elevator.direction == Direction.UP:
+            if max(stops, default=-1) >= current:
+                return self._insertion_costs(elevator, sorted(stops), boarders, lambda x: x, floors)
+            use_descending = floors < current
+        else:
+            if min(stops, default=self.total_floors + 1) <= current:
+                return self._insertion_costs(elevator, sorted(stops, reverse=True), boarders, lambda x: -x, floors)
+            use_descending = floors <= current
+        ascending = self._insertion_costs(elevator, sorted(stops), boarders, lambda x: x, floors)
+        descending = self._insertion_costs(elevator, sorted(stops, reverse=True), boarders, lambda x: -x, floors)
+        return tuple(np.where(use_descending, d, a) for a, d in zip(ascending, descending))
+
+    def _insertion_costs(self, elevator, order, boarders, key, floors):
+        # order 为停靠顺序，key(楼层) 在 order 上单调不减：新呼梯按 key 插在相等者之后（与稳定排序一致）
+        table = np.asarray(elevator.travel_table)
+        door_time = elevator.door_open_time
+        current = elevator.current_floor
+        start = max(door_time - elevator.door_timer, 0) if elevator.is_door_open else 0.0
+        stops = np.array(order, dtype=int)
+        k = len(stops)
+        previous_floor = np.concatenate(([current], stops))
+        # arrive[i]：到达 order[i-1] 的时刻（arrive[0] 对应出发）；load[i]：处理完前 i 站后车内人数
+        arrive = start - door_time + np.concatenate(([0], np.cumsum(table[np.abs(np.diff(previous_floor))] + door_time)))
+        alight = Counter(p.destination_floor for p in elevator.passengers)
+        change = np.array([boarders.get(f, 0) - alight.get(f, 0) for f in order], dtype=float)
+        load = len(elevator.passengers) + np.concatenate(([0], np.cumsum(change)))
+        later_boarders = np.concatenate((np.cumsum([boarders.get(f, 0) for f in order][::-1])[::-1], [0]))
+
+        if not k:
+            eta = start + table[np.abs(floors - current)]
+            delay = load[0] * (door_time + table[np.abs(floors - current)])
+            full = np.full(len(floors), load[0] >= elevator.capacity)
+            return eta + np.where(full, door_time, 0.0), delay, full
+
+        idx = np.searchsorted(key(stops), key(floors), side="right")
+        prev = previous_floor[idx]
+        has_next = idx < k
+        nxt = stops[np.minimum(idx, k - 1)]
+        eta = arrive[idx] + door_time + table[np.abs(floors - prev)]
+        extra = door_time + table[np.abs(floors - prev)] + np.where(
+            has_next, table[np.abs(nxt - floors)] - table[np.abs(nxt - prev)], 0)
+        delay = (load[idx] + later_boarders[idx]) * extra
+        # 到达时仍满载：跑完其余停靠再回到该层
+        back = door_time + table[np.abs(floors - stops[-1])]
+        tail = np.where(has_next, door_time + table[np.abs(nxt - floors)] + arrive[k] - arrive[np.minimum(idx + 1, k)]
+                        + back, door_time)
+        full = load[idx] >= elevator.capacity
+
+        # 已在停靠顺序中的楼层：不新增停靠，到达时间即原计划
+        existing = np.full(len(floors), -1)
+        existing[stops] = np.arange(k)
+        at_stop = existing >= 0
+        pos = np.maximum(existing, 0)
+        eta = np.where(at_stop, arrive[pos + 1], eta)
+        delay = np.where(at_stop, 0.0, delay)
+        tail = np.where(at_stop, arrive[k] - arrive[pos + 1] + back, tail)
+        full = np.where(at_stop, load[pos] >= elevator.capacity, full)
+        return eta + np.where(full, tail, 0.0), delay, full
+
+    def reoptimize_assignments(self):
+        """把所有候梯乘客当作一批呼梯，按最小总代价重新分给各电梯，返回停靠目标有变化的电梯
+
+        同一层、可乘电梯相同的乘客合为一个呼梯，代价为人数 × 预计等待时间加上其他乘客多等的时间
+        （见 _call_costs），换到别的电梯的每人再加 reassign_margin。每一轮用 min_cost_assignment
+        给每部电梯至多配一个呼梯，再按新增的停靠更新这些电梯的代价，直到呼梯分完。
+        到达时仍满载的电梯不接该呼梯（停靠目标无法表达"跑完再回来"），这类呼梯留到下一次再分。
+        电梯的停靠目标重建为车内乘客的目的楼层加上分给它的呼梯楼层。
+        """
+        zones = self.zone_map()
+        groups = {}
+        for floor, passengers in self.waiting_passengers.items():
+            for passenger in passengers:
+                cars = tuple(members(zones.direct(floor, passenger.destination_floor)))
+                if cars:
+                    groups.setdefault((floor, cars), []).append(passenger)
+        if not groups:
+            return []
+
+        n_cars = len(self.elevators)
+        calls = list(groups.items())
+        call_floors = np.array([floor for (floor, _), _ in calls])
+        sizes = np.array([len(passengers) for _, passengers in calls], dtype=float)
+        feasible = np.zeros((n_cars, len(calls)), dtype=bool)
+        staying = np.zeros((n_cars, len(calls)))
+        car_index = {elevator.elevator_id: k for k, elevator in enumerate(self.elevators)}
+        for c, ((_, cars), passengers) in enumerate(calls):
+            feasible[list(cars), c] = True
+            for passenger in passengers:
+                if passenger.assigned_elevator in car_index:
+                    staying[car_index[passenger.assigned_elevator], c] += 1
+        margin = self.reassign_margin * (sizes - staying)
+        unreachable = 1e12
+
+        stops = [{p.destination_floor for p in elevator.passengers} for elevator in self.elevators]
+        boarders = [Counter() for _ in self.elevators]
+        costs = [self._call_costs(elevator, stops[k], boarders[k]) for k, elevator in enumerate(self.elevators)]
+        chosen = {}
+        pending = np.arange(len(calls))
+        while len(pending):
+            columns = call_floors[pending]
+            allowed = feasible[:, pending] & ~np.array([cost[2][columns] for cost in costs])
+            # 没有电梯接得了的呼梯（车只会越来越满）本次不再分配；也没有可接呼梯的电梯不参与求解
+            open_calls = allowed.any(axis=0)
+            pending, columns, allowed = pending[open_calls], columns[open_calls], allowed[:, open_calls]
+            rows = np.flatnonzero(allowed.any(axis=1))
+            if not len(rows):
+                break
+            eta = np.array([costs[k][0][columns] for k in rows])
+            delay = np.array([costs[k][1][columns] for k in rows])
+            matrix = np.where(allowed[rows], sizes[pending] * eta + delay + margin[np.ix_(rows, pending)], unreachable)
+            assigned = []
+            for r, j in min_cost_assignment(matrix):
+                if matrix[r, j] >= unreachable:
+                    continue
+                k, c = rows[r], pending[j]
+                chosen[c] = k
+                stops[k].add(int(call_floors[c]))
+                boarders[k][int(call_floors[c])] += int(sizes[c])
+                costs[k] = self._call_costs(self.elevators[k], stops[k], boarders[k])
+                assigned.append(j)
+            pending = np.delete(pending, assigned)
+
+        for c, k in chosen.items():
+            for passenger in calls[c][1]:
+                passenger.assigned_elevator = self.elevators[k].elevator_id
+        changed = []
+        for k, elevator in enumerate(self.elevators):
+            if set(elevator.destination_floors) != stops[k]:
+                elevator.destination_floors[:] = sorted(stops[k])
+                elevator._sort_destination_floors()
+                changed.append(elevator)
+        return changed
+
+    def _may_board(self, elevator, passenger):
+        if passenger.assigned_elevator == elevator.elevator_id:
+            return True
+        if self.reassign_interval is None or len(elevator.passengers) >= elevator.capacity:
+            return False
+        # 改派模式下，先到的电梯只要能去乘客的目标楼层且方向一致，就直接接走
+        if not elevator.floor_bits >> passenger.destination_floor & 1:
+            return False
+        if not elevator.destination_floors:
+            return True
+        going_up = passenger.destination_floor > passenger.start_floor
+        return (elevator.direction == Direction.UP) == going_up
+    
+    def update(self, dt):
+        self.current_time += dt
+
+        if self.reassign_interval is not None and self.current_time >= self.next_reassign_time:
+            self.reoptimize_assignments()
+            self.next_reassign_time = self.current_time + self.reassign_interval
+        
+        # 更新所有乘客的等待时间
+        for floor in self.waiting_passengers:
+            for passenger in self.waiting_passengers[floor]:
+                passenger.update_time(dt)
+                
+        # 更新所有电梯
+        for elevator in self.elevators:
+            elevator.move(dt)
+            
+            # 如果电梯门打开，处理乘客上下电梯
+            if elevator.is_door_open:
+                current_floor = elevator.current_floor
+                
+                # 乘客下电梯
+                removed_passengers = elevator.remove_passengers()
+                for passenger in removed_passengers:
+                    self._alight(passenger, elevator)
+                
+                # 乘客上电梯
+                remaining_passengers = []
+                for passenger in self.waiting_passengers[current_floor]:
+                    # 检查乘客是否被分配到这个电梯（改派模式下也可搭乘先到的顺路电梯）
+                    if self._may_board(elevator, passenger):
+                        if elevator.add_passenger(passenger):
+                            # 乘客成功进入电梯
+                            passenger.assigned_elevator = elevator.elevator_id
+                            passenger.board_time = self.current_time
+                        else:
+                            remaining_passengers.append(passenger)
+                    else:
+                        remaining_passengers.append(passenger)
+                
+                self.waiting_passengers[current_floor] = remaining_passengers
+        
+        # 收集统计数据
+        self._collect_statistics(dt)
+    
+    def load_arrival_trace(self, trace):
+        """之后的乘客到达改为按轨迹回放（逐帧模式和 run_events 都适用）"""
+        self.arrival_trace = trace
+        self.trace_cursor = int(np.searchsorted(trace.times, self.current_time, side="left"))
+
+    def _take_trace_arrivals(self):
+        # 取出到达时刻不晚于当前时间的轨迹记录，展开成 (起始楼层, 目标楼层) 列表
+        trace = self.arrival_trace
+        trips = []
+        while self.trace_cursor < len(trace) and trace.times[self.trace_cursor] <= self.current_time:
+            i = self.trace_cursor
+            trip = (int(trace.origins[i]), int(trace.destinations[i]))
+            trips.extend([trip] * (1 if trace.group_sizes is None else int(trace.group_sizes[i])))
+            self.trace_cursor += 1
+        return trips
+
+    def generate_random_passenger(self, dt):
+        if self.arrival_trace is not None:
+            passenger = None
+            for start_floor, destination_floor in self._take_trace_arrivals():
+                passenger = Passenger(start_floor, destination_floor)
+                self.add_passenger(passenger)
+            return passenger
+
+        # 基于时间间隔生成乘客
+        if random.random() < 0.1 * dt:  # 每秒10%的概率生成新乘客
+            start_floor, destination_floor = self._random_trip(random)
+            passenger = Passenger(start_floor, destination_floor)
+            self.add_passenger(passenger)
+            return passenger
+        return None
+
+    def _random_trip(self, rng):
+        start_floor = rng.randint(1, self.total_floors)
+        
+        # 确保目标楼层与起始楼层不同
+        possible_destinations = list(range(1, self.total_floors + 1))
+        possible_destinations.remove(start_floor)
+        destination_floor = rng.choice(possible_destinations)
+        return start_floor, destination_floor
+    
+    def _collect_statistics(self, dt):
+        # 收集统计数据用于图表
+        if self.current_time % 1 <= dt:  # 大约每秒收集一次数据
+            total_waiting = sum(p.waiting_time for floor in self.waiting_passengers for p in self.waiting_passengers[floor])
+            total_travel = sum(p.travel_time for elevator in self.elevators for p in elevator.passengers)
+            
+            waiting_count = sum(len(self.waiting_passengers[floor]) for floor in self.waiting_passengers)
+            travel_count = sum(len(elevator.passengers) for elevator in self.elevators)
+            
+            avg_waiting_time = total_waiting / waiting_count if waiting_count > 0 else 0
+            avg_travel_time = total_travel / travel_count if travel_count > 0 else 0
+            
+            self._append_history(self.current_time, avg_waiting_time, avg_travel_time,
+                                 waiting_count + travel_count)
+
+    def _append_history(self, now, avg_waiting_time, avg_travel_time, passenger_count):
+        self.waiting_times_history.append(avg_waiting_time)
+        self.travel_times_history.append(avg_travel_time)
+        self.passenger_count_history.append(passenger_count)
+        self.time_history.append(now)
+        
+        # 保持数据点数量在合理范围内
+        max_points = 100
+        if len(self.time_history) > max_points:
+            self.time_history.pop(0)
+            self.waiting_times_history.pop(0)
+            self.travel_times_history.pop(0)
+            self.passenger_count_history.pop(0)
+
+    # ---------------- 事件驱动模式 ----------------
+
+    def run_events(self, duration, arrival_rate=0.1, rng=None):
+        """事件驱动的批量运行：在乘客到达、电梯到站开门、关门三类事件之间直接跳转。
+
+        乘客按到达率为 arrival_rate（人/秒）的泊松过程生成，与 generate_random_passenger 的期望一致；
+        已通过 load_arrival_trace() 加载轨迹时改为按轨迹回放。
+        运行开销只与事件数有关，和模拟时长对应的帧数无关。可多次调用接着往下跑。
+        逐帧模式（update，界面所用）的 move() 按同一梯形速度曲线积分，同一条轨迹下两者的完成行程数和
+        平均等待时间基本一致（selfcheck.py modes）；接近饱和时排队对时序敏感，两者结果会有百分之几到十的差别。
+        """
+        rng = rng or random
+        end_time = self.current_time + duration
+        if self.events is None:
+            self.events = []
+            self.next_sample_time = math.floor(self.current_time) + 1
+            self._schedule_next_arrival(rng, arrival_rate)
+            for elevator in self.elevators:
+                self._start_next_leg(elevator)
+            if self.reassign_interval is not None:
+                self._schedule(self.current_time + self.reassign_interval, "reassign")
+
+        while self.events and self.events[0][0] <= end_time:
+            event_time, _, kind, elevator, version = heapq.heappop(self.events)
+            if elevator is not None and version != elevator.event_version:
+                continue  # 电梯改道或重新排程后留下的旧事件
+            self._advance_clock(event_time)
+
+            if kind == "arrival":
+                if self.arrival_trace is not None:
+                    trips = self._take_trace_arrivals()
+                else:
+                    trips = [self._random_trip(rng)]
+                self._sync_elevators()
+                for start_floor, destination_floor in trips:
+                    passenger = Passenger(start_floor, destination_floor)
+                    passenger.spawn_time = event_time
+                    self.add_passenger(passenger)
+                    self._on_passenger_assigned(passenger)
+                self._schedule_next_arrival(rng, arrival_rate)
+            elif kind == "floor_arrival":
+                self._on_floor_arrival(elevator)
+            elif kind == "door_close":
+                elevator.is_door_open = False
+                elevator.door_timer = 0
+                self._start_next_leg(elevator)
+            elif kind == "reassign":
+                self._sync_elevators()
+                for changed in self.reoptimize_assignments():
+                    self._on_destinations_changed(changed)
+                self._schedule(self.current_time + self.reassign_interval, "reassign")
+
+        self._advance_clock(end_time)
+        self._sync_elevators()
+        # 让逐帧模式使用的字段与时间戳一致，便于 get_statistics() 和渲染
+        for floor in self.waiting_passengers:
+            for passenger in self.waiting_passengers[floor]:
+                if passenger.spawn_time is not None:
+                    passenger.waiting_time = end_time - passenger.spawn_time
+        for elevator in self.elevators:
+            for passenger in elevator.passengers:
+                if passenger.board_time is not None:
+                    passenger.travel_time = end_time - passenger.board_time
+        return self.get_statistics()
+
+    def _schedule_next_arrival(self, rng, arrival_rate):
+        if self.arrival_trace is None:
+            self._schedule(self.current_time + rng.expovariate(arrival_rate), "arrival")
+        elif self.trace_cursor < len(self.arrival_trace):
+            self._schedule(float(self.arrival_trace.times[self.trace_cursor]), "arrival")
+
+    def _schedule(self, event_time, kind, elevator=None):
+        version = 0
+        if elevator is not None:
+            # 每部电梯同一时刻只有一个有效事件，版本号递增即作废之前排入的事件
+            elevator.event_version += 1
+            version = elevator.event_version
+        heapq.heappush(self.events, (event_time, next(self.event_seq), kind, elevator, version))
+
+    def _advance_clock(self, now):
+        # 事件之间系统状态不变，只需补齐按秒采样的统计点；超出保留窗口的采样点直接跳过
+        if now >= self.next_sample_time:
+            first = max(self.next_sample_time, math.floor(now) - 99)
+            for sample_time in range(int(first), int(math.floor(now)) + 1):
+                self._sample_statistics(sample_time)
+            self.next_sample_time = math.floor(now) + 1
+        self.current_time = now
+
+    def _sample_statistics(self, now):
+        waiting = [p for floor in self.waiting_passengers for p in self.waiting_passengers[floor]]
+        riding = [p for elevator in self.elevators for p in elevator.passengers]
+        avg_waiting_time = sum(now - p.spawn_time for p in waiting) / len(waiting) if waiting else 0
+        avg_travel_time = sum(now - p.board_time for p in riding) / len(riding) if riding else 0
+        self._append_history(now, avg_waiting_time, avg_travel_time, len(waiting) + len(riding))
+
+    def _sync_elevators(self):
+        for elevator in self.elevators:
+            elevator.sync_position(self.current_time)
+
+    def _on_passenger_assigned(self, passenger):
+        for elevator in self.elevators:
+            if elevator.elevator_id != passenger.assigned_elevator:
+                continue
+            if elevator.is_door_open and elevator.current_floor == passenger.start_floor:
+                # 电梯正开着门停在该层，乘客直接上梯
+                self._board_waiting(elevator)
+            elif elevator.leg is not None:
+                self._retarget(elevator)
+            else:
+                self._start_next_leg(elevator)
+
+    def _on_destinations_changed(self, elevator):
+        # 改派后：开着门的电梯让新分给它的本层乘客上梯，本层已无人要接就不再停；行驶中的按新目标改道
+        if elevator.is_door_open:
+            self._board_waiting(elevator)
+            current_floor = elevator.current_floor
+            if current_floor in elevator.destination_floors and not any(
+                    p.assigned_elevator == elevator.elevator_id for p in self.waiting_passengers[current_floor]):
+                elevator.destination_floors.remove(current_floor)
+        elif elevator.leg is not None:
+            if elevator.destination_floors:
+                self._retarget(elevator)
+        else:
+            self._start_next_leg(elevator)
+
+    def _start_next_leg(self, elevator):
+        if elevator.is_door_open:
+            return  # 关门事件里会再排下一段行程
+        if not elevator.destination_floors:
+            elevator.direction = Direction.IDLE
+            elevator.current_speed = 0
+            elevator.position = elevator.current_floor
+            elevator.leg = None
+            return
+        target = elevator.destination_floors[0]
+        if target == elevator.current_floor:
+            self._schedule(self.current_time, "floor_arrival", elevator)
+            elevator.leg = (self.current_time, elevator.position, 0, 1, 0, 0, 0, 0, target)
+            return
+        self._schedule(elevator.plan_leg(self.current_time, target), "floor_arrival", elevator)
+
+    def _retarget(self, elevator):
+        # 行驶途中新加的目标楼层排到了最前面，且还来得及停下时，改停该层
+        target = elevator.destination_floors[0]
+        if target == elevator.leg[-1] or not elevator.can_stop_at(target):
+            return
+        self._schedule(elevator.plan_leg(self.current_time, target), "floor_arrival", elevator)
+
+    def _on_floor_arrival(self, elevator):
+        target = elevator.leg[-1]
+        elevator.leg = None
+        elevator.current_floor = target
+        elevator.position = target
+        elevator.current_speed = 0
+        if target in elevator.destination_floors:
+            elevator.destination_floors.remove(target)
+        elevator.is_door_open = True
+        elevator._sort_destination_floors()
+
+        # 乘客下电梯
+        for passenger in elevator.remove_passengers():
+            passenger.travel_time = self.current_time - passenger.board_time
+            if self._alight(passenger, elevator):
+                self._on_passenger_assigned(passenger)
+
+        self._board_waiting(elevator)
+        self._schedule(self.current_time + elevator.door_open_time, "door_close", elevator)
+
+    def _board_waiting(self, elevator):
+        current_floor = elevator.current_floor
+        remaining_passengers = []
+        for passenger in self.waiting_passengers[current_floor]:
+            if self._may_board(elevator, passenger) and elevator.add_passenger(passenger):
+                passenger.assigned_elevator = elevator.elevator_id
+                passenger.board_time = self.current_time
+                passenger.waiting_time = self.current_time - passenger.spawn_time
+            else:
+                remaining_passengers.append(passenger)
+        self.waiting_passengers[current_floor] = remaining_passengers
+    
+    def _alight(self, passenger, elevator):
+        """乘客下梯：到达最终目的楼层记一条行程；到达换乘楼层则在该层重新候梯、派梯，返回 True"""
+        if passenger.final_destination is None:
+            self._record_trip(passenger, elevator)
+            return False
+        if passenger.first_leg is None:
+            passenger.first_leg = (passenger.start_floor, passenger.board_time)
+        passenger.start_floor = passenger.destination_floor
+        passenger.destination_floor = passenger.final_destination
+        passenger.final_destination = None
+        passenger.in_elevator = False
+        passenger.assigned_elevator = None
+        self.transfers += 1
+        self.waiting_passengers[passenger.start_floor].append(passenger)
+        self._assign_elevator(passenger)
+        return True
+
+    def _record_trip(self, passenger, elevator):
+        # 换乘的乘客按全程记一条：起点为原起始楼层，等待时间只算首次候梯，换乘候梯计入乘梯时间
+        origin, board_time = passenger.first_leg or (passenger.start_floor, passenger.board_time)
+        self.completed_trips.append(origin, passenger.destination_floor, passenger.spawn_time,
+                                    board_time, self.current_time, elevator.elevator_id)
+        self.trip_stats.record(board_time - passenger.spawn_time, self.current_time - board_time)
+
+    def get_statistics(self):
+        total_passengers = sum(len(self.waiting_passengers[floor]) for floor in self.waiting_passengers)
+        total_passengers += sum(len(elevator.passengers) for elevator in self.elevators)
+        total_passengers += len(self.completed_trips)
+        
+        # 计算平均等待时间和行程时间（已完成行程，流式统计）
+        avg_waiting_time = self.trip_stats.wait.mean
+        avg_travel_time = self.trip_stats.ride.mean
+        
+        # 计算当前等待时间最长的乘客
+        max_waiting_passenger = None
+        max_waiting_time = 0
+        for floor in self.waiting_passengers:
+            for passenger in self.waiting_passengers[floor]:
+                if passenger.waiting_time > max_waiting_time:
+                    max_waiting_time = passenger.waiting_time
+                    max_waiting_passenger = passenger
+        
+        return {
+            "total_passengers": total_passengers,
+            "waiting_passengers": sum(len(self.waiting_passengers[floor]) for floor in self.waiting_passengers),
+            "passengers_in_elevators": sum(len(elevator.passengers) for elevator in self.elevators),
+            "completed_trips": len(self.completed_trips),
+            "transfers": self.transfers,
+            "avg_waiting_time": avg_waiting_time,
+            "avg_travel_time": avg_travel_time,
+            "max_waiting_time": max_waiting_time,
+            # 已完成行程的等待/行程时间分布（avg/p50/p90/p95/p99/max）
+            "waiting_time_summary": self.trip_stats.wait.summary(),
+            "travel_time_summary": self.trip_stats.ride.summary(),
+            "time_history": self.time_history,
+            "waiting_times_history": self.waiting_times_history,
+            "travel_times_history": self.travel_times_history,
+            "passenger_count_history": self.passenger_count_history
+        }
+
+def create_default_elevators(total_floors):
+    return [
+        Elevator(1, list(range(1, total_floors + 1)), 10, 1.2, 0.6),  # 全楼层，较快
+        Elevator(2, list(range(1, total_floors + 1)), 10, 1.0, 0.5),  # 全楼层，标准
+        Elevator(3, [1] + list(range(10, total_floors + 1)), 15, 1.5, 0.7),  # 低层和高层，高速
+        Elevator(4, [1] + list(range(2, 11)), 15, 1.0, 0.5),  # 低层
+    ]
+
+def run_batch(total_floors=20, duration=600, arrival_rate=0.1, seed=None):
+    """不开窗口，用事件驱动模式跑 duration 秒，返回 Building.get_statistics() 的结果"""
+    building = Building(total_floors)
+    for elevator in create_default_elevators(total_floors):
+        building.add_elevator(elevator)
+    return building.run_events(duration, arrival_rate, random.Random(seed))
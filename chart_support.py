@@ -0,0 +1,97 @@
+"""图表依赖的延迟加载与中文字体缓存
+
+matplotlib（连同 numpy、字体管理器）只在第一次真正画图时导入，界面启动不再为它等待：
+
+    fig, ax, canvas = create_tk_chart(self.chart_frame)
+
+中文字体的查找结果写入磁盘缓存（默认 ~/.cache/elevator_sim/cjk_font.json），
+之后启动直接读取字体名和文件路径，不再遍历 fontManager.ttflist。
+缓存按候选列表分别记录，候选顺序不同的几个界面共用缓存文件时互不覆盖；字体文件已不存在时重新查找。
+"""
+import json
+import os
+from typing import Optional, Sequence
+
+CJK_FONTS = ('SimHei', 'Microsoft JianhengHei', 'WenQuanYi Micro Hei', 'Heiti TC', 'Microsoft YaHei', 'SimSun')
+FONT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "elevator_sim", "cjk_font.json")
+
+
+def _cache_key(candidates):
+    return "|".join(candidates)
+
+
+def _load_font_cache(cache_path):
+    """{候选列表键: {"name": 字体名, "path": 文件路径}}，文件不存在或格式不对时为空"""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cached, dict) or not all(isinstance(v, dict) for v in cached.values()):
+        return {}  # 旧格式只记一个字体，丢弃
+    return cached
+
+
+def _read_font_cache(cache_path, candidates):
+    try:
+        entry = _load_font_cache(cache_path)[_cache_key(candidates)]
+        return entry["name"], entry["path"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _write_font_cache(cache_path, candidates, name, path):
+    cached = _load_font_cache(cache_path)
+    cached[_cache_key(candidates)] = {"name": name, "path": path}
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cached, f, ensure_ascii=False)
+    except OSError:
+        pass  # 缓存写不进去只影响下次启动的速度
+
+
+def find_cjk_font(candidates: Sequence[str] = CJK_FONTS, cache_path: str = FONT_CACHE):
+    """按候选顺序返回第一个可用中文字体的 (名称, 文件路径)，都没有时返回 None"""
+    cached = _read_font_cache(cache_path, candidates)
+    if cached and os.path.exists(cached[1]):
+        return cached
+
+    import matplotlib.font_manager as fm
+    font_paths = {}
+    for entry in fm.fontManager.ttflist:
+        font_paths.setdefault(entry.name, entry.fname)
+    for name in candidates:
+        if name in font_paths:
+            _write_font_cache(cache_path, candidates, name, font_paths[name])
+            return name, font_paths[name]
+    return None
+
+
+def setup_cjk_font(candidates: Sequence[str] = CJK_FONTS, cache_path: str = FONT_CACHE) -> Optional[str]:
+    """把 matplotlib 默认字体设为可用的中文字体，返回字体名；找不到时不做改动并返回 None"""
+    import matplotlib
+    try:
+        found = find_cjk_font(candidates, cache_path)
+    except Exception as e:
+        print(f"字体配置错误: {e}")
+        return None
+    if found is None:
+        return None
+    matplotlib.rcParams["font.family"] = found[0]
+    return found[0]
+
+
+def create_tk_chart(parent, figsize=(2.8, 3), dpi=100, candidates: Sequence[str] = CJK_FONTS):
+    """在 Tk 容器 parent 中建一个单坐标轴图表，返回 (fig, ax, canvas)"""
+    import matplotlib
+    matplotlib.use("TkAgg")
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+
+    setup_cjk_font(candidates)
+    fig = Figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot(111)
+    canvas = FigureCanvasTkAgg(fig, parent)
+    canvas.get_tk_widget().pack(fill="both", expand=True)
+    return fig, ax, canvas
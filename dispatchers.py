@@ -0,0 +1,184 @@
+"""ElevatorEngine 的派梯策略
+
+每个时间单位 ElevatorEngine.assign_elevators() 先释放已被服务的呼梯，再调用 dispatcher.assign(engine)，
+策略通过 engine.assign_call(elevator, floor, direction) 把尚未指派的呼梯交给某部电梯：
+
+    engine = ElevatorEngine(seed=1, dispatcher=CostDispatcher(load_weight=1.0))
+
+NearestIdleDispatcher 是原先的规则，也是引擎的默认策略：只在完全空闲的电梯中选最近的一部。
+CostDispatcher 对所有可派电梯（含运行中、将顺路经过该楼层的电梯）估算到达时间择优，需显式选用：
+它缩短了长尾等待，但在部分配置下平均等待比原规则略长。
+楼层一律为下标（0 为顶层），"up" 即下标减小的方向。
+"""
+import bisect
+import math
+from typing import Dict, Iterator, List, Tuple
+
+DIRECTIONS = ("up", "down")
+OPPOSITE = {"up": "down", "down": "up"}
+
+
+def pending_calls(engine) -> List[Tuple[int, str]]:
+    """尚未指派给任何电梯的呼梯 (楼层, 方向)，按楼层下标升序"""
+    calls = []
+    for direction in DIRECTIONS:
+        mask = engine.hall_calls.masks[direction] & ~engine.assigned_calls.masks[direction]
+        while mask:
+            low = mask & -mask
+            calls.append((low.bit_length() - 1, direction))
+            mask ^= low
+    calls.sort()
+    return calls
+
+
+def can_dispatch(elevator) -> bool:
+    return not elevator.resetting and not elevator.emergency_reset
+
+
+class Dispatcher:
+    """派梯策略基类"""
+
+    def assign(self, engine):
+        raise NotImplementedError
+
+
+class NearestIdleDispatcher(Dispatcher):
+    """只把呼梯派给空闲且没有目标的电梯，取楼层距离最近的一部，每部电梯每轮最多接一个呼梯"""
+
+    def assign(self, engine):
+        candidates = [e for e in engine.elevators
+                      if e.direction == "idle" and not e.target_floors and can_dispatch(e)]
+        if not candidates:
+            return
+        for floor, direction in pending_calls(engine):
+            best_elevator = None
+            min_dist = math.inf
+            for elevator in candidates:
+                if floor not in elevator.allowed_set:
+                    continue
+                dist = abs(floor - elevator.current_floor)
+                if dist < min_dist:
+                    min_dist = dist
+                    best_elevator = elevator
+            if best_elevator:
+                engine.assign_call(best_elevator, floor, direction)
+                candidates.remove(best_elevator)
+                if not candidates:
+                    return
+
+
+class CarIndex:
+    """按运行方向（idle/up/down）分组、组内按所在楼层排序的电梯索引
+
+    每轮分配前用 O(E log E) 重建一次；nearest() 从呼梯楼层向两侧展开，按楼层距离由近及远产出电梯，
+    配合"到达时间不小于楼层距离"这一下界，较远的电梯不必逐个计算代价。
+    """
+
+    def __init__(self, elevators):
+        groups: Dict[str, list] = {"idle": [], "up": [], "down": []}
+        for elevator in elevators:
+            groups[elevator.direction].append(elevator)
+        self.cars = {}
+        self.floors = {}
+        for direction, cars in groups.items():
+            cars.sort(key=lambda e: (e.current_floor, e.eid))
+            self.cars[direction] = cars
+            self.floors[direction] = [e.current_floor for e in cars]
+
+    def remove(self, elevator):
+        for direction, cars in self.cars.items():
+            if elevator in cars:
+                i = cars.index(elevator)
+                del cars[i]
+                del self.floors[direction][i]
+                return
+
+    def nearest(self, direction: str, floor: int) -> Iterator[Tuple[int, object]]:
+        cars, floors = self.cars[direction], self.floors[direction]
+        hi = bisect.bisect_left(floors, floor)
+        lo = hi - 1
+        while lo >= 0 or hi < len(cars):
+            if hi >= len(cars) or (lo >= 0 and floor - floors[lo] <= floors[hi] - floor):
+                yield floor - floors[lo], cars[lo]
+                lo -= 1
+            else:
+                yield floors[hi] - floor, cars[hi]
+                hi += 1
+
+
+class CostDispatcher(Dispatcher):
+    """按估算到达时间（ETA，单位为时间单位）为每个新呼梯选电梯
+
+    ETA = 剩余开门时间 + 行程层数 + 途中停靠次数 × door_time + load_weight × 车内人数：
+    同向且尚未经过该楼层的电梯直接驶来，只计途中的停靠；其余电梯要先走到当前方向上最远的任务再折返，
+    途中停靠按全部待办停靠计；同向但已经过的还要再折返一次，另加 reversal_penalty。
+    需要折返的代价再乘以 detour_weight：绕路会推迟车上乘客，宁可派空闲的电梯。
+    本轮开始时空闲的电梯每轮最多接一个呼梯，避免一部电梯揽下多处呼梯而其余电梯闲着。
+    满载、复位中或不停靠该楼层的电梯不参与。已指派的呼梯保持不变，直到被服务或该电梯不再可派。
+    """
+
+    def __init__(self, door_time: int = 3, load_weight: float = 0.5, reversal_penalty: float = 6,
+                 detour_weight: float = 2.0):
+        self.door_time = door_time
+        self.load_weight = load_weight
+        self.reversal_penalty = reversal_penalty
+        self.detour_weight = detour_weight
+
+    def assign(self, engine):
+        calls = pending_calls(engine)
+        if not calls:
+            return
+        index = CarIndex(e for e in engine.elevators
+                         if can_dispatch(e) and len(e.passengers) < e.max_capacity)
+        stops: Dict[int, set] = {}
+        fresh = {e.eid for e in index.cars["idle"] if not e.target_floors}
+        for floor, direction in calls:
+            best, best_cost = None, math.inf
+            # 先看同向和空闲的电梯，尽早得到较小的代价上界，反向运行的电梯大多可直接剪掉
+            for group in (direction, "idle", OPPOSITE[direction]):
+                for dist, elevator in index.nearest(group, floor):
+                    # detour_weight ≥ 1 时 ETA 不小于楼层距离，更远的电梯不可能更优
+                    if dist > best_cost:
+                        break
+                    if floor not in elevator.allowed_set:
+                        continue
+                    if elevator.eid not in stops:
+                        stops[elevator.eid] = self.pending_stops(elevator)
+                    cost = self.eta(elevator, stops[elevator.eid], floor, direction)
+                    if cost < best_cost or (best is not None and cost == best_cost and elevator.eid < best.eid):
+                        best, best_cost = elevator, cost
+            if best is not None:
+                engine.assign_call(best, floor, direction)
+                stops[best.eid].add(floor)
+                if best.eid in fresh:
+                    fresh.discard(best.eid)
+                    index.remove(best)
+
+    @staticmethod
+    def pending_stops(elevator) -> set:
+        stops = set(elevator.target_floors)
+        stops.update(p.target_floor for p in elevator.passengers)
+        return stops
+
+    def eta(self, elevator, stops, floor: int, direction: str) -> float:
+        position = elevator.current_floor
+        cost = self.load_weight * len(elevator.passengers)
+        if elevator.door_open:
+            cost += self.door_time - elevator.door_timer
+        if elevator.direction == "idle":
+            return cost + abs(floor - position) + len(stops) * self.door_time
+        # 沿运行方向度量：ahead > 0 表示呼梯楼层在前方
+        sign = -1 if elevator.direction == "up" else 1
+        ahead = (floor - position) * sign
+        if ahead > 0 and direction == elevator.direction:
+            on_way = sum(1 for s in stops if 0 < (s - position) * sign < ahead)
+            return cost + ahead + on_way * self.door_time
+        # 先走到前方最远的任务处掉头，再折返到呼梯楼层
+        reach = max([(s - position) * sign for s in stops] + [ahead, 0])
+        detour = reach + (reach - ahead) + len(stops) * self.door_time
+        if direction == elevator.direction:
+            detour += self.reversal_penalty
+        return cost + detour * self.detour_weight
+
+
+DISPATCHERS = {"cost": CostDispatcher, "nearest_idle": NearestIdleDispatcher}
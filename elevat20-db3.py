@@ -3,11 +3,7 @@ from tkinter import messagebox
 import random
 from collections import deque
 from typing import List, Dict, Deque
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import numpy as np
+from chart_support import create_tk_chart
 
 class Passenger:
     def __init__(self, current_floor: str, target_floor: str, direction: str):
@@ -168,10 +164,10 @@ class ElevatorSystemGUI:
                                   relief=tk.SUNKEN, bd=1)
         self.chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        self.fig = Figure(figsize=(2.8, 3), dpi=100)
-        self.ax = self.fig.add_subplot(111)
-        self.canvas_chart = FigureCanvasTkAgg(self.fig, self.chart_frame)
-        self.canvas_chart.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # 图表在第一次开始仿真时才创建，启动时不导入 matplotlib
+        self.fig = None
+        self.ax = None
+        self.canvas_chart = None
         
         # 变量初始化
         self.elevator_floors = None
@@ -186,6 +182,11 @@ class ElevatorSystemGUI:
         # 绑定窗口缩放事件
         self.master.bind("<Configure>", self.on_window_resize)
 
+    def ensure_chart(self):
+        """首次画图时创建图表（此时才导入 matplotlib 并查找中文字体）"""
+        if self.ax is None:
+            self.fig, self.ax, self.canvas_chart = create_tk_chart(self.chart_frame)
+
     def create_hover_button(self, parent, text, command):
         """创建带悬停效果的按钮"""
         button = tk.Button(parent, text=text, command=command,
@@ -298,6 +299,7 @@ class ElevatorSystemGUI:
         self.passenger_stats = {"total": 0, "boarded": 0, "wait_times": []}
         
         # 初始化图表
+        self.ensure_chart()
         self.ax.clear()
         self.ax.set_facecolor(self.colors["bg_main"] if not self.dark_mode else self.colors["dark_bg"])
         self.ax.tick_params(axis='both', colors=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
@@ -627,7 +629,7 @@ class ElevatorSystemGUI:
         # 更新图表
         if self.passenger_stats["wait_times"]:
             self.ax.clear()
-            x = np.arange(1, len(self.passenger_stats["wait_times"]) + 1)
+            x = range(1, len(self.passenger_stats["wait_times"]) + 1)
             y = self.passenger_stats["wait_times"]
             self.ax.plot(x, y, 'o-', color=self.colors["elevator_up"], alpha=0.7, linewidth=1.5)
             self.ax.set_ylim(0, max(y) + 5 if y else 10)
@@ -3,18 +3,19 @@ from tkinter import messagebox
 import random
 from collections import deque
 from typing import List, Dict, Deque
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import numpy as np
 import time
 
-# 配置matplotlib中文字体支持
-import matplotlib.font_manager as fm
+from blit_chart import BlitChart
+from chart_support import create_tk_chart
+from streaming_stats import StreamingStats
+
+# 图表中文字体的候选，按优先顺序
+CHINESE_FONTS = ('SimHei', 'WenQuanYi Micro Hei', 'Heiti TC', 'Microsoft YaHei', 'SimSun')
 
 class Passenger:
-    def __init__(self, current_floor: str, target_floor: str, direction: str):
+    __slots__ = ("current_floor", "target_floor", "direction", "waiting_time", "id")
+
+    def __init__(self, current_floor: int, target_floor: int, direction: str):
         self.current_floor = current_floor
         self.target_floor = target_floor
         self.direction = direction
@@ -22,18 +23,27 @@ class Passenger:
         self.id = id(self)  # 唯一标识乘客
 
 class Elevator:
-    def __init__(self, eid: int, allowed_floors: List[str], max_capacity: int):
+    __slots__ = ("eid", "current_floor", "allowed_floors", "allowed_set", "max_capacity", "direction",
+                 "passengers", "target_floors", "status", "current_y", "door_open", "door_timer",
+                 "from_y", "to_y", "move_step")
+
+    def __init__(self, eid: int, allowed_floors: List[int], max_capacity: int):
         self.eid = eid
-        self.current_floor = allowed_floors[0]
+        self.current_floor = allowed_floors[0]  # 楼层下标（0 为顶层）
         self.allowed_floors = allowed_floors
+        self.allowed_set = frozenset(allowed_floors)
         self.max_capacity = max_capacity
         self.direction = "idle"  # up, down, idle
         self.passengers: List[Passenger] = []
         self.target_floors = deque()
         self.status = "idle"
-        self.current_y = 40 + allowed_floors.index(self.current_floor) * 40  # 电梯Y坐标
+        self.current_y = 40 + self.current_floor * 40  # 电梯Y坐标
         self.door_open = False
         self.door_timer = 0
+        # 移动动画的起止Y坐标，None 表示当前没有动画
+        self.from_y = None
+        self.to_y = None
+        self.move_step = 0
 
 class ElevatorSystemGUI:
     def __init__(self, master):
@@ -64,6 +74,10 @@ class ElevatorSystemGUI:
         
         self.running = False
         self.timer = None
+        # 图表按自己的节拍（比仿真步长更慢）刷新，只在有新完成乘客时 blit 折线
+        self.chart_timer = None
+        self.chart_interval = 1000
+        self.charted_count = -1
         self.elevator_animations = {}  # 存储电梯动画状态
         self.use_real_time = False     # 是否使用真实时间
         self.last_real_time_update = 0 # 上次更新真实时间的时间戳
@@ -179,47 +193,45 @@ class ElevatorSystemGUI:
                                   relief=tk.SUNKEN, bd=1)
         self.chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        self.fig = Figure(figsize=(2.8, 3), dpi=100)
-        self.ax = self.fig.add_subplot(111)
-        self.canvas_chart = FigureCanvasTkAgg(self.fig, self.chart_frame)
-        self.canvas_chart.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # 图表在第一次开始仿真时才创建（见 ensure_chart），启动时不导入 matplotlib、不查找字体
+        self.fig = None
+        self.ax = None
+        self.canvas_chart = None
+        self.chart = None
+        self.wait_line = None
         
         # 变量初始化
         self.elevator_floors = None
         self.floors = []
         self.elevators = []
-        self.waiting_passengers: Dict[str, Dict[str, Deque[Passenger]]] = {}
+        self.floor_index: Dict[str, int] = {}
+        self.waiting_passengers: List[Dict[str, Deque[Passenger]]] = []
         self.time = 360  # 6:00
         self.peak_periods = {}
         self.passenger_history = []
-        self.passenger_stats = {"total": 0, "boarded": 0, "wait_times": []}
+        self.passenger_stats = {"total": 0, "boarded": 0}
+        # 等待时间流式统计；图表只画最近若干位乘客，内存不随运行时长增长
+        self.wait_stats = StreamingStats(resolution=1)
+        self.recent_waits = deque(maxlen=200)
         
         # 绑定窗口缩放事件
         self.master.bind("<Configure>", self.on_window_resize)
-        
-        # 配置matplotlib字体
-        self.setup_matplotlib_fonts()
 
-    def setup_matplotlib_fonts(self):
-        """配置matplotlib支持中文显示"""
-        try:
-            # 获取系统中可用的中文字体
-            font_names = [f.name for f in fm.fontManager.ttflist]
-            # 尝试几种常见的中文字体
-            chinese_fonts = ['SimHei', 'WenQuanYi Micro Hei', 'Heiti TC', 'Microsoft YaHei', 'SimSun']
-            available_font = None
-            for font in chinese_fonts:
-                if font in font_names:
-                    available_font = font
-                    break
-            if available_font:
-                matplotlib.rcParams["font.family"] = available_font
-                print(f"已设置matplotlib字体为: {available_font}")
-            else:
-                print("未找到中文字体，将使用默认字体。图表中的中文可能无法正确显示。")
-                print("可用字体列表:", font_names)
-        except Exception as e:
-            print(f"字体配置错误: {e}")
+    def ensure_chart(self):
+        """首次画图时创建图表，此时才导入 matplotlib 并按 CHINESE_FONTS 配置字体"""
+        if self.chart is None:
+            self.fig, self.ax, self.canvas_chart = create_tk_chart(self.chart_frame, candidates=CHINESE_FONTS)
+            self.chart = BlitChart(self.canvas_chart)
+            self.report_matplotlib_font()
+
+    def report_matplotlib_font(self):
+        """报告图表实际使用的字体（查找结果缓存在磁盘上，之后启动不再扫描字体列表）"""
+        import matplotlib
+        family = matplotlib.rcParams["font.family"]
+        if family and family[0] in CHINESE_FONTS:
+            print(f"已设置matplotlib字体为: {family[0]}")
+        else:
+            print("未找到中文字体，将使用默认字体。图表中的中文可能无法正确显示。")
 
     def create_hover_button(self, parent, text, command):
         """创建带悬停效果的按钮"""
@@ -320,13 +332,19 @@ class ElevatorSystemGUI:
         # 修正楼层排序：地下层从上到下为B1-Bn
         self.floors = [f"F{i}" for i in range(n_up, 0, -1)] + ["0"] + [f"B{i}" for i in range(1, n_down+1)]
         
+        # 内部一律使用楼层下标，楼层名只在绘制和统计显示时使用
+        self.floor_index = {f: i for i, f in enumerate(self.floors)}
+        
         if self.elevator_floors is None:
             self.elevator_floors = [self.floors for _ in range(n_elev)]
         
-        self.elevators = [Elevator(i+1, self.elevator_floors[i], capacity) for i in range(n_elev)]
+        self.elevators = []
+        for i in range(n_elev):
+            allowed = sorted(self.floor_index[f] for f in self.elevator_floors[i] if f in self.floor_index)
+            self.elevators.append(Elevator(i+1, allowed or list(range(len(self.floors))), capacity))
         
-        # 初始化等待乘客数据结构：每个楼层分为上行和下行队列
-        self.waiting_passengers = {f: {"up": deque(), "down": deque()} for f in self.floors}
+        # 初始化等待乘客数据结构：每个楼层（按下标）分为上行和下行队列
+        self.waiting_passengers = [{"up": deque(), "down": deque()} for _ in self.floors]
         
         if not self.use_real_time:
             self.time = 360  # 6:00
@@ -340,20 +358,19 @@ class ElevatorSystemGUI:
             "evening": self.parse_peak_period(self.peak_evening_var.get())
         }
         self.passenger_history = []
-        self.passenger_stats = {"total": 0, "boarded": 0, "wait_times": []}
+        self.passenger_stats = {"total": 0, "boarded": 0}
+        self.wait_stats.clear()
+        self.recent_waits.clear()
         
-        # 初始化图表
+        # 初始化图表：坐标轴样式和折线只建一次，之后只更新折线数据
+        self.ensure_chart()
         self.ax.clear()
-        self.ax.set_facecolor(self.colors["bg_main"] if not self.dark_mode else self.colors["dark_bg"])
-        self.ax.tick_params(axis='both', colors=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
-        self.ax.spines['left'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-        self.ax.spines['right'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-        self.ax.spines['top'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-        self.ax.spines['bottom'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-        self.ax.set_title("乘客等待时间", color=self.colors["fg_highlight"] if not self.dark_mode else "#93c5fd")
-        self.ax.set_xlabel("乘客编号", color=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
-        self.ax.set_ylabel("等待时间(分钟)", color=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
-        self.canvas_chart.draw()
+        self.chart.clear()
+        self.style_chart()
+        self.wait_line = self.chart.add(self.ax.plot([], [], 'b-', linewidth=1)[0])
+        self.ax.set_xlim(0, self.recent_waits.maxlen)
+        self.ax.set_ylim(0, 10)
+        self.chart.redraw()
         
         # 初始化画布
         self.canvas.delete("all")
@@ -373,7 +390,9 @@ class ElevatorSystemGUI:
         self.time_mode_btn.config(state=tk.NORMAL)
         self.status_label.config(text="仿真运行中..." if not self.use_real_time else "真实时间运行中...")
         self.last_real_time_update = time.time()
+        self.charted_count = -1
         self.update_simulation()
+        self.refresh_chart()
 
     def stop_simulation(self):
         """停止仿真"""
@@ -385,7 +404,11 @@ class ElevatorSystemGUI:
         if self.timer:
             self.master.after_cancel(self.timer)
             self.timer = None
+        if self.chart_timer:
+            self.master.after_cancel(self.chart_timer)
+            self.chart_timer = None
         self.update_stats()
+        self.update_chart()
 
     def toggle_time_mode(self):
         """切换时间模式（仿真时间/真实时间）"""
@@ -408,10 +431,13 @@ class ElevatorSystemGUI:
     def generate_passengers(self):
         """生成乘客"""
         base_rate = 0.01 if not self.is_peak() else 0.06
+        n_floors = len(self.floors)
+        low_floors = range(n_floors)[-6:]   # 假设最后6层为高层
+        other_floors = range(n_floors)[:-6]
         
-        for floor in self.floors:
+        for floor in range(n_floors):
             if random.random() < base_rate:
-                possible_targets = [f for f in self.floors if f != floor]
+                possible_targets = [f for f in range(n_floors) if f != floor]
                 current_minute = self.time % 1440
                 peak = False
                 direction = ""
@@ -419,20 +445,20 @@ class ElevatorSystemGUI:
                 
                 # 高峰时段特殊处理
                 if current_minute in range(*self.peak_periods.get("morning", (0, 0))):
-                    if floor in self.floors[-6:]:  # 假设最后6层为高层
-                        target = random.choice(self.floors[:-6])
+                    if floor in low_floors:
+                        target = random.choice(other_floors)
                         direction = "up"
                         peak = True
                 elif current_minute in range(*self.peak_periods.get("evening", (0, 0))):
-                    if floor in self.floors[:-6]:
-                        target = random.choice(self.floors[-6:])
+                    if floor in other_floors:
+                        target = random.choice(low_floors)
                         direction = "down"
                         peak = True
                 
                 # 非高峰时段随机方向
                 if not peak:
                     target = random.choice(possible_targets)
-                    direction = "up" if self.floors.index(target) < self.floors.index(floor) else "down"
+                    direction = "up" if target < floor else "down"
                 
                 p = Passenger(floor, target, direction)
                 self.waiting_passengers[floor][direction].append(p)
@@ -442,13 +468,13 @@ class ElevatorSystemGUI:
     def step_elevators(self):
         """电梯运行逻辑"""
         # 计算各楼层等待情况
-        floor_waits = {}
-        for floor in self.floors:
-            up_count = len(self.waiting_passengers[floor]["up"])
-            down_count = len(self.waiting_passengers[floor]["down"])
-            up_wait = sum(p.waiting_time for p in self.waiting_passengers[floor]["up"])
-            down_wait = sum(p.waiting_time for p in self.waiting_passengers[floor]["down"])
-            floor_waits[floor] = (up_wait + down_wait, up_count + down_count, up_count, down_count)
+        floor_waits = []
+        for queues in self.waiting_passengers:
+            up_count = len(queues["up"])
+            down_count = len(queues["down"])
+            up_wait = sum(p.waiting_time for p in queues["up"])
+            down_wait = sum(p.waiting_time for p in queues["down"])
+            floor_waits.append((up_wait + down_wait, up_count + down_count, up_count, down_count))
         
         for elevator in self.elevators:
             # 处理电梯门状态
@@ -466,7 +492,8 @@ class ElevatorSystemGUI:
                     elevator.passengers.remove(p)
                     if p in self.passenger_history:
                         self.passenger_stats["boarded"] += 1
-                        self.passenger_stats["wait_times"].append(p.waiting_time)
+                        self.wait_stats.add(p.waiting_time)
+                        self.recent_waits.append(p.waiting_time)
                 elevator.door_open = True  # 开门
                 continue
             
@@ -524,9 +551,8 @@ class ElevatorSystemGUI:
             next_dest = None
             if elevator.passengers:
                 # 根据车内乘客目标确定方向
-                targets = [self.floors.index(p.target_floor) for p in elevator.passengers]
-                avg_target = sum(targets) / len(targets)
-                curr_idx = self.floors.index(elevator.current_floor)
+                avg_target = sum(p.target_floor for p in elevator.passengers) / len(elevator.passengers)
+                curr_idx = elevator.current_floor
                 if avg_target < curr_idx:
                     elevator.direction = "up"
                 elif avg_target > curr_idx:
@@ -545,8 +571,8 @@ class ElevatorSystemGUI:
                 if candidates:
                     candidates.sort(key=lambda x: (-x[1], -x[2]))  # 按等待时间和人数排序
                     next_dest = candidates[0][0]
-                    curr_idx = self.floors.index(elevator.current_floor)
-                    target_idx = self.floors.index(next_dest)
+                    curr_idx = elevator.current_floor
+                    target_idx = next_dest
                     if target_idx < curr_idx:
                         elevator.direction = "up"
                     elif target_idx > curr_idx:
@@ -559,17 +585,17 @@ class ElevatorSystemGUI:
             # 记录移动前位置用于动画
             if elevator.direction in ["up", "down"]:
                 elevator.from_y = elevator.current_y
-                curr_idx = self.floors.index(elevator.current_floor)
-                if elevator.direction == "up" and curr_idx > 0 and self.floors[curr_idx-1] in elevator.allowed_floors:
-                    elevator.current_floor = self.floors[curr_idx-1]
-                elif elevator.direction == "down" and curr_idx < len(self.floors)-1 and self.floors[curr_idx+1] in elevator.allowed_floors:
-                    elevator.current_floor = self.floors[curr_idx+1]
-                elevator.to_y = 40 + self.floors.index(elevator.current_floor) * 40
+                curr_idx = elevator.current_floor
+                if elevator.direction == "up" and curr_idx > 0 and curr_idx-1 in elevator.allowed_set:
+                    elevator.current_floor = curr_idx-1
+                elif elevator.direction == "down" and curr_idx < len(self.floors)-1 and curr_idx+1 in elevator.allowed_set:
+                    elevator.current_floor = curr_idx+1
+                elevator.to_y = 40 + elevator.current_floor * 40
                 elevator.move_step = 0
 
     def animate_elevator_movement(self, elevator):
         """电梯移动动画"""
-        if not hasattr(elevator, 'from_y') or not hasattr(elevator, 'to_y'):
+        if elevator.from_y is None or elevator.to_y is None:
             return
         
         step = 5  # 动画步长
@@ -592,10 +618,8 @@ class ElevatorSystemGUI:
             if elevator.eid in self.elevator_animations:
                 self.master.after_cancel(self.elevator_animations[elevator.eid])
                 del self.elevator_animations[elevator.eid]
-            if hasattr(elevator, 'from_y'):
-                del elevator.from_y
-            if hasattr(elevator, 'to_y'):
-                del elevator.to_y
+            elevator.from_y = None
+            elevator.to_y = None
 
     def draw_static(self):
         """绘制静态背景"""
@@ -626,7 +650,7 @@ class ElevatorSystemGUI:
                 y = elevator.current_y
             except AttributeError:
                 # 如果没有current_y属性，使用默认值
-                y = 40 + self.floors.index(elevator.current_floor) * 40
+                y = 40 + elevator.current_floor * 40
             
             x = 60 + eid * 80
             
@@ -680,10 +704,10 @@ class ElevatorSystemGUI:
         
         # 绘制各楼层等待乘客
         self.canvas.delete("passengers")
-        for i, floor in enumerate(self.floors):
+        for i, queues in enumerate(self.waiting_passengers):
             y = 40 + i * 40
-            up_count = len(self.waiting_passengers[floor]["up"])
-            down_count = len(self.waiting_passengers[floor]["down"])
+            up_count = len(queues["up"])
+            down_count = len(queues["down"])
             
             # 绘制等待乘客的信息框
             box_x = 60 + n_elev * 80 + 10
@@ -748,40 +772,64 @@ class ElevatorSystemGUI:
         
         total = self.passenger_stats["total"]
         boarded = self.passenger_stats["boarded"]
-        avg_wait = sum(self.passenger_stats["wait_times"]) / len(self.passenger_stats["wait_times"]) if self.passenger_stats["wait_times"] else 0
+        wait = self.wait_stats.summary()
         
         self.stats_text.insert(tk.END, f"总乘客数: {total}\n")
         self.stats_text.insert(tk.END, f"已运送: {boarded}\n")
         self.stats_text.insert(tk.END, f"等待中: {total - boarded}\n\n")
-        self.stats_text.insert(tk.END, f"平均等待时间: {avg_wait:.1f} 分钟\n\n")
+        self.stats_text.insert(tk.END, f"平均等待时间: {wait['avg']:.1f} 分钟\n")
+        self.stats_text.insert(tk.END, f"P50/P90/P99/最长: {wait['p50']:.0f}/{wait['p90']:.0f}/{wait['p99']:.0f}/{wait['max']:.0f} 分钟\n\n")
         
         # 电梯状态
         for i, elevator in enumerate(self.elevators):
             status = "上行" if elevator.direction == "up" else "下行" if elevator.direction == "down" else "空闲"
-            self.stats_text.insert(tk.END, f"电梯 {i+1}: {elevator.current_floor} 层 ({status})\n")
+            self.stats_text.insert(tk.END, f"电梯 {i+1}: {self.floors[elevator.current_floor]} 层 ({status})\n")
             self.stats_text.insert(tk.END, f"  乘客数: {len(elevator.passengers)}/{elevator.max_capacity}\n")
         
         self.stats_text.config(state=tk.DISABLED)
-        
-        # 更新图表
-        if self.passenger_stats["wait_times"]:
-            self.ax.clear()
-            self.ax.set_facecolor(self.colors["bg_main"] if not self.dark_mode else self.colors["dark_bg"])
-            self.ax.tick_params(axis='both', colors=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
-            self.ax.spines['left'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-            self.ax.spines['right'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-            self.ax.spines['top'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-            self.ax.spines['bottom'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
-            self.ax.set_title("乘客等待时间", color=self.colors["fg_highlight"] if not self.dark_mode else "#93c5fd")
-            self.ax.set_xlabel("乘客编号", color=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
-            self.ax.set_ylabel("等待时间(分钟)", color=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
-            
-            x = list(range(1, len(self.passenger_stats["wait_times"]) + 1))
-            y = self.passenger_stats["wait_times"]
-            self.ax.plot(x, y, 'b-', linewidth=1)
-            self.ax.set_xlim(0, max(10, len(x)))
-            self.ax.set_ylim(0, max(5, max(y) + 2) if y else 10)
-            self.canvas_chart.draw()
+
+    def style_chart(self):
+        """按当前配色设置图表坐标轴（只在初始化和切换深色模式时调用）"""
+        self.ax.set_facecolor(self.colors["bg_main"] if not self.dark_mode else self.colors["dark_bg"])
+        self.ax.tick_params(axis='both', colors=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
+        self.ax.spines['left'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
+        self.ax.spines['right'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
+        self.ax.spines['top'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
+        self.ax.spines['bottom'].set_color(self.colors["grid_line"] if not self.dark_mode else "#475569")
+        self.ax.set_title("乘客等待时间", color=self.colors["fg_highlight"] if not self.dark_mode else "#93c5fd")
+        self.ax.set_xlabel("乘客编号", color=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
+        self.ax.set_ylabel("等待时间(分钟)", color=self.colors["fg_text"] if not self.dark_mode else self.colors["dark_fg"])
+
+    def update_chart(self):
+        """更新等待时间折线；坐标范围留有余量，超出时才调整并全量重绘，否则只 blit 折线"""
+        if not self.recent_waits or self.wait_line is None:
+            return
+        # 只画最近 recent_waits.maxlen 位乘客，横轴仍为乘客编号
+        first = self.wait_stats.count - len(self.recent_waits) + 1
+        x = list(range(first, self.wait_stats.count + 1))
+        y = list(self.recent_waits)
+        self.wait_line.set_data(x, y)
+        x_max = self.ax.get_xlim()[1]
+        y_max = self.ax.get_ylim()[1]
+        if x[-1] > x_max:
+            # 窗口右移：左端对齐仍在 recent_waits 中的最早一位乘客，右侧留 1/4 余量
+            self.ax.set_xlim(x[0], x[-1] + self.recent_waits.maxlen // 4)
+            self.ax.set_ylim(0, max(5, max(y) + 2))
+            self.chart.redraw()
+        elif max(y) + 2 > y_max:
+            self.ax.set_ylim(0, (max(y) + 2) * 1.5)
+            self.chart.redraw()
+        else:
+            self.chart.refresh()
+
+    def refresh_chart(self):
+        """图表刷新节拍，与仿真节拍分开"""
+        if not self.running:
+            return
+        if self.wait_stats.count != self.charted_count:
+            self.charted_count = self.wait_stats.count
+            self.update_chart()
+        self.chart_timer = self.master.after(self.chart_interval, self.refresh_chart)
 
     def update_simulation(self):
         """更新仿真状态"""
@@ -792,10 +840,10 @@ class ElevatorSystemGUI:
         self.update_time()
         
         # 增加所有乘客的等待时间
-        for floor in self.floors:
-            for p in self.waiting_passengers[floor]["up"]:
+        for queues in self.waiting_passengers:
+            for p in queues["up"]:
                 p.waiting_time += 1
-            for p in self.waiting_passengers[floor]["down"]:
+            for p in queues["down"]:
                 p.waiting_time += 1
         
         # 生成新乘客
@@ -864,7 +912,10 @@ class ElevatorSystemGUI:
         # 更新画布背景
         self.canvas.configure(bg=self.colors["dark_bg"] if self.dark_mode else self.colors["bg_main"])
         
-        # 更新图表
+        # 更新图表（尚未开始仿真时图表还没有创建）
+        if self.chart is not None:
+            self.style_chart()
+            self.chart.redraw()
         self.update_stats()
 
 if __name__ == "__main__":
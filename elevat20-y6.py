@@ -5,17 +5,18 @@ from collections import deque
 from typing import List, Dict
 
 class Passenger:
-    def __init__(self, current_floor: str, target_floor: str, direction: str):
+    def __init__(self, current_floor: int, target_floor: int, direction: str):
         self.current_floor = current_floor
         self.target_floor = target_floor
         self.direction = direction
         self.waiting_time = 0
 
 class Elevator:
-    def __init__(self, eid: int, allowed_floors: List[str], max_capacity: int):
+    def __init__(self, eid: int, allowed_floors: List[int], max_capacity: int):
         self.eid = eid
-        self.current_floor = allowed_floors[0]
+        self.current_floor = allowed_floors[0]  # 楼层下标（0 为顶层）
         self.allowed_floors = allowed_floors
+        self.allowed_set = frozenset(allowed_floors)
         self.max_capacity = max_capacity
         self.direction = "idle"  # up, down, idle
         self.passengers: List[Passenger] = []
@@ -37,10 +38,10 @@ class Elevator:
     def get_passenger_text(self):
         return f"{len(self.passengers)}/{self.max_capacity}"
 
-    def get_target_floors_text(self):
+    def get_target_floors_text(self, floors: List[str]):
         if not self.target_floors:
             return "无"
-        return "→".join([f for f in self.target_floors])
+        return "→".join([floors[f] for f in self.target_floors])
 
 class ElevatorSystemGUI:
     def __init__(self, master):
@@ -99,7 +100,8 @@ class ElevatorSystemGUI:
         self.elevator_floors = None
         self.floors = []
         self.elevators = []
-        self.waiting_passengers: Dict[str, deque] = {}
+        self.floor_index: Dict[str, int] = {}
+        self.waiting_passengers: List[deque] = []
         self.time = 360  # 6:00 (6小时 * 60分钟)
         self.peak_periods = {}
         self.passenger_history = []
@@ -156,8 +158,13 @@ class ElevatorSystemGUI:
         if self.elevator_floors is None:
             self.elevator_floors = [all_floors for _ in range(n_elev)]
         self.floors = all_floors
-        self.elevators = [Elevator(i+1, self.elevator_floors[i], capacity) for i in range(n_elev)]
-        self.waiting_passengers = {f: deque() for f in self.floors}
+        # 内部一律使用楼层下标，楼层名只在绘制时使用
+        self.floor_index = {f: i for i, f in enumerate(self.floors)}
+        self.elevators = []
+        for i in range(n_elev):
+            allowed = sorted(self.floor_index[f] for f in self.elevator_floors[i] if f in self.floor_index)
+            self.elevators.append(Elevator(i+1, allowed or list(range(len(self.floors))), capacity))
+        self.waiting_passengers = [deque() for _ in self.floors]
         self.time = 360  # 6:00 (6小时 * 60分钟)
         self.peak_periods = {
             "morning": self.parse_peak_period(self.peak_morning_var.get()),
@@ -208,32 +215,35 @@ class ElevatorSystemGUI:
 
     def generate_passengers(self):
         base_rate = 0.01 if not self.is_peak() else 0.06
-        for floor in self.floors:
+        n_floors = len(self.floors)
+        zero_idx = self.floor_index["0"]
+        basement_floors = range(n_floors)[-(n_floors-zero_idx-1):]  # 地下楼层
+        upper_floors = range(zero_idx)  # 地上楼层
+        for floor in range(n_floors):
             if random.random() < base_rate:
-                possible_targets = [f for f in self.floors if f != floor]
+                possible_targets = [f for f in range(n_floors) if f != floor]
                 t = self.time % 1440
                 peak = False
                 if (self.peak_periods["morning"][0] <= t < self.peak_periods["morning"][1]):
-                    if floor in self.floors[-(len(self.floors)-self.floors.index("0")-1):]:  # 地下楼层
-                        target = random.choice(self.floors[:self.floors.index("0")])  # 地上楼层
+                    if floor in basement_floors:
+                        target = random.choice(upper_floors)
                         direction = "up"
                         peak = True
                 elif (self.peak_periods["evening"][0] <= t < self.peak_periods["evening"][1]):
-                    if floor in self.floors[:self.floors.index("0")]:  # 地上楼层
-                        target = random.choice(self.floors[-(len(self.floors)-self.floors.index("0")-1):])  # 地下楼层
+                    if floor in upper_floors:
+                        target = random.choice(basement_floors)
                         direction = "down"
                         peak = True
                 if not peak:
                     target = random.choice(possible_targets)
-                    direction = "up" if self.floors.index(target) < self.floors.index(floor) else "down"
+                    direction = "up" if target < floor else "down"
                 p = Passenger(floor, target, direction)
                 self.waiting_passengers[floor].append(p)
                 self.passenger_history.append(p)
 
     def step_elevators(self):
         # 全局调度，避免某楼层呼叫长时间被忽略
-        floor_waits = {f: (sum(p.waiting_time for p in self.waiting_passengers[f]), len(self.waiting_passengers[f]))
-                       for f in self.floors}
+        floor_waits = [(sum(p.waiting_time for p in q), len(q)) for q in self.waiting_passengers]
         elevator_targets = set()
         for elevator in self.elevators:
             # 下客
@@ -242,13 +252,11 @@ class ElevatorSystemGUI:
                 elevator.passengers.remove(p)
             
             # 上客
-            floor_queue = deque()  # 初始化为空队列
-            if elevator.current_floor in self.waiting_passengers:  # 检查当前楼层是否有等待的乘客
-                floor_queue = self.waiting_passengers[elevator.current_floor]
+            floor_queue = self.waiting_passengers[elevator.current_floor]
             
             to_board = []
             for p in list(floor_queue):
-                if (p.direction == elevator.direction or elevator.direction == "idle") and p.target_floor in elevator.allowed_floors:
+                if (p.direction == elevator.direction or elevator.direction == "idle") and p.target_floor in elevator.allowed_set:
                     to_board.append(p)
             available_slots = elevator.max_capacity - len(elevator.passengers)
             for p in to_board[:available_slots]:
@@ -260,9 +268,8 @@ class ElevatorSystemGUI:
             # 更新电梯状态
             if elevator.passengers:
                 # 车内目标
-                targets = [self.floors.index(p.target_floor) for p in elevator.passengers]
-                avg_target = sum(targets) / len(targets)
-                curr_idx = self.floors.index(elevator.current_floor)
+                avg_target = sum(p.target_floor for p in elevator.passengers) / len(elevator.passengers)
+                curr_idx = elevator.current_floor
                 
                 if avg_target < curr_idx:
                     # 目标楼层在当前楼层下方，应该向下移动
@@ -289,7 +296,7 @@ class ElevatorSystemGUI:
                 # 响应等待人数多/等待时间久的楼层
                 candidates = []
                 for f in elevator.allowed_floors:  # 遍历电梯允许的楼层
-                    if f in floor_waits and floor_waits[f][1] > 0 and f not in elevator_targets:
+                    if floor_waits[f][1] > 0 and f not in elevator_targets:
                         candidates.append((f, floor_waits[f][1], floor_waits[f][0]))
                 
                 if candidates:
@@ -297,8 +304,8 @@ class ElevatorSystemGUI:
                     candidates.sort(key=lambda x: (-x[1], -x[2]))
                     next_dest = candidates[0][0]
                     elevator_targets.add(next_dest)
-                    curr_idx = self.floors.index(elevator.current_floor)
-                    target_idx = self.floors.index(next_dest)
+                    curr_idx = elevator.current_floor
+                    target_idx = next_dest
                     
                     if target_idx < curr_idx:
                         elevator.direction = "up"
@@ -320,13 +327,13 @@ class ElevatorSystemGUI:
             
             # 移动
             if elevator.direction == "up":
-                curr_idx = self.floors.index(elevator.current_floor)
-                if curr_idx > 0 and self.floors[curr_idx-1] in elevator.allowed_floors:
-                    elevator.current_floor = self.floors[curr_idx-1]
+                curr_idx = elevator.current_floor
+                if curr_idx > 0 and curr_idx-1 in elevator.allowed_set:
+                    elevator.current_floor = curr_idx-1
             elif elevator.direction == "down":
-                curr_idx = self.floors.index(elevator.current_floor)
-                if curr_idx < len(self.floors)-1 and self.floors[curr_idx+1] in elevator.allowed_floors:
-                    elevator.current_floor = self.floors[curr_idx+1]
+                curr_idx = elevator.current_floor
+                if curr_idx < len(self.floors)-1 and curr_idx+1 in elevator.allowed_set:
+                    elevator.current_floor = curr_idx+1
             
             # 检查是否需要更新target_floors
             # 如果电梯已经到达所有目标楼层，清空target_floors并进入空闲状态
@@ -351,17 +358,13 @@ class ElevatorSystemGUI:
 
     def draw_elevators(self):
         for eid, elevator in enumerate(self.elevators):
-            try:
-                y = 40 + self.floors.index(elevator.current_floor)*40
-            except ValueError:
-                # 如果电梯当前楼层不在floors列表中(理论上不应该发生)，则跳过
-                continue
+            y = 40 + elevator.current_floor*40
             x = 60 + eid*100
             
             # 绘制电梯状态信息
             status_text = elevator.get_status_text()
             passenger_text = elevator.get_passenger_text()
-            target_text = elevator.get_target_floors_text()
+            target_text = elevator.get_target_floors_text(self.floors)
             
             # 在电梯矩形内显示状态信息
             self.canvas.create_rectangle(x+5, y-30, x+95, y+10, fill="skyblue", outline="black", width=2)
@@ -380,8 +383,7 @@ class ElevatorSystemGUI:
                 direction_text = f"上行:{up_count} 下行:{down_count}"
                 self.canvas.create_text(x+50, y+5, text=direction_text, font=("Arial", 6), justify=tk.CENTER)
         # 绘制等待乘客
-        for i, floor in enumerate(self.floors):
-            q = self.waiting_passengers.get(floor, deque())  # 使用get方法避免KeyError
+        for i, q in enumerate(self.waiting_passengers):
             y = 40 + i*40
             n = len(q)
             if n > 0:
@@ -411,8 +413,8 @@ class ElevatorSystemGUI:
             self.draw_time()
             
             # 更新等待乘客的等待时间
-            for floor in list(self.waiting_passengers.keys()):  # 使用list避免在迭代时修改字典
-                for p in self.waiting_passengers[floor]:
+            for q in self.waiting_passengers:
+                for p in q:
                     p.waiting_time += 1
             
             self.time += 1
@@ -10,22 +10,29 @@ from PyQt5.QtGui import QPainter, QColor, QPen, QFont
 
 
 class Elevator:
-    def __init__(self, id, max_capacity, default_floor, floors):
+    __slots__ = ("id", "max_capacity", "current_floor", "destination_floors", "direction",
+                 "passengers", "door_open", "default_floor", "last_activity_time",
+                 "allowed_floors", "status", "position", "target_position",
+                 "idle_start_time", "returning_home", "clock", "door_close_time")
+
+    def __init__(self, id, max_capacity, default_floor, floors, clock=time.time):
         self.id = id
         self.max_capacity = max_capacity
+        self.clock = clock  # 计时用的时钟（秒）；仿真器传入仿真时钟，与墙钟和机器负载无关
         self.current_floor = default_floor
         self.destination_floors = []
         self.direction = 0  # 0: idle, 1: up, -1: down
         self.passengers = []
         self.door_open = False
         self.default_floor = default_floor
-        self.last_activity_time = time.time()
+        self.last_activity_time = self.clock()
         self.allowed_floors = floors
         self.status = "空闲"
         self.position = 0  # 用于动画的当前位置
         self.target_position = 0  # 目标位置
         self.idle_start_time = None  # 记录开始空闲的时间
         self.returning_home = False   # 是否正在返回默认楼层
+        self.door_close_time = None  # 返回默认楼层后自动关门的时刻
         
     def add_destination(self, floor):
         if floor not in self.destination_floors and floor in self.allowed_floors:
@@ -59,7 +66,12 @@ class Elevator:
                 
     def move(self):
         # 处理初始状态
-        current_time = time.time()
+        current_time = self.clock()
+        
+        # 返回默认楼层开门满5秒后自动关门
+        if self.door_close_time is not None and current_time >= self.door_close_time:
+            self.door_close_time = None
+            self.close_door_after_return()
         
         # 处理返回默认楼层逻辑
         if self.returning_home:
@@ -105,11 +117,11 @@ class Elevator:
     def open_door(self):
         # 设置开门状态和时间
         self.door_open = True
-        self.last_activity_time = time.time()
+        self.last_activity_time = self.clock()
         if self.returning_home and self.current_floor == self.default_floor:
             self.status = f"到达{self.default_floor}F"
             # 5秒后自动关门
-            QTimer.singleShot(5000, self.close_door_after_return)
+            self.door_close_time = self.clock() + 5
         else:
             self.status = f"开门@{self.current_floor}F"
         
@@ -117,7 +129,7 @@ class Elevator:
         if self.returning_home and self.current_floor == self.default_floor:
             self.close_door()
             self.returning_home = False
-            self.idle_start_time = time.time()
+            self.idle_start_time = self.clock()
             self.status = f"空闲@{self.default_floor}F"
         
     def close_door(self):
@@ -128,7 +140,7 @@ class Elevator:
         if len(self.passengers) < self.max_capacity:
             self.passengers.append(passenger)
             self.add_destination(passenger.destination)
-            self.last_activity_time = time.time()
+            self.last_activity_time = self.clock()
             # 从等待列表中移除乘客
             if passenger in floor_passengers:
                 floor_passengers.remove(passenger)
@@ -149,6 +161,8 @@ class Elevator:
 
 
 class Passenger:
+    __slots__ = ("current_floor", "destination", "waiting_time", "in_elevator", "direction")
+
     def __init__(self, current_floor, destination):
         self.current_floor = current_floor
         self.destination = destination
@@ -554,6 +568,9 @@ class ElevatorSimulator(QMainWindow):
         self.basement_floors = self.basement_floors_input.value()
         default_floor = self.default_floor_input.value()
         
+        # 仿真时钟先归零，电梯的计时以此为起点
+        self.simulation_time = 0
+        
         # Initialize elevators
         self.elevators = []
         for i in range(self.elevator_count.value()):
@@ -572,14 +589,13 @@ class ElevatorSimulator(QMainWindow):
                     allowed_floors.append(floor)
             
             # Create elevator (默认在1楼)
-            elevator = Elevator(i+1, capacity, default_floor, allowed_floors)
+            elevator = Elevator(i+1, capacity, default_floor, allowed_floors, clock=self.sim_clock)
             elevator.current_floor = default_floor  # 确保初始在默认楼层
             self.elevators.append(elevator)
         
         # Reset simulation state
         self.passengers = []
         self.waiting_passengers = defaultdict(list)
-        self.simulation_time = 0
         self.is_running = True
         self.initial_passengers_generated = False
         self.last_passenger_generation = 0
@@ -692,6 +708,10 @@ class ElevatorSimulator(QMainWindow):
         if new_passengers:
             self.assign_elevators()
         
+    def sim_clock(self):
+        """仿真时钟：每个仿真步长计 1 秒，开关门、空闲返回等计时都以此为准，可任意快进"""
+        return self.simulation_time
+        
     def update_simulation(self):
         if not self.is_running:
             return
@@ -723,7 +743,7 @@ class ElevatorSimulator(QMainWindow):
             # 处理开门状态
             if elevator.door_open:
                 # 非返回默认楼层的正常开门，5秒后关门
-                if not elevator.returning_home and time.time() - elevator.last_activity_time > 5:
+                if not elevator.returning_home and self.sim_clock() - elevator.last_activity_time > 5:
                     elevator.close_door()
                 else:
                     # 开门时处理乘客上下
@@ -756,7 +776,7 @@ class ElevatorSimulator(QMainWindow):
                             elevator.update_direction()
                     else:
                         # 如果没有乘客等待，提前关门
-                        if not elevator.returning_home and time.time() - elevator.last_activity_time > 3:
+                        if not elevator.returning_home and self.sim_clock() - elevator.last_activity_time > 3:
                             elevator.close_door()
         
         # 检查并重新分配未被处理的乘客
@@ -1,170 +1,13 @@
 import sys
-import random
 import time
-from collections import defaultdict
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QSpinBox, QPushButton, QGroupBox, QCheckBox, QGridLayout,
-                            QScrollArea)
+                            QScrollArea, QComboBox)
 from PyQt5.QtCore import Qt, QTimer, QRectF
 from PyQt5.QtGui import QPainter, QColor, QPen, QFont
 
-
-class Elevator:
-    def __init__(self, id, max_capacity, default_floor, floors):
-        self.id = id
-        self.max_capacity = max_capacity
-        self.current_floor = default_floor
-        self.destination_floors = []
-        self.direction = 0  # 0: idle, 1: up, -1: down
-        self.passengers = []
-        self.door_open = False
-        self.default_floor = default_floor
-        self.last_activity_time = time.time()
-        self.allowed_floors = floors
-        self.status = "空闲"
-        self.position = 0  # 用于动画的当前位置
-        self.target_position = 0  # 目标位置
-        self.idle_start_time = None  # 记录开始空闲的时间
-        self.returning_home = False   # 是否正在返回默认楼层
-        self.operation_mode = 1  # 0: 单独运行, 1: 并行运行
-        
-    def add_destination(self, floor):
-        if floor not in self.destination_floors and floor in self.allowed_floors:
-            self.destination_floors.append(floor)
-            self.update_direction()
-            
-    def update_direction(self):
-        if not self.destination_floors:
-            self.direction = 0
-            return
-            
-        # 根据方向排序目标楼层
-        if self.direction == 1:  # 上行时按升序排列，低楼层先到达
-            self.destination_floors.sort()
-        elif self.direction == -1:  # 下行时按降序排列，高楼层先到达
-            self.destination_floors.sort(reverse=True)
-            
-        if self.current_floor < self.destination_floors[0]:
-            self.direction = 1
-        elif self.current_floor > self.destination_floors[-1]:
-            self.direction = -1
-        else:
-            # 特殊情况处理：如果电梯在目标楼层之间，选择最近的目标
-            if not self.door_open:  # 确保不在开门状态
-                if abs(self.current_floor - self.destination_floors[0]) < abs(self.current_floor - self.destination_floors[-1]):
-                    self.direction = -1 if self.current_floor > self.destination_floors[0] else 1
-                else:
-                    self.direction = -1 if self.current_floor > self.destination_floors[-1] else 1
-            else:
-                self.direction = 0
-                
-    def move(self):
-        # 处理初始状态
-        current_time = time.time()
-        
-        # 处理返回默认楼层逻辑
-        if self.returning_home:
-            if not self.door_open and self.destination_floors:
-                if self.current_floor < self.destination_floors[0]:
-                    self.current_floor += 1
-                    self.status = f"上行至{self.current_floor}F"
-                elif self.current_floor > self.destination_floors[0]:
-                    self.current_floor -= 1
-                    self.status = f"下行至{self.current_floor}F"
-                elif self.current_floor == self.destination_floors[0]:
-                    self.open_door()
-                    self.destination_floors.remove(self.current_floor)
-                    if not self.destination_floors:
-                        self.returning_home = False
-            else:
-                # 如果没有目标楼层但仍标记为返回默认楼层，重置状态
-                self.returning_home = False
-                self.update_direction()
-            return
-
-        # 正常移动逻辑
-        if not self.door_open:
-            # 没有目标时返回默认楼层
-            if not self.destination_floors and not self.passengers:
-                if self.idle_start_time is None:
-                    self.idle_start_time = current_time
-                else:
-                    idle_time = current_time - self.idle_start_time
-                    if idle_time > 20 and self.current_floor != self.default_floor:
-                        self.add_destination(self.default_floor)
-                        self.returning_home = True
-                        self.status = f"返回{self.default_floor}F"
-                return
-                
-            # 根据方向移动
-            if self.direction == 1 and self.destination_floors and self.current_floor < self.destination_floors[-1]:
-                self.current_floor += 1
-                self.status = f"上行至{self.current_floor}F"
-            elif self.direction == -1 and self.destination_floors and self.current_floor > self.destination_floors[0]:
-                self.current_floor -= 1
-                self.status = f"下行至{self.current_floor}F"
-            else:
-                # 到达目标区域，准备开门
-                self.open_door()
-                self.destination_floors = [f for f in self.destination_floors if f != self.current_floor]
-                self.update_direction()
-                
-    def open_door(self):
-        # 设置开门状态和时间
-        self.door_open = True
-        self.last_activity_time = time.time()
-        if self.returning_home and self.current_floor == self.default_floor:
-            self.status = f"到达{self.default_floor}F"
-            # 5秒后自动关门
-            QTimer.singleShot(5000, self.close_door_after_return)
-        else:
-            self.status = f"开门@{self.current_floor}F"
-        
-    def close_door_after_return(self):
-        if self.returning_home and self.current_floor == self.default_floor:
-            self.close_door()
-            self.returning_home = False
-            self.idle_start_time = time.time()
-            self.status = f"空闲@{self.default_floor}F"
-        
-    def close_door(self):
-        self.door_open = False
-        self.status = "空闲" if not self.destination_floors else self.status
-        
-    def board_passenger(self, passenger, floor_passengers):
-        if len(self.passengers) < self.max_capacity:
-            self.passengers.append(passenger)
-            self.add_destination(passenger.destination)
-            self.last_activity_time = time.time()
-            # 从等待列表中移除乘客
-            if passenger in floor_passengers:
-                floor_passengers.remove(passenger)
-            return True
-        return False
-    
-    def unboard_passengers(self):
-        if not self.passengers:
-            return []
-            
-        # 按照目标楼层排序乘客
-        # 上行时低楼层先下，下行时高楼层先下
-        if self.direction == 1:
-            self.passengers.sort(key=lambda p: p.destination)
-        elif self.direction == -1:
-            self.passengers.sort(key=lambda p: p.destination, reverse=True)
-            
-        unboarded = [p for p in self.passengers if p.destination == self.current_floor]
-        self.passengers = [p for p in self.passengers if p.destination != self.current_floor]
-        return unboarded
-
-
-class Passenger:
-    def __init__(self, current_floor, destination):
-        self.current_floor = current_floor
-        self.destination = destination
-        self.waiting_time = 0
-        self.in_elevator = False
-        self.direction = 1 if destination > current_floor else -1  # 1: up, -1: down
+from elevator13_model import SimulationModel
+from parking import PARKING_POLICIES
 
 
 class SimulationDisplay(QWidget):
@@ -172,6 +15,9 @@ class SimulationDisplay(QWidget):
         super().__init__(parent)
         self.simulator = parent
         self.setStyleSheet("background-color: white;")
+        # 电梯的绘制位置由动画定时器按墙钟时间插值得到，paintEvent 只读取，不改动仿真状态
+        self.elevator_y = {}  # 电梯 id -> 当前绘制的纵坐标
+        self.tracks = {}  # 电梯 id -> (起点纵坐标, 终点纵坐标, 起始时刻)
         
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -245,6 +91,38 @@ class SimulationDisplay(QWidget):
             painter.drawEllipse(down_button_rect)
             painter.drawText(down_button_rect, Qt.AlignCenter, "↓")
         
+    def floor_y(self, floor):
+        """电梯停在 floor 层时轿厢顶边的纵坐标"""
+        building_height = 700
+        building_y = 50
+        floor_height = building_height / (self.simulator.total_floors + self.simulator.basement_floors + 2)
+        floor_index = (self.simulator.basement_floors + floor) if floor > 0 else (self.simulator.basement_floors + abs(floor))
+        return building_y + building_height - (floor_index + 1) * floor_height + 10
+
+    def reset_positions(self):
+        self.elevator_y.clear()
+        self.tracks.clear()
+
+    def update_positions(self, now):
+        """按经过的墙钟时间把各电梯从上一楼层平滑移到当前楼层，每段用时为一个仿真步长
+
+        模型只有整数楼层，楼层变化的时刻由界面记下：发现 current_floor 变了就以 now 为这一段的起点，
+        仿真每推进一步后都会调用一次，动画不依赖模型里的墙钟时间。
+        """
+        duration = max(self.simulator.simulation_timer.interval(), 1) / 1000
+        for elevator in self.simulator.elevators:
+            target_y = self.floor_y(elevator.current_floor)
+            track = self.tracks.get(elevator.id)
+            if track is None:
+                track = (target_y, target_y, now)
+            elif track[1] != target_y:
+                # 上一段还没走完就换了目标时，从当前绘制位置出发
+                track = (self.elevator_y[elevator.id], target_y, now)
+            self.tracks[elevator.id] = track
+            start_y, end_y, start_time = track
+            progress = min(1.0, max(0.0, (now - start_time) / duration))
+            self.elevator_y[elevator.id] = start_y + (end_y - start_y) * progress
+
     def draw_elevators(self, painter):
         if not self.simulator.elevators:
             return
@@ -252,7 +130,6 @@ class SimulationDisplay(QWidget):
         building_width = 900
         building_height = 700
         building_x = 50
-        building_y = 50
         floor_height = building_height / (self.simulator.total_floors + self.simulator.basement_floors + 2)
         
         # Calculate elevator dimensions and positions
@@ -260,22 +137,10 @@ class SimulationDisplay(QWidget):
         elevator_spacing = (building_width - 150) / len(self.simulator.elevators)
         
         for i, elevator in enumerate(self.simulator.elevators):
-            # Calculate elevator position with animation
-            floor_index = (self.simulator.basement_floors + elevator.current_floor) if elevator.current_floor > 0 else (self.simulator.basement_floors + abs(elevator.current_floor))
-            target_y = building_y + building_height - (floor_index + 1) * floor_height + 10
-            
-            # Update elevator's target position
-            elevator.target_position = target_y
-            
-            # Animate movement (1 pixel per frame)
-            if abs(elevator.position - target_y) > 1:
-                if elevator.position < target_y:
-                    elevator.position += 1
-                else:
-                    elevator.position -= 1
-            
             elevator_x = building_x + 100 + i * elevator_spacing
-            elevator_y = elevator.position
+            elevator_y = self.elevator_y.get(elevator.id)
+            if elevator_y is None:
+                elevator_y = self.floor_y(elevator.current_floor)
             
             # Draw elevator
             painter.setPen(QPen(Qt.black, 2))
@@ -378,28 +243,12 @@ class SimulationDisplay(QWidget):
                 painter.drawText(px + 2, py + 8, f"{passenger.destination}")
 
 
-class ElevatorSimulator(QMainWindow):
+class ElevatorSimulator(QMainWindow, SimulationModel):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("智能电梯调度系统")
         self.setGeometry(100, 100, 1400, 900)  # 增加窗口高度
-        
-        # Simulation parameters
-        self.elevators = []
-        self.total_floors = 20
-        self.basement_floors = 0
-        self.passengers = []
-        self.waiting_passengers = defaultdict(list)
-        self.simulation_time = 0
-        self.time_multiplier = 60  # 1 real second = 1 simulation minute
         self.is_running = False
-        self.initial_passengers_generated = False
-        self.last_passenger_generation = 0
-        self.no_passenger_time = 0  # 无乘客时间计数
-        self.peak_hours = {
-            "morning": (8, 9),    # 8-9 AM
-            "evening": (18, 21)   # 6-9 PM
-        }
         
         # UI Setup
         self.init_ui()
@@ -471,6 +320,19 @@ class ElevatorSimulator(QMainWindow):
         initial_passengers_layout.addWidget(self.initial_passengers_input)
         control_layout.addLayout(initial_passengers_layout)
         
+        # 目的楼层派梯：乘客登记时按目的楼层分配电梯
+        self.destination_dispatch_input = QCheckBox("目的楼层派梯")
+        control_layout.addWidget(self.destination_dispatch_input)
+        
+        # 空闲电梯停靠策略（见 parking.py）
+        parking_layout = QHBoxLayout()
+        parking_layout.addWidget(QLabel("空闲停靠:"))
+        self.parking_input = QComboBox()
+        for key, label in (("default", "回默认楼层"), ("stay", "原地停靠"), ("demand", "按近期需求分布")):
+            self.parking_input.addItem(label, key)
+        parking_layout.addWidget(self.parking_input)
+        control_layout.addLayout(parking_layout)
+        
         # Elevator settings group
         self.elevator_settings_group = QGroupBox("电梯详细设置")
         self.elevator_settings_layout = QVBoxLayout()
@@ -599,8 +461,8 @@ class ElevatorSimulator(QMainWindow):
         self.basement_floors = self.basement_floors_input.value()
         default_floor = self.default_floor_input.value()
         
-        # Initialize elevators
-        self.elevators = []
+        # 收集各电梯的容量、可停靠楼层和运行模式
+        elevator_specs = []
         for i in range(self.elevator_count.value()):
             # Get capacity
             capacity = self.findChild(QSpinBox, f"capacity_{i}").value()
@@ -619,243 +481,25 @@ class ElevatorSimulator(QMainWindow):
             # Get operation mode
             single_mode_cb = self.findChild(QCheckBox, f"single_mode_{i}")
             operation_mode = 0 if single_mode_cb and single_mode_cb.isChecked() else 1
-            
-            # Create elevator
-            elevator = Elevator(i+1, capacity, default_floor, allowed_floors)
-            elevator.current_floor = default_floor  # 确保初始在默认楼层
-            elevator.operation_mode = operation_mode
-            self.elevators.append(elevator)
+            elevator_specs.append((capacity, allowed_floors, operation_mode))
         
-        # Reset simulation state
-        self.passengers = []
-        self.waiting_passengers = defaultdict(list)
-        self.simulation_time = 0
+        self.destination_dispatch = self.destination_dispatch_input.isChecked()
+        self.parking = PARKING_POLICIES[self.parking_input.currentData()]()
+        self.setup(elevator_specs, self.total_floors, self.basement_floors, default_floor,
+                   self.initial_passengers_input.value())
         self.is_running = True
-        self.initial_passengers_generated = False
-        self.last_passenger_generation = 0
-        self.no_passenger_time = 0
-        
-        # Generate initial passengers
-        initial_passenger_count = self.initial_passengers_input.value()
-        self.generate_passengers(initial_passenger_count)
-        self.initial_passengers_generated = True
-        
-        # 初始分配电梯任务
-        self.assign_elevators()
+        self.simulation_display.reset_positions()
         
         # Start simulation timer (updates every second)
         self.simulation_timer.start(1000)
         
-    def assign_elevators(self):
-        # 为等待的乘客分配电梯
-        for floor, passengers in list(self.waiting_passengers.items()):
-            if not passengers:
-                continue
-                
-            # 为该楼层的乘客找到最合适的电梯
-            for passenger in passengers[:]:
-                best_elevator = self.find_best_elevator(floor, passenger.direction)
-                if best_elevator:
-                    # 分配电梯
-                    if floor not in best_elevator.destination_floors:
-                        best_elevator.add_destination(floor)
-                    # 如果电梯是空闲的，设置方向
-                    if best_elevator.direction == 0:
-                        best_elevator.direction = 1 if floor > best_elevator.current_floor else -1
-    
-    def find_best_elevator(self, floor, direction):
-        # 找到最适合的电梯
-        best_elevator = None
-        min_distance = float('inf')
-        
-        # 首先查找并行运行的电梯
-        for elevator in self.elevators:
-            if elevator.operation_mode == 1:  # 并行运行
-                # 检查电梯是否可以到达该楼层
-                if floor not in elevator.allowed_floors:
-                    continue
-                    
-                # 计算距离
-                distance = abs(elevator.current_floor - floor)
-                
-                # 优先考虑空闲或同向的电梯
-                if elevator.direction == 0:  # 空闲电梯
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_elevator = elevator
-                elif elevator.direction == 1 and direction == 1 and floor > elevator.current_floor:
-                    # 上行电梯，乘客也上行，且乘客在电梯上方
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_elevator = elevator
-                elif elevator.direction == -1 and direction == -1 and floor < elevator.current_floor:
-                    # 下行电梯，乘客也下行，且乘客在电梯下方
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_elevator = elevator
-        
-        # 如果没有找到并行运行的电梯，查找单独运行的电梯
-        if not best_elevator:
-            for elevator in self.elevators:
-                if elevator.operation_mode == 0:  # 单独运行
-                    # 检查电梯是否可以到达该楼层
-                    if floor not in elevator.allowed_floors:
-                        continue
-                        
-                    # 计算距离
-                    distance = abs(elevator.current_floor - floor)
-                    
-                    # 优先考虑空闲或同向的电梯
-                    if elevator.direction == 0:  # 空闲电梯
-                        if distance < min_distance:
-                            min_distance = distance
-                            best_elevator = elevator
-                    elif elevator.direction == 1 and direction == 1 and floor > elevator.current_floor:
-                        # 上行电梯，乘客也上行，且乘客在电梯上方
-                        if distance < min_distance:
-                            min_distance = distance
-                            best_elevator = elevator
-                    elif elevator.direction == -1 and direction == -1 and floor < elevator.current_floor:
-                        # 下行电梯，乘客也下行，且乘客在电梯下方
-                        if distance < min_distance:
-                            min_distance = distance
-                            best_elevator = elevator
-        
-        # 如果还是没有找到，选择距离最近的电梯
-        if not best_elevator:
-            for elevator in self.elevators:
-                if floor in elevator.allowed_floors:
-                    distance = abs(elevator.current_floor - floor)
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_elevator = elevator
-                        
-        return best_elevator
-        
-    def generate_passengers(self, count=1):
-        # 楼层权重分配 (1楼70%，-1和-2各10%，其他楼层共10%)
-        floor_weights = []
-        all_floors = [f for f in range(-self.basement_floors, self.total_floors + 1) if f != 0]
-        
-        for floor in all_floors:
-            if floor == 1:
-                floor_weights.append(70)
-            elif floor in (-1, -2):
-                floor_weights.append(10)
-            else:
-                floor_weights.append(1)  # 其他楼层共享10%的权重
-        
-        # 生成起始楼层
-        start_floors = random.choices(
-            all_floors,
-            weights=floor_weights,
-            k=count
-        )
-        
-        # 生成目标楼层 (不能与起始楼层相同)
-        end_floors = []
-        for start in start_floors:
-            possible_floors = [f for f in all_floors if f != start]
-            end_floors.append(random.choice(possible_floors))
-        
-        # 创建乘客 (检查楼层人数不超过5人)
-        new_passengers = []
-        for start, end in zip(start_floors, end_floors):
-            if len(self.waiting_passengers.get(start, [])) < 5:  # 楼层人数不超过5人
-                passenger = Passenger(start, end)
-                self.waiting_passengers[start].append(passenger)
-                self.passengers.append(passenger)
-                new_passengers.append(passenger)
-                
-        # 为新生成的乘客分配电梯
-        if new_passengers:
-            self.assign_elevators()
-        
     def update_simulation(self):
         if not self.is_running:
             return
-            
-        # Advance simulation time
-        self.simulation_time += 1
-        
-        # 检查是否需要生成新乘客
-        current_hour = (self.simulation_time // 60) % 24
-        is_peak = (8 <= current_hour < 9) or (18 <= current_hour < 21)
-        generation_interval = 1 if is_peak else 2  # 高峰期1分钟，非高峰期2分钟
         
-        current_minute = self.simulation_time // self.time_multiplier
-        if current_minute - self.last_passenger_generation >= generation_interval:
-            max_passengers = 5 if is_peak else 3
-            self.generate_passengers(random.randint(1, max_passengers))
-            self.last_passenger_generation = current_minute
-        
-        # 处理电梯和乘客交互
-        for elevator in self.elevators:
-            # 防止电梯卡在中间状态
-            if not elevator.door_open and not elevator.destination_floors and elevator.current_floor != elevator.default_floor:
-                elevator.add_destination(elevator.default_floor)
-                elevator.returning_home = True
-                elevator.status = f"返回{elevator.default_floor}F"
-            
-            elevator.move()
-            
-            # 处理开门状态
-            if elevator.door_open:
-                # 非返回默认楼层的正常开门，5秒后关门
-                if not elevator.returning_home and time.time() - elevator.last_activity_time > 5:
-                    elevator.close_door()
-                else:
-                    # 开门时处理乘客上下
-                    floor = elevator.current_floor
-                    floor_passengers = self.waiting_passengers.get(floor, [])
-                    
-                    # 乘客下电梯
-                    unboarded = elevator.unboard_passengers()
-                    
-                    # 乘客上电梯
-                    if floor_passengers:
-                        # 先处理同方向乘客
-                        if elevator.direction == 1:  # 上行
-                            to_board = [p for p in floor_passengers if p.direction == 1]
-                        elif elevator.direction == -1:  # 下行
-                            to_board = [p for p in floor_passengers if p.direction == -1]
-                        else:  # 空闲 - 处理所有方向
-                            to_board = floor_passengers[:]
-                        
-                        # 尝试让乘客登梯
-                        boarded = 0
-                        for passenger in to_board[:]:
-                            if boarded >= elevator.max_capacity - len(elevator.passengers):
-                                break
-                            if elevator.board_passenger(passenger, floor_passengers):
-                                boarded += 1
-                                
-                        # 如果有乘客登梯，更新电梯方向
-                        if boarded > 0 and elevator.direction == 0:
-                            elevator.update_direction()
-                    else:
-                        # 如果没有乘客等待，提前关门
-                        if not elevator.returning_home and time.time() - elevator.last_activity_time > 3:
-                            elevator.close_door()
-
-        # 检查并重新分配未被处理的乘客
-        for floor, passengers in list(self.waiting_passengers.items()):
-            if passengers:
-                # 检查是否有电梯已分配到该楼层
-                assigned = any(
-                    floor in elevator.destination_floors 
-                    for elevator in self.elevators
-                )
-                
-                # 如果没有电梯前往该楼层，重新分配
-                if not assigned:
-                    for passenger in passengers:
-                        best_elevator = self.find_best_elevator(floor, passenger.direction)
-                        if best_elevator and floor not in best_elevator.destination_floors:
-                            best_elevator.add_destination(floor)
-                            # 如果电梯是空闲的，设置方向
-                            if best_elevator.direction == 0:
-                                best_elevator.direction = 1 if floor > best_elevator.current_floor else -1
+        self.step()
+        # 记下本步楼层有变化的电梯，动画从此刻开始插值
+        self.simulation_display.update_positions(time.time())
         
         # 更新统计信息
         self.update_stats()
@@ -909,8 +553,9 @@ class ElevatorSimulator(QMainWindow):
         return f"{hours:02d}:{minutes:02d}"
     
     def update_animation(self):
-        """更新动画状态"""
+        """更新动画状态：插值电梯绘制位置后重绘"""
         if self.is_running:
+            self.simulation_display.update_positions(time.time())
             self.simulation_display.update()
     
     def stop_simulation(self):
@@ -0,0 +1,668 @@
+"""elevator13-4.py 的仿真模型：电梯、乘客、派梯和逐步推进，不依赖 PyQt5
+
+ElevatorSimulator（Qt 窗口）继承 SimulationModel 并只负责读取界面参数和绘制；无界面时直接使用：
+
+    model = SimulationModel()
+    model.setup([(10, list(range(1, 21)), 1)] * 3, total_floors=20)
+    for _ in range(3600):
+        model.step()
+    model.get_statistics()
+
+时间单位为仿真步：每步 simulation_time 加 1，开关门、空闲返回等计时都按仿真时钟计算。
+"""
+import random
+import time
+from collections import defaultdict
+
+from parking import DefaultFloorParking
+from streaming_stats import TripStats
+from zoning import ZoneMap
+
+
+class Elevator:
+    __slots__ = ("id", "max_capacity", "current_floor", "destination_floors", "direction",
+                 "passengers", "door_open", "default_floor", "last_activity_time",
+                 "allowed_floors", "status",
+                 "idle_start_time", "returning_home", "clock", "door_close_time", "operation_mode",
+                 "parking_floor")
+
+    def __init__(self, id, max_capacity, default_floor, floors, clock=time.time):
+        self.id = id
+        self.max_capacity = max_capacity
+        self.clock = clock  # 计时用的时钟（秒）；仿真器传入仿真时钟，与墙钟和机器负载无关
+        self.current_floor = default_floor
+        self.destination_floors = []
+        self.direction = 0  # 0: idle, 1: up, -1: down
+        self.passengers = []
+        self.door_open = False
+        self.default_floor = default_floor
+        self.parking_floor = default_floor  # 空闲时前往停靠的楼层，由 SimulationModel.parking 决定
+        self.last_activity_time = self.clock()
+        self.allowed_floors = floors
+        self.status = "空闲"
+        self.idle_start_time = None  # 记录开始空闲的时间
+        self.returning_home = False   # 是否正在返回默认楼层
+        self.door_close_time = None  # 返回默认楼层后自动关门的时刻
+        self.operation_mode = 1  # 0: 单独运行, 1: 并行运行
+        
+    def on_parking_trip(self):
+        # 车内无人、只在前往停靠楼层：可随时被呼梯打断
+        return self.returning_home and not self.passengers and self.destination_floors == [self.parking_floor]
+
+    def add_destination(self, floor):
+        if floor not in self.destination_floors and floor in self.allowed_floors:
+            if self.on_parking_trip():
+                # 停靠行程优先级最低，接到呼梯即放弃
+                self.destination_floors = []
+                self.returning_home = False
+            self.destination_floors.append(floor)
+            self.update_direction()
+            
+    def update_direction(self):
+        if not self.destination_floors:
+            self.direction = 0
+            return
+            
+        # 根据方向排序目标楼层
+        if self.direction == 1:  # 上行时按升序排列，低楼层先到达
+            self.destination_floors.sort()
+        elif self.direction == -1:  # 下行时按降序排列，高楼层先到达
+            self.destination_floors.sort(reverse=True)
+            
+        if self.current_floor < self.destination_floors[0]:
+            self.direction = 1
+        elif self.current_floor > self.destination_floors[-1]:
+            self.direction = -1
+        else:
+            # 特殊情况处理：如果电梯在目标楼层之间，选择最近的目标
+            if not self.door_open:  # 确保不在开门状态
+                if abs(self.current_floor - self.destination_floors[0]) < abs(self.current_floor - self.destination_floors[-1]):
+                    self.direction = -1 if self.current_floor > self.destination_floors[0] else 1
+                else:
+                    self.direction = -1 if self.current_floor > self.destination_floors[-1] else 1
+            else:
+                self.direction = 0
+                
+    def move(self):
+        # 处理初始状态
+        current_time = self.clock()
+        
+        # 返回默认楼层开门满5秒后自动关门
+        if self.door_close_time is not None and current_time >= self.door_close_time:
+            self.door_close_time = None
+            self.close_door_after_return()
+        
+        # 处理返回默认楼层逻辑
+        if self.returning_home:
+            if not self.door_open and self.destination_floors:
+                if self.current_floor < self.destination_floors[0]:
+                    self.current_floor += 1
+                    self.status = f"上行至{self.current_floor}F"
+                elif self.current_floor > self.destination_floors[0]:
+                    self.current_floor -= 1
+                    self.status = f"下行至{self.current_floor}F"
+                elif self.current_floor == self.destination_floors[0]:
+                    if self.destination_floors == [self.current_floor] and self.current_floor != self.default_floor:
+                        # 停靠策略选的其他楼层：关门待命，只有回到默认楼层才开门候客
+                        self.destination_floors = []
+                        self.returning_home = False
+                        self.status = f"空闲@{self.current_floor}F"
+                        self.update_direction()
+                        return
+                    self.open_door()
+                    self.destination_floors.remove(self.current_floor)
+                    if not self.destination_floors:
+                        self.returning_home = False
+            else:
+                # 如果没有目标楼层但仍标记为返回默认楼层，重置状态
+                self.returning_home = False
+                self.update_direction()
+            return
+
+        # 正常移动逻辑
+        if not self.door_open:
+            # 没有目标时返回默认楼层
+            if not self.destination_floors and not self.passengers:
+                if self.idle_start_time is None:
+                    self.idle_start_time = current_time
+                else:
+                    idle_time = current_time - self.idle_start_time
+                    if idle_time > 20 and self.current_floor != self.parking_floor:
+                        self.add_destination(self.parking_floor)
+                        self.returning_home = True
+                        self.status = f"返回{self.parking_floor}F"
+                return
+                
+            # 根据方向移动
+            if self.direction == 1 and self.destination_floors and self.current_floor < self.destination_floors[-1]:
+                self.current_floor += 1
+                self.status = f"上行至{self.current_floor}F"
+            elif self.direction == -1 and self.destination_floors and self.current_floor > self.destination_floors[0]:
+                self.current_floor -= 1
+                self.status = f"下行至{self.current_floor}F"
+            else:
+                # 到达目标区域，准备开门
+                self.open_door()
+                self.destination_floors = [f for f in self.destination_floors if f != self.current_floor]
+                self.update_direction()
+                
+    def open_door(self):
+        # 设置开门状态和时间
+        self.door_open = True
+        self.last_activity_time = self.clock()
+        if self.returning_home and self.current_floor == self.parking_floor:
+            self.status = f"到达{self.parking_floor}F"
+            # 5秒后自动关门
+            self.door_close_time = self.clock() + 5
+        else:
+            self.status = f"开门@{self.current_floor}F"
+        
+    def close_door_after_return(self):
+        if self.returning_home and self.current_floor == self.parking_floor:
+            self.close_door()
+            self.returning_home = False
+            self.idle_start_time = self.clock()
+            self.status = f"空闲@{self.parking_floor}F"
+        
+    def close_door(self):
+        self.door_open = False
+        self.status = "空闲" if not self.destination_floors else self.status
+        
+    def board_passenger(self, passenger, floor_passengers):
+        if len(self.passengers) < self.max_capacity:
+            self.passengers.append(passenger)
+            self.add_destination(passenger.destination)
+            self.last_activity_time = self.clock()
+            if passenger.board_time is None:
+                passenger.board_time = self.clock()
+            # 从等待列表中移除乘客
+            if passenger in floor_passengers:
+                floor_passengers.remove(passenger)
+            return True
+        return False
+    
+    def unboard_passengers(self):
+        if not self.passengers:
+            return []
+            
+        # 按照目标楼层排序乘客
+        # 上行时低楼层先下，下行时高楼层先下
+        if self.direction == 1:
+            self.passengers.sort(key=lambda p: p.destination)
+        elif self.direction == -1:
+            self.passengers.sort(key=lambda p: p.destination, reverse=True)
+            
+        unboarded = [p for p in self.passengers if p.destination == self.current_floor]
+        self.passengers = [p for p in self.passengers if p.destination != self.current_floor]
+        return unboarded
+
+
+class Passenger:
+    __slots__ = ("current_floor", "destination", "waiting_time", "in_elevator", "direction", "assigned_elevator",
+                 "final_destination", "spawn_time", "board_time")
+
+    def __init__(self, current_floor, destination):
+        self.current_floor = current_floor
+        self.destination = destination
+        self.waiting_time = 0
+        self.in_elevator = False
+        self.direction = 1 if destination > current_floor else -1  # 1: up, -1: down
+        self.assigned_elevator = None  # 目的楼层派梯模式下登记时分配的电梯编号
+        self.final_destination = None  # 需要换乘时 destination 为换乘楼层，这里是最终目的楼层
+        self.spawn_time = None  # 到达时刻和首次上梯时刻（仿真时钟），用于统计候梯时间
+        self.board_time = None
+
+
+class SimulationModel:
+    def __init__(self, *args, **kwargs):
+        # 与 QMainWindow 一起被继承时由其 __init__ 协作调用
+        super().__init__(*args, **kwargs)
+        
+        # Simulation parameters
+        self.elevators = []
+        self.total_floors = 20
+        self.basement_floors = 0
+        self.passengers = []
+        self.waiting_passengers = defaultdict(list)
+        self.simulation_time = 0
+        self.time_multiplier = 60  # 1 real second = 1 simulation minute
+        self.initial_passengers_generated = False
+        self.last_passenger_generation = 0
+        self.no_passenger_time = 0  # 无乘客时间计数
+        # 回放用的到达轨迹（arrival_trace.ArrivalTrace，时间单位为 simulation_time），为 None 时随机生成
+        self.arrival_trace = None
+        self.trace_cursor = 0
+        # 目的楼层派梯：乘客登记时按目的楼层分配电梯并只乘这部电梯，同去向的乘客尽量归到同一部
+        self.destination_dispatch = False
+        # 分区路线表：各楼层停靠的电梯位集合（第 k 位为 self.elevators[k]）和无法直达时的换乘楼层，setup 时重建
+        self.zones = ZoneMap([])
+        # 空闲电梯的停靠策略（见 parking.py），缺省为回默认楼层
+        self.parking = DefaultFloorParking()
+        # 已完成行程的候梯时间（到达至首次上梯）和乘梯时间（首次上梯至到达最终目的楼层，含换乘候梯），单位为仿真步
+        self.trip_stats = TripStats(resolution=1)
+        self.peak_hours = {
+            "morning": (8, 9),    # 8-9 AM
+            "evening": (18, 21)   # 6-9 PM
+        }
+        
+    def setup(self, elevator_specs, total_floors=20, basement_floors=0, default_floor=1, initial_passengers=5):
+        """按 [(容量, 可停靠楼层, 运行模式), ...] 新建电梯并重置仿真状态，运行模式 0 为单独运行、1 为并行运行"""
+        self.total_floors = total_floors
+        self.basement_floors = basement_floors
+        
+        # 仿真时钟先归零，电梯的计时以此为起点
+        self.simulation_time = 0
+        self.parking.reset()
+        self.trip_stats.clear()
+        
+        # Initialize elevators
+        self.elevators = []
+        for i, (capacity, allowed_floors, operation_mode) in enumerate(elevator_specs):
+            # Create elevator
+            elevator = Elevator(i+1, capacity, default_floor, allowed_floors, clock=self.sim_clock)
+            elevator.current_floor = default_floor  # 确保初始在默认楼层
+            elevator.operation_mode = operation_mode
+            self.elevators.append(elevator)
+        self.zones = ZoneMap([elevator.allowed_floors for elevator in self.elevators])
+        
+        # Reset simulation state
+        self.passengers = []
+        self.waiting_passengers = defaultdict(list)
+        self.initial_passengers_generated = False
+        self.last_passenger_generation = 0
+        self.no_passenger_time = 0
+        
+        # Generate initial passengers
+        if self.arrival_trace is not None:
+            self.trace_cursor = 0
+            self.replay_arrivals()
+        else:
+            self.generate_passengers(initial_passengers)
+        self.initial_passengers_generated = True
+        
+        # 初始分配电梯任务
+        self.assign_elevators()
+        
+    def assign_elevators(self):
+        # 为等待的乘客分配电梯
+        for floor, passengers in list(self.waiting_passengers.items()):
+            if not passengers:
+                continue
+                
+            # 为该楼层的乘客找到最合适的电梯
+            for passenger in passengers[:]:
+                if self.destination_dispatch:
+                    if passenger.assigned_elevator is not None:
+                        continue  # 登记时已分好电梯，不再改变
+                    best_elevator = self.find_best_elevator(floor, passenger.direction, passenger.destination,
+                                                            self.zones.direct(floor, passenger.destination))
+                    if best_elevator:
+                        passenger.assigned_elevator = best_elevator.id
+                else:
+                    best_elevator = self.find_best_elevator(floor, passenger.direction,
+                                                            cars=self.zones.direct(floor, passenger.destination))
+                if best_elevator:
+                    # 分配电梯
+                    if floor not in best_elevator.destination_floors:
+                        best_elevator.add_destination(floor)
+                    # 如果电梯是空闲的，设置方向
+                    if best_elevator.direction == 0:
+                        best_elevator.direction = 1 if floor > best_elevator.current_floor else -1
+    
+    def find_best_elevator(self, floor, direction, destination=None, cars=None):
+        # 找到最适合的电梯；给出 destination 时（目的楼层派梯）距离再加上 destination_penalty。
+        # cars 为候选电梯的位集合（见 zoning.ZoneMap），缺省为停靠该楼层的全部电梯
+        best_elevator = None
+        min_distance = float('inf')
+        if cars is None:
+            cars = self.zones.at(floor)
+        
+        # 首先查找并行运行的电梯
+        for k, elevator in enumerate(self.elevators):
+            if elevator.operation_mode == 1:  # 并行运行
+                # 检查电梯是否可以到达该楼层
+                if not cars >> k & 1:
+                    continue
+                    
+                # 计算距离
+                distance = abs(elevator.current_floor - floor)
+                if destination is not None:
+                    distance += self.destination_penalty(elevator, floor, destination)
+                
+                # 优先考虑空闲（含正在前往停靠楼层）或同向的电梯
+                if elevator.direction == 0 or elevator.on_parking_trip():  # 空闲电梯
+                    if distance < min_distance:
+                        min_distance = distance
+                        best_elevator = elevator
+                elif elevator.direction == 1 and direction == 1 and floor > elevator.current_floor:
+                    # 上行电梯，乘客也上行，且乘客在电梯上方
+                    if distance < min_distance:
+                        min_distance = distance
+                        best_elevator = elevator
+                elif elevator.direction == -1 and direction == -1 and floor < elevator.current_floor:
+                    # 下行电梯，乘客也下行，且乘客在电梯下方
+                    if distance < min_distance:
+                        min_distance = distance
+                        best_elevator = elevator
+        
+        # 如果没有找到并行运行的电梯，查找单独运行的电梯
+        if not best_elevator:
+            for k, elevator in enumerate(self.elevators):
+                if elevator.operation_mode == 0:  # 单独运行
+                    # 检查电梯是否可以到达该楼层
+                    if not cars >> k & 1:
+                        continue
+                        
+                    # 计算距离
+                    distance = abs(elevator.current_floor - floor)
+                    if destination is not None:
+                        distance += self.destination_penalty(elevator, floor, destination)
+                    
+                    # 优先考虑空闲（含正在前往停靠楼层）或同向的电梯
+                    if elevator.direction == 0 or elevator.on_parking_trip():  # 空闲电梯
+                        if distance < min_distance:
+                            min_distance = distance
+                            best_elevator = elevator
+                    elif elevator.direction == 1 and direction == 1 and floor > elevator.current_floor:
+                        # 上行电梯，乘客也上行，且乘客在电梯上方
+                        if distance < min_distance:
+                            min_distance = distance
+                            best_elevator = elevator
+                    elif elevator.direction == -1 and direction == -1 and floor < elevator.current_floor:
+                        # 下行电梯，乘客也下行，且乘客在电梯下方
+                        if distance < min_distance:
+                            min_distance = distance
+                            best_elevator = elevator
+        
+        # 如果还是没有找到，选择距离最近的电梯
+        if not best_elevator:
+            for k, elevator in enumerate(self.elevators):
+                if cars >> k & 1:
+                    distance = abs(elevator.current_floor - floor)
+                    if destination is not None:
+                        distance += self.destination_penalty(elevator, floor, destination)
+                    if distance < min_distance:
+                        min_distance = distance
+                        best_elevator = elevator
+                        
+        return best_elevator
+        
+    def destination_penalty(self, elevator, floor, destination, stop_cost=5):
+        """目的楼层派梯的附加代价（折算成楼层数，每层一个仿真步）
+
+        电梯车内和已分给它的乘客已有去 destination 的，不增加停靠；否则比该乘客坐得更远的人都要
+        多等一次停靠（约 stop_cost 步，即开门时间）；destination 超出这些人中最远的目的楼层时，
+        本趟往返再加上多出这一段的来回。
+        """
+        if not self.zones.serves(elevator.id - 1, destination):  # 电梯编号为下标加 1
+            return float('inf')
+        planned = [p.destination for p in elevator.passengers]
+        for passengers in self.waiting_passengers.values():
+            planned.extend(p.destination for p in passengers if p.assigned_elevator == elevator.id)
+        if destination in planned:
+            return 0
+        # 沿乘客行进方向度量
+        sign = 1 if destination > floor else -1
+        distance = (destination - floor) * sign
+        ahead = [(d - floor) * sign for d in planned]
+        beyond = sum(1 for d in ahead if d > distance)
+        if beyond:
+            return beyond * stop_cost
+        farthest = max([d for d in ahead if d > 0], default=0)
+        return 2 * (distance - farthest) if farthest else 0
+
+    def get_floor_distribution(self):
+        # 楼层列表和累积权重只随楼层配置变化，按配置缓存
+        key = (self.basement_floors, self.total_floors)
+        if getattr(self, "_floor_distribution_key", None) != key:
+            # 楼层权重分配 (1楼70%，-1和-2各10%，其他楼层共10%)
+            all_floors = [f for f in range(-self.basement_floors, self.total_floors + 1) if f != 0]
+            cum_weights = []
+            total = 0
+            for floor in all_floors:
+                if floor == 1:
+                    total += 70
+                elif floor in (-1, -2):
+                    total += 10
+                else:
+                    total += 1  # 其他楼层共享10%的权重
+                cum_weights.append(total)
+            self._floor_distribution = (all_floors, {f: i for i, f in enumerate(all_floors)}, cum_weights)
+            self._floor_distribution_key = key
+        return self._floor_distribution
+
+    def generate_passengers(self, count=1):
+        all_floors, floor_pos, cum_weights = self.get_floor_distribution()
+        
+        # 生成起始楼层
+        start_floors = random.choices(
+            all_floors,
+            cum_weights=cum_weights,
+            k=count
+        )
+        
+        # 生成目标楼层 (不能与起始楼层相同)：在其余楼层中均匀抽取，跳过起始楼层的位置
+        end_floors = []
+        for start in start_floors:
+            i = random.randrange(len(all_floors) - 1)
+            if i >= floor_pos[start]:
+                i += 1
+            end_floors.append(all_floors[i])
+        
+        # 创建乘客 (检查楼层人数不超过5人)
+        new_passengers = []
+        for start, end in zip(start_floors, end_floors):
+            if len(self.waiting_passengers.get(start, [])) < 5:  # 楼层人数不超过5人
+                passenger = Passenger(start, end)
+                passenger.spawn_time = self.simulation_time
+                self.parking.observe(self.simulation_time, start)
+                self.plan_route(passenger)
+                self.waiting_passengers[start].append(passenger)
+                self.passengers.append(passenger)
+                new_passengers.append(passenger)
+                
+        # 为新生成的乘客分配电梯
+        if new_passengers:
+            self.assign_elevators()
+        
+    def plan_route(self, passenger):
+        # 没有电梯能从起始楼层直达目的楼层时，先去换乘楼层（空中大堂），到达后再登记最终目的楼层
+        _, transfer = self.zones.route(passenger.current_floor, passenger.destination)
+        if transfer is not None:
+            passenger.final_destination = passenger.destination
+            passenger.destination = transfer
+            passenger.direction = 1 if transfer > passenger.current_floor else -1
+
+    def transfer(self, passenger, floor):
+        # 在换乘楼层下梯的乘客：改为从本层前往最终目的楼层，重新候梯
+        passenger.current_floor = floor
+        passenger.destination = passenger.final_destination
+        passenger.final_destination = None
+        passenger.direction = 1 if passenger.destination > floor else -1
+        passenger.assigned_elevator = None
+        passenger.waiting_time = 0
+        self.waiting_passengers[floor].append(passenger)
+
+    def load_arrival_trace(self, trace):
+        # 之后的仿真按轨迹回放乘客到达，便于不同调度设置在同一需求下对比
+        self.arrival_trace = trace
+        self.trace_cursor = 0
+
+    def replay_arrivals(self):
+        # 放出到达时刻不晚于当前 simulation_time 的轨迹记录（不受每层5人的限制，保证需求一致）
+        trace = self.arrival_trace
+        new_passengers = []
+        while self.trace_cursor < len(trace) and trace.times[self.trace_cursor] <= self.simulation_time:
+            i = self.trace_cursor
+            start, end = int(trace.origins[i]), int(trace.destinations[i])
+            count = 1 if trace.group_sizes is None else int(trace.group_sizes[i])
+            for _ in range(count):
+                passenger = Passenger(start, end)
+                passenger.spawn_time = self.simulation_time
+                self.parking.observe(self.simulation_time, start)
+                self.plan_route(passenger)
+                self.waiting_passengers[start].append(passenger)
+                self.passengers.append(passenger)
+                new_passengers.append(passenger)
+            self.trace_cursor += 1
+        if new_passengers:
+            self.assign_elevators()
+
+    def sim_clock(self):
+        """仿真时钟：每个仿真步长计 1 秒，开关门、空闲返回等计时都以此为准，可任意快进"""
+        return self.simulation_time
+        
+    def step(self):
+        """推进一个仿真步"""
+        # Advance simulation time
+        self.simulation_time += 1
+        
+        # 检查是否需要生成新乘客
+        current_hour = (self.simulation_time // 60) % 24
+        is_peak = (8 <= current_hour < 9) or (18 <= current_hour < 21)
+        generation_interval = 1 if is_peak else 2  # 高峰期1分钟，非高峰期2分钟
+        
+        current_minute = self.simulation_time // self.time_multiplier
+        if self.arrival_trace is not None:
+            self.replay_arrivals()
+        elif current_minute - self.last_passenger_generation >= generation_interval:
+            max_passengers = 5 if is_peak else 3
+            self.generate_passengers(random.randint(1, max_passengers))
+            self.last_passenger_generation = current_minute
+        
+        # 空闲电梯前往停靠楼层，防止电梯卡在中间状态
+        self.park_idle_elevators()
+
+        # 处理电梯和乘客交互
+        transferred = False
+        for elevator in self.elevators:
+            elevator.move()
+            
+            # 处理开门状态
+            if elevator.door_open:
+                # 非返回默认楼层的正常开门，5秒后关门
+                if not elevator.returning_home and self.sim_clock() - elevator.last_activity_time > 5:
+                    elevator.close_door()
+                else:
+                    # 开门时处理乘客上下
+                    floor = elevator.current_floor
+                    floor_passengers = self.waiting_passengers.get(floor, [])
+                    
+                    # 乘客下电梯，到达换乘楼层的转入本层候梯
+                    for passenger in elevator.unboard_passengers():
+                        if passenger.final_destination is not None:
+                            self.transfer(passenger, floor)
+                            floor_passengers = self.waiting_passengers[floor]
+                            transferred = True
+                        else:
+                            self.trip_stats.record(passenger.board_time - passenger.spawn_time,
+                                                   self.simulation_time - passenger.board_time)
+                    
+                    # 乘客上电梯
+                    if floor_passengers:
+                        # 先处理同方向乘客
+                        if elevator.direction == 1:  # 上行
+                            to_board = [p for p in floor_passengers if p.direction == 1]
+                        elif elevator.direction == -1:  # 下行
+                            to_board = [p for p in floor_passengers if p.direction == -1]
+                        else:  # 空闲 - 处理所有方向
+                            to_board = floor_passengers[:]
+                        # 本电梯不停靠其目的楼层（或换乘楼层）的乘客不上
+                        k = elevator.id - 1
+                        to_board = [p for p in to_board if self.zones.serves(k, p.destination)]
+                        if self.destination_dispatch:
+                            # 只上登记时分给本电梯的乘客
+                            to_board = [p for p in to_board if p.assigned_elevator in (None, elevator.id)]
+                        
+                        # 尝试让乘客登梯
+                        boarded = 0
+                        for passenger in to_board[:]:
+                            if boarded >= elevator.max_capacity - len(elevator.passengers):
+                                break
+                            if elevator.board_passenger(passenger, floor_passengers):
+                                boarded += 1
+                                
+                        # 如果有乘客登梯，更新电梯方向
+                        if boarded > 0 and elevator.direction == 0:
+                            elevator.update_direction()
+                    else:
+                        # 如果没有乘客等待，提前关门
+                        if not elevator.returning_home and self.sim_clock() - elevator.last_activity_time > 3:
+                            elevator.close_door()
+
+        # 换乘的乘客和新到的乘客一样登记派梯
+        if transferred:
+            self.assign_elevators()
+
+        # 检查并重新分配未被处理的乘客
+        if self.destination_dispatch:
+            self.reassign_stranded()
+        else:
+            for floor, passengers in list(self.waiting_passengers.items()):
+                if passengers:
+                    # 检查是否有电梯已分配到该楼层
+                    assigned = any(
+                        floor in elevator.destination_floors 
+                        for elevator in self.elevators
+                    )
+                
+                    # 如果没有电梯前往该楼层，重新分配
+                    if not assigned:
+                        for passenger in passengers:
+                            best_elevator = self.find_best_elevator(floor, passenger.direction,
+                                                                    cars=self.zones.direct(floor, passenger.destination))
+                            if best_elevator and floor not in best_elevator.destination_floors:
+                                best_elevator.add_destination(floor)
+                                # 如果电梯是空闲的，设置方向
+                                if best_elevator.direction == 0:
+                                    best_elevator.direction = 1 if floor > best_elevator.current_floor else -1
+
+    def park_idle_elevators(self):
+        # 门已关、车内无人且没有任务的电梯，按停靠策略决定停在哪一层；
+        # 正在前往停靠楼层的电梯不重新规划，否则途经的楼层（包括不可停靠的楼层和 0 层）会被当成停靠楼层
+        idle = [e for e in self.elevators if not e.door_open and not e.passengers and not e.destination_floors]
+        if not idle:
+            return
+        for elevator, floor in zip(idle, self.parking.targets(idle, self.simulation_time)):
+            elevator.parking_floor = floor
+            if elevator.current_floor != floor:
+                elevator.add_destination(floor)
+                elevator.returning_home = True
+                elevator.status = f"返回{floor}F"
+
+    def reassign_stranded(self):
+        # 目的楼层派梯：分到的电梯已不再前往该层（满载离开或方向不符）的乘客，按目的楼层重新登记
+        elevators = {elevator.id: elevator for elevator in self.elevators}
+        for floor, passengers in list(self.waiting_passengers.items()):
+            for passenger in passengers:
+                elevator = elevators.get(passenger.assigned_elevator)
+                if elevator is not None and (floor in elevator.destination_floors or
+                                             (elevator.door_open and elevator.current_floor == floor)):
+                    continue
+                best_elevator = self.find_best_elevator(floor, passenger.direction, passenger.destination,
+                                                        self.zones.direct(floor, passenger.destination))
+                passenger.assigned_elevator = best_elevator.id if best_elevator else None
+                if best_elevator and floor not in best_elevator.destination_floors:
+                    best_elevator.add_destination(floor)
+                    if best_elevator.direction == 0:
+                        best_elevator.direction = 1 if floor > best_elevator.current_floor else -1
+
+    def get_statistics(self):
+        """当前乘客数、已完成行程数、候梯/乘梯时间汇总（见 streaming_stats）和各电梯状态"""
+        total_passengers = len(self.passengers)
+        waiting_passengers = sum(len(p) for p in self.waiting_passengers.values())
+        in_elevator = sum(len(e.passengers) for e in self.elevators)
+        return {
+            "simulation_time": self.simulation_time,
+            "total_passengers": total_passengers,
+            "waiting_passengers": waiting_passengers,
+            "passengers_in_elevators": in_elevator,
+            "completed_trips": total_passengers - waiting_passengers - in_elevator,
+            "wait": self.trip_stats.wait.summary(),
+            "ride": self.trip_stats.ride.summary(),
+            "elevators": [
+                {"id": e.id, "current_floor": e.current_floor, "direction": e.direction,
+                 "passengers": len(e.passengers), "status": e.status}
+                for e in self.elevators
+            ],
+        }
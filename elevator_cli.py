@@ -0,0 +1,181 @@
+"""无界面命令行运行器：按配置文件运行某一类仿真模型，把汇总指标以 JSON 输出
+
+    python -m elevator_cli config.json --duration 1440 -o result.json
+
+配置文件为 JSON 对象，"family" 选择模型（也可用 --family 覆盖），其余键为该模型的参数：
+
+    engine     elevator_engine.ElevatorEngine（elevator_system_gui.py 的引擎），duration 单位为时间单位（分钟）
+               n_elevators, n_up, n_down, capacity, elevator_floors, peak_morning, peak_evening, start_time, seed,
+               dispatcher（"nearest_idle" 或 "cost"，见 dispatchers.py，缺省为 nearest_idle）
+    building   building_model.Building（elevator_simulation2.py 的模型，事件驱动），duration 单位为秒
+               total_floors, arrival_rate, seed,
+               elevators: [{"floors": [...], "capacity": 10, "speed": 1.0, "acceleration": 0.5}, ...]（缺省为默认四部）,
+               reassign_interval（秒，设置后定期整体重新分配候梯乘客，见 Building.reoptimize_assignments）,
+               destination_dispatch（true 为目的楼层派梯）
+    qt         elevator13_model.SimulationModel（elevator13-4.py 的模型），duration 单位为仿真步
+               total_floors, basement_floors, default_floor, initial_passengers, seed,
+               elevators: [{"capacity": 10, "floors": [...], "mode": 1}, ...]（缺省为 3 部全楼层并行）,
+               destination_dispatch（true 为目的楼层派梯）,
+               parking（空闲停靠策略 "default"、"stay" 或 "demand"，见 parking.py，缺省为 default）
+
+engine 和 qt 的汇总形式相同：乘客数、完成行程数、候梯/乘梯时间汇总 wait/ride（StreamingStats.summary()，
+单位分别为时间单位和仿真步）和每小时运载人数；building 的汇总见 Building.get_statistics()。
+三类模型都可用 "trace" 指定 arrival_trace 轨迹文件改为回放到达。只导入所选模型，不会加载 tkinter/pygame/PyQt5。
+"""
+import argparse
+import contextlib
+import json
+import random
+import sys
+from typing import Dict
+
+FAMILIES = ("engine", "building", "qt")
+
+
+def load_trace_if_any(config):
+    if not config.get("trace"):
+        return None
+    from arrival_trace import load_trace
+    return load_trace(config["trace"])
+
+
+def run_engine(config: Dict, duration: int) -> Dict:
+    from dispatchers import DISPATCHERS
+    from elevator_engine import DEFAULT_PEAK_PERIODS, ElevatorEngine, parse_peak_periods
+
+    peak_periods = DEFAULT_PEAK_PERIODS
+    if "peak_morning" in config or "peak_evening" in config:
+        peak_periods = parse_peak_periods(config.get("peak_morning", ""), config.get("peak_evening", ""))
+    engine = ElevatorEngine(
+        n_elevators=config.get("n_elevators", 3),
+        n_up=config.get("n_up", 10),
+        n_down=config.get("n_down", 2),
+        capacity=config.get("capacity", 13),
+        elevator_floors=config.get("elevator_floors"),
+        peak_periods=peak_periods,
+        start_time=config.get("start_time", 360),
+        seed=config.get("seed"),
+        dispatcher=DISPATCHERS[config.get("dispatcher", "nearest_idle")](),
+    )
+    trace = load_trace_if_any(config)
+    if trace is not None:
+        engine.load_arrivals(trace.as_arrivals(), trace.group_sizes)
+    engine.step(duration)
+
+    stats = engine.passenger_stats
+    return {
+        "ticks": engine.ticks,
+        "passengers": stats["total"],
+        "boarded": stats["boarded"],
+        "waiting": stats["total"] - stats["boarded"],
+        "completed_trips": len(engine.trips),
+        "wait": engine.trip_stats.wait.summary(),
+        "ride": engine.trip_stats.ride.summary(),
+        "throughput_per_hour": stats["boarded"] * 60 / duration if duration else 0,
+    }
+
+
+def run_building(config: Dict, duration: float) -> Dict:
+    from building_model import Building, Elevator, create_default_elevators
+
+    total_floors = config.get("total_floors", 20)
+    building = Building(total_floors)
+    if "elevators" in config:
+        elevators = [Elevator(i + 1, spec.get("floors", list(range(1, total_floors + 1))),
+                              spec.get("capacity", 10), spec.get("speed", 1), spec.get("acceleration", 0.5))
+                     for i, spec in enumerate(config["elevators"])]
+    else:
+        elevators = create_default_elevators(total_floors)
+    for elevator in elevators:
+        building.add_elevator(elevator)
+    building.reassign_interval = config.get("reassign_interval")
+    building.destination_dispatch = bool(config.get("destination_dispatch", False))
+    trace = load_trace_if_any(config)
+    if trace is not None:
+        building.load_arrival_trace(trace)
+
+    stats = building.run_events(duration, config.get("arrival_rate", 0.1), random.Random(config.get("seed")))
+    # 历史曲线只用于界面绘图，不输出
+    return {k: v for k, v in stats.items() if not k.endswith("_history")}
+
+
+def run_qt(config: Dict, duration: int) -> Dict:
+    from elevator13_model import SimulationModel
+    from parking import PARKING_POLICIES
+
+    # 该模型沿用 random 模块的全局随机数
+    random.seed(config.get("seed"))
+    total_floors = config.get("total_floors", 20)
+    basement_floors = config.get("basement_floors", 0)
+    all_floors = [f for f in range(-basement_floors, total_floors + 1) if f != 0]
+    specs = [(spec.get("capacity", 10), spec.get("floors", all_floors), spec.get("mode", 1))
+             for spec in config.get("elevators", [{}] * 3)]
+
+    model = SimulationModel()
+    model.destination_dispatch = bool(config.get("destination_dispatch", False))
+    model.parking = PARKING_POLICIES[config.get("parking", "default")]()
+    trace = load_trace_if_any(config)
+    if trace is not None:
+        model.load_arrival_trace(trace)
+    model.setup(specs, total_floors, basement_floors, config.get("default_floor", 1),
+                config.get("initial_passengers", 5))
+    for _ in range(duration):
+        model.step()
+
+    stats = model.get_statistics()
+    boarded = sum(1 for p in model.passengers if p.board_time is not None)
+    # 每个仿真步计 1 秒
+    return {
+        "ticks": model.simulation_time,
+        "passengers": stats["total_passengers"],
+        "boarded": boarded,
+        "waiting": stats["waiting_passengers"],
+        "completed_trips": stats["completed_trips"],
+        "wait": stats["wait"],
+        "ride": stats["ride"],
+        "throughput_per_hour": boarded * 3600 / duration if duration else 0,
+        "elevators": stats["elevators"],
+    }
+
+
+RUNNERS = {"engine": run_engine, "building": run_building, "qt": run_qt}
+
+
+def run(config: Dict, duration, family=None) -> Dict:
+    family = family or config.get("family", "engine")
+    if family not in RUNNERS:
+        raise ValueError(f"未知的模型类型: {family}（可选 {', '.join(FAMILIES)}）")
+    # 模型里零星的 print 改写到标准错误，保证标准输出只有 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        result = RUNNERS[family](config, duration)
+    return {"family": family, "duration": duration, "config": config, "summary": result}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电梯仿真无界面运行，输出 JSON 汇总")
+    parser.add_argument("config", help="JSON 配置文件，- 表示从标准输入读取")
+    parser.add_argument("--family", choices=FAMILIES, help="模型类型，默认取配置中的 family，再缺省为 engine")
+    parser.add_argument("--duration", type=float, required=True,
+                        help="运行时长（engine 为时间单位，building 为秒，qt 为仿真步）")
+    parser.add_argument("-o", "--output", help="输出文件，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    if args.config == "-":
+        config = json.load(sys.stdin)
+    else:
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+    family = args.family or config.get("family", "engine")
+    duration = args.duration if family == "building" else int(args.duration)
+    result = run(config, duration, family)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""电梯调度仿真引擎（无界面）
+
+从 elevator_system_gui.py 中抽取的调度与运行逻辑，不依赖 tkinter/matplotlib，
+可在脚本或测试中直接批量运行：
+
+    engine = ElevatorEngine(n_elevators=3, n_up=10, n_down=2, seed=1)
+    engine.run_until(1440)   # 仿真一整天（1440 个时间单位）
+    print(engine.passenger_stats["boarded"])
+
+派梯策略可替换，见 dispatchers.py：默认为原先的 NearestIdleDispatcher，按估算到达时间择优的
+CostDispatcher 需显式传入 dispatcher=CostDispatcher()。
+"""
+import bisect
+import random
+from collections import deque
+from typing import List, Dict, Deque, Optional, Tuple
+
+from dispatchers import Dispatcher, NearestIdleDispatcher
+from streaming_stats import TripStats
+from trip_store import TripStore
+
+DEFAULT_PEAK_PERIODS = {"morning": (420, 540), "evening": (1080, 1260)}
+
+
+class Passenger:
+    __slots__ = ("current_floor", "target_floor", "direction", "spawn_tick", "board_tick", "id")
+
+    def __init__(self, current_floor: int, target_floor: int, direction: str, spawn_tick: int = 0):
+        self.current_floor = current_floor
+        self.target_floor = target_floor
+        self.direction = direction
+        self.spawn_tick = spawn_tick  # 产生时的 ticks，等待时间 = board_tick - spawn_tick
+        self.board_tick = None
+        self.id = id(self)
+
+
+class Elevator:
+    __slots__ = ("eid", "current_floor", "allowed_floors", "allowed_set", "max_capacity", "direction",
+                 "passengers", "target_floors", "status", "current_y", "door_open", "door_timer",
+                 "idle_timer", "emergency_reset", "resetting", "busy_for_call")
+
+    def __init__(self, eid: int, allowed_floors: List[int], max_capacity: int):
+        self.eid = eid
+        self.current_floor = allowed_floors[-1]
+        self.allowed_floors = allowed_floors
+        self.allowed_set = frozenset(allowed_floors)
+        self.max_capacity = max_capacity
+        self.direction = "idle"
+        self.passengers: List[Passenger] = []
+        self.target_floors = deque()
+        self.status = "idle"
+        self.current_y = 40 + self.current_floor * 40
+        self.door_open = False
+        self.door_timer = 0
+        self.idle_timer = 0
+        self.emergency_reset = False
+        self.resetting = False
+        self.busy_for_call: Dict[Tuple[int, str], str] = {}
+
+    def is_idle_too_long(self, max_idle_time=10):
+        return self.direction == "idle" and self.idle_timer >= max_idle_time
+
+    def get_direction_symbol(self):
+        if self.direction == "up":
+            return "↑"
+        elif self.direction == "down":
+            return "↓"
+        return "○"
+
+
+class HallCallIndex:
+    """按方向维护有乘客等待的楼层位图
+
+    masks[direction] 的第 i 位为 1 表示楼层下标 i 有该方向的呼梯，入队/出队时增量更新，
+    "上方是否还有上行呼梯" 这类查询只需一次位运算，不再逐层扫描等待队列。
+    下标越小楼层越高，因此 above 指下标小于当前楼层的部分。
+    """
+
+    def __init__(self):
+        self.masks = {"up": 0, "down": 0}
+
+    def add(self, floor: int, direction: str):
+        self.masks[direction] |= 1 << floor
+
+    def remove(self, floor: int, direction: str):
+        self.masks[direction] &= ~(1 << floor)
+
+    def clear(self):
+        self.masks["up"] = 0
+        self.masks["down"] = 0
+
+    def has_call(self, floor: int, direction: str) -> bool:
+        return (self.masks[direction] >> floor) & 1 == 1
+
+    def any_above(self, floor: int, direction: str) -> bool:
+        return self.masks[direction] & ((1 << floor) - 1) != 0
+
+    def any_below(self, floor: int, direction: str) -> bool:
+        return self.masks[direction] >> (floor + 1) != 0
+
+    def floors_with_calls(self):
+        """按下标升序遍历任一方向有呼梯的楼层"""
+        mask = self.masks["up"] | self.masks["down"]
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+
+def build_floors(n_up: int, n_down: int) -> List[str]:
+    """生成楼层列表，顺序为 Fn ... F1, 0, B1 ... Bn（下标 0 为顶层）"""
+    return [f"F{i}" for i in range(n_up, 0, -1)] + ["0"] + [f"B{i}" for i in range(1, n_down+1)]
+
+
+def parse_peak_periods(morning_str: str, evening_str: str) -> Dict[str, Tuple[int, int]]:
+    """解析 hh:mm-hh:mm 格式的早晚高峰，格式错误时使用默认高峰时段"""
+    periods = {}
+    try:
+        for name, s in (("morning", morning_str), ("evening", evening_str)):
+            start, end = s.split('-')
+            start_hour, start_min = map(int, start.strip().split(':'))
+            end_hour, end_min = map(int, end.strip().split(':'))
+            periods[name] = (start_hour * 60 + start_min, end_hour * 60 + end_min)
+    except ValueError:
+        return dict(DEFAULT_PEAK_PERIODS)
+    return periods
+
+
+class ElevatorEngine:
+    """无界面的电梯仿真引擎，持有楼层、电梯和各楼层等待队列
+
+    内部一律使用楼层下标（0 为顶层，n_floors-1 为最底层）表示电梯位置、乘客起止楼层和等待队列，
+    "F10"/"0"/"B2" 等楼层名只在界面和统计输出时通过 floors[idx] 转换。
+    time 为一天中的分钟数（0-1439，循环），ticks 为自开始以来推进的时间单位数。
+    """
+
+    def __init__(self, n_elevators: int = 3, n_up: int = 10, n_down: int = 2, capacity: int = 13,
+                 elevator_floors: Optional[List[List[str]]] = None,
+                 peak_periods: Optional[Dict[str, Tuple[int, int]]] = None,
+                 start_time: int = 360, seed=None, dispatcher: Optional[Dispatcher] = None):
+        if n_up < 1 or n_down < 0:
+            raise ValueError("楼层数必须为正整数")
+        self.random = random.Random(seed)
+        self.floors = build_floors(n_up, n_down)
+        self.n_floors = len(self.floors)
+        self.floor_index = {floor: i for i, floor in enumerate(self.floors)}
+        self.zero_idx = self.floor_index["0"]
+        self.elevators: List[Elevator] = []
+        for i in range(n_elevators):
+            allowed = None
+            if elevator_floors is not None and i < len(elevator_floors):
+                unknown = [f for f in elevator_floors[i] if f not in self.floor_index]
+                if unknown:
+                    raise ValueError(f"电梯{i + 1}的停靠楼层 {', '.join(map(str, unknown))} 不存在"
+                                     f"（可选 {', '.join(self.floors)}）")
+                allowed = sorted(self.floor_index[f] for f in elevator_floors[i])
+            if not allowed:
+                allowed = list(range(self.n_floors))
+            self.elevators.append(Elevator(i, allowed, capacity))
+        self.waiting_passengers: List[Dict[str, Deque[Passenger]]] = [
+            {"up": deque(), "down": deque()} for _ in range(self.n_floors)]
+        self.hall_calls = HallCallIndex()
+        # 已指派的呼梯 (楼层, 方向) -> 电梯，另以位图记录便于取出未指派的呼梯；
+        # 各电梯的 busy_for_call / target_floors 与之同步
+        self.call_owner: Dict[Tuple[int, str], Elevator] = {}
+        self.assigned_calls = HallCallIndex()
+        self.dispatcher = dispatcher if dispatcher is not None else NearestIdleDispatcher()
+        self.peak_periods = dict(peak_periods) if peak_periods is not None else dict(DEFAULT_PEAK_PERIODS)
+        self.time = start_time
+        self.ticks = 0
+        self.passenger_stats = {"total": 0, "boarded": 0}
+        # 已完成行程（时间单位为 ticks），等待/乘梯时间由此统计
+        self.trips = TripStore()
+        # 等待/乘梯时间的流式统计（均值、分位数、最大值），界面和批量报表从这里读取
+        self.trip_stats = TripStats(resolution=1)
+        self.max_idle_time = 10
+        # 预生成的到达序列（见 load_arrivals），为 None 时按 tick 随机生成
+        self.scheduled_arrivals = None
+        self.arrival_cursor = 0
+
+    # ---------- 运行接口 ----------
+
+    def step(self, n: int = 1):
+        """推进 n 个时间单位（每个时间单位为 1 仿真分钟）"""
+        for _ in range(n):
+            self.time = (self.time + 1) % 1440
+            self.tick()
+
+    def run_until(self, t: int):
+        """运行到自开始以来的第 t 个时间单位"""
+        while self.ticks < t:
+            self.step()
+
+    def tick(self):
+        """在当前 time 下执行一次调度（不推进时钟，真实时间模式下由调用方设置 time）"""
+        if self.scheduled_arrivals is not None:
+            self.release_scheduled_arrivals()
+        else:
+            self.generate_passengers()
+        self.assign_elevators()
+        self.move_elevators()
+        self.ticks += 1
+
+    def is_peak_time(self):
+        for start, end in self.peak_periods.values():
+            if start <= self.time < end:
+                return True
+        return False
+
+    def floor_label(self, floor: int) -> str:
+        return self.floors[floor]
+
+    def waiting_count(self, floor: int) -> int:
+        queues = self.waiting_passengers[floor]
+        return len(queues["up"]) + len(queues["down"])
+
+    # ---------- 调度逻辑 ----------
+
+    def generate_passengers(self):
+        base_rate = 0.025
+        if self.is_peak_time():
+            base_rate = 0.075
+        rng = self.random
+        top, bottom = 0, self.n_floors - 1
+        for floor in range(self.n_floors):
+            if rng.random() < base_rate:
+                if floor == top:
+                    direction = "down"
+                elif floor == bottom:
+                    direction = "up"
+                else:
+                    direction = "up" if rng.random() < 0.5 else "down"
+                if direction == "up":
+                    target_floor = rng.randrange(0, floor)
+                else:
+                    target_floor = rng.randrange(floor + 1, self.n_floors)
+                self.enqueue_passenger(Passenger(floor, target_floor, direction, self.ticks))
+
+    def load_arrivals(self, arrivals, group_sizes=None):
+        """改为回放预生成的到达序列（ticks, origins, destinations 三列，按 ticks 非递减）
+
+        通常来自 arrivals.ArrivalGenerator.generate() 或 arrival_trace.load_trace()；
+        列只按下标逐条读取，内存映射的大轨迹不会被整体转换成 Python 对象。
+        group_sizes 给出每条到达的同行人数（默认 1）。ticks 小于当前 ticks 的到达会被跳过。
+        """
+        ticks, origins, destinations = arrivals[:3]
+        self.scheduled_arrivals = (ticks, origins, destinations, group_sizes)
+        self.arrival_cursor = bisect.bisect_left(ticks, self.ticks)
+
+    def release_scheduled_arrivals(self):
+        ticks, origins, destinations, group_sizes = self.scheduled_arrivals
+        cursor = self.arrival_cursor
+        while cursor < len(ticks) and ticks[cursor] <= self.ticks:
+            origin, target = int(origins[cursor]), int(destinations[cursor])
+            direction = "up" if target < origin else "down"
+            for _ in range(1 if group_sizes is None else int(group_sizes[cursor])):
+                self.enqueue_passenger(Passenger(origin, target, direction, self.ticks))
+            cursor += 1
+        self.arrival_cursor = cursor
+
+    def enqueue_passenger(self, passenger: Passenger):
+        self.waiting_passengers[passenger.current_floor][passenger.direction].append(passenger)
+        self.hall_calls.add(passenger.current_floor, passenger.direction)
+        self.passenger_stats["total"] += 1
+
+    def assign_elevators(self):
+        # 指派给复位中或已满载电梯的呼梯退回重新分配（已被服务的呼梯在乘客上车时即已释放）
+        for elevator in self.elevators:
+            if elevator.busy_for_call and (elevator.resetting or elevator.emergency_reset
+                                           or len(elevator.passengers) >= elevator.max_capacity):
+                for key in list(elevator.busy_for_call):
+                    self.release_call(elevator, key)
+        self.dispatcher.assign(self)
+
+    def assign_call(self, elevator: Elevator, floor: int, direction: str):
+        """把 (floor, direction) 呼梯指派给 elevator，空闲的电梯随即驶向该楼层"""
+        key = (floor, direction)
+        elevator.busy_for_call[key] = direction
+        self.call_owner[key] = elevator
+        self.assigned_calls.add(floor, direction)
+        if floor not in elevator.target_floors:
+            elevator.target_floors.append(floor)
+        if elevator.direction == "idle":
+            if floor < elevator.current_floor:
+                elevator.direction = "up"
+            elif floor > elevator.current_floor:
+                elevator.direction = "down"
+            else:
+                elevator.direction = direction
+
+    def release_call(self, elevator: Elevator, key: Tuple[int, str]):
+        del elevator.busy_for_call[key]
+        del self.call_owner[key]
+        self.assigned_calls.remove(*key)
+        floor = key[0]
+        busy = elevator.busy_for_call
+        if (floor, "up") not in busy and (floor, "down") not in busy and floor in elevator.target_floors:
+            elevator.target_floors.remove(floor)
+
+    def has_work_ahead(self, elevator: Elevator, floor: int) -> bool:
+        """沿当前运行方向在 floor 前方是否还有目标、同向呼梯或乘客目的地"""
+        if elevator.direction == "up":
+            return (any(t < floor for t in elevator.target_floors) or self.hall_calls.any_above(floor, "up")
+                    or any(p.target_floor < floor for p in elevator.passengers))
+        if elevator.direction == "down":
+            return (any(t > floor for t in elevator.target_floors) or self.hall_calls.any_below(floor, "down")
+                    or any(p.target_floor > floor for p in elevator.passengers))
+        return False
+
+    def move_elevators(self):
+        top, bottom = 0, self.n_floors - 1
+        waiting = self.waiting_passengers
+        for elevator in self.elevators:
+            if elevator.resetting:
+                curr_idx = elevator.current_floor
+                if curr_idx > self.zero_idx:
+                    elevator.current_floor = curr_idx - 1
+                    elevator.current_y += 40
+                    elevator.direction = "down"
+                elif curr_idx < self.zero_idx:
+                    elevator.current_floor = curr_idx + 1
+                    elevator.current_y -= 40
+                    elevator.direction = "up"
+                else:
+                    elevator.resetting = False
+                    elevator.direction = "idle"
+                    elevator.door_open = False
+                    elevator.door_timer = 0
+                    elevator.target_floors.clear()
+                    elevator.passengers.clear()
+                    # 全部电梯到0层才清空系统等待和统计
+                    if all(not elev.resetting and elev.current_floor == self.zero_idx for elev in self.elevators):
+                        for queues in waiting:
+                            queues["up"].clear()
+                            queues["down"].clear()
+                        for key, owner in list(self.call_owner.items()):
+                            self.release_call(owner, key)
+                        self.hall_calls.clear()
+                        self.passenger_stats = {"total": 0, "boarded": 0}
+                        self.trips.clear()
+                        self.trip_stats.clear()
+                continue
+            if elevator.door_open:
+                elevator.door_timer += 1
+                if elevator.door_timer >= 3:
+                    elevator.door_open = False
+                    elevator.door_timer = 0
+                continue
+            curr_idx = elevator.current_floor
+            if elevator.direction == "up" and curr_idx == top:
+                if elevator.passengers or elevator.target_floors:
+                    elevator.direction = "down"
+                else:
+                    elevator.direction = "idle"
+            elif elevator.direction == "down" and curr_idx == bottom:
+                if elevator.passengers or elevator.target_floors:
+                    elevator.direction = "up"
+                else:
+                    elevator.direction = "idle"
+            if elevator.direction == "idle" and elevator.target_floors:
+                target_idx = min(elevator.target_floors, key=lambda t: abs(t - curr_idx))
+                if target_idx < curr_idx:
+                    elevator.direction = "up"
+                elif target_idx > curr_idx:
+                    elevator.direction = "down"
+                else:
+                    elevator.direction = "idle"
+            if not elevator.target_floors and not elevator.passengers:
+                elevator.direction = "idle"
+                elevator.idle_timer += 1
+                continue
+            else:
+                elevator.idle_timer = 0
+            if elevator.direction == "up":
+                if curr_idx > top:
+                    elevator.current_floor = curr_idx - 1
+                    elevator.current_y -= 40
+            elif elevator.direction == "down":
+                if curr_idx < bottom:
+                    elevator.current_floor = curr_idx + 1
+                    elevator.current_y += 40
+            curr_idx = elevator.current_floor
+            queues = waiting[curr_idx]
+            stop = False
+            if elevator.passengers and any(p.target_floor == curr_idx for p in elevator.passengers):
+                stop = True
+            # 满载时不为厅外呼梯停靠（满载直驶），只让到站乘客下车
+            has_room = len(elevator.passengers) < elevator.max_capacity
+            if has_room and elevator.direction == "up" and queues["up"]:
+                stop = True
+            if has_room and elevator.direction == "down" and queues["down"]:
+                stop = True
+            if has_room and (curr_idx == top or curr_idx == bottom) and (queues["up"] or queues["down"]):
+                stop = True
+            if curr_idx in elevator.target_floors and not self.has_work_ahead(elevator, curr_idx):
+                # 到达指派楼层且前方已无任务：停靠并转向所接呼梯的方向，让该方向的乘客上车
+                calls = [d for f, d in elevator.busy_for_call if f == curr_idx]
+                if calls and elevator.direction not in calls:
+                    elevator.direction = calls[0]
+                stop = True
+            if stop:
+                elevator.door_open = True
+                self.handle_passengers(elevator)
+                self.update_direction_after_stop(elevator)
+                if elevator.direction == "up" and curr_idx == top:
+                    if elevator.passengers or elevator.target_floors:
+                        elevator.direction = "down"
+                    else:
+                        elevator.direction = "idle"
+                elif elevator.direction == "down" and curr_idx == bottom:
+                    if elevator.passengers or elevator.target_floors:
+                        elevator.direction = "up"
+                    else:
+                        elevator.direction = "idle"
+            if elevator.direction != "idle" and not self.has_work_ahead(elevator, curr_idx):
+                elevator.direction = "idle"
+
+    def handle_passengers(self, elevator: Elevator):
+        current_floor = elevator.current_floor
+        leaving = [p for p in elevator.passengers if p.target_floor == current_floor]
+        for p in leaving:
+            elevator.passengers.remove(p)
+            self.passenger_stats["boarded"] += 1
+            self.trips.append(p.current_floor, p.target_floor, p.spawn_tick, p.board_tick, self.ticks, elevator.eid)
+            self.trip_stats.record(p.board_tick - p.spawn_tick, self.ticks - p.board_tick)
+        available_space = elevator.max_capacity - len(elevator.passengers)
+        if current_floor == 0 or current_floor == self.n_floors - 1:
+            direction_list = ["up", "down"]
+        else:
+            direction_list = [elevator.direction]
+        for direction in direction_list:
+            if available_space <= 0:
+                break
+            queue = self.waiting_passengers[current_floor][direction]
+            to_board = min(available_space, len(queue))
+            for _ in range(to_board):
+                p = queue.popleft()
+                p.board_tick = self.ticks
+                elevator.passengers.append(p)
+                available_space -= 1
+            if not queue:
+                self.hall_calls.remove(current_floor, direction)
+                owner = self.call_owner.get((current_floor, direction))
+                if owner is not None:
+                    self.release_call(owner, (current_floor, direction))
+
+    def update_direction_after_stop(self, elevator: Elevator):
+        curr_idx = elevator.current_floor
+        # 本层的呼梯视为已响应；没能全部上车的乘客在下一轮重新派梯
+        for key in ((curr_idx, "up"), (curr_idx, "down")):
+            if key in elevator.busy_for_call:
+                self.release_call(elevator, key)
+        if not self.has_work_ahead(elevator, curr_idx):
+            elevator.direction = "idle"
+
+    def emergency_reset(self):
+        """紧急复位：所有电梯直达0层，全部到达后清空等待乘客和统计"""
+        for key, elevator in list(self.call_owner.items()):
+            self.release_call(elevator, key)
+        for elevator in self.elevators:
+            elevator.resetting = True
+            elevator.door_open = False
+            elevator.door_timer = 0
+            if elevator.current_floor > self.zero_idx:
+                elevator.direction = "down"
+            elif elevator.current_floor < self.zero_idx:
+                elevator.direction = "up"
+            else:
+                elevator.direction = "idle"
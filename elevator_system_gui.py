@@ -1,59 +1,12 @@
 ﻿import tkinter as tk
 from tkinter import messagebox
-import random
-from collections import deque
-from typing import List, Dict, Deque
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from typing import Optional
+import math
 import time
-
-class Passenger:
-    def __init__(self, current_floor: str, target_floor: str, direction: str):
-        self.current_floor = current_floor
-        self.target_floor = target_floor
-        self.direction = direction
-        self.waiting_time = 0
-        self.id = id(self)
-
-class Elevator:
-    def __init__(self, eid: int, allowed_floors: List[str], max_capacity: int):
-        self.eid = eid
-        self.current_floor = allowed_floors[-1]
-        self.allowed_floors = allowed_floors
-        self.max_capacity = max_capacity
-        self.direction = "idle"
-        self.passengers: List[Passenger] = []
-        self.target_floors = deque()
-        self.status = "idle"
-        self.current_y = 40 + allowed_floors.index(self.current_floor) * 40
-        self.door_open = False
-        self.door_timer = 0
-        self.idle_timer = 0
-        self.emergency_reset = False
-        self.resetting = False
-        self.floors = allowed_floors
-        self.busy_for_call: Dict[str, str] = {}
-
-    def is_idle_too_long(self, max_idle_time=10):
-        return self.direction == "idle" and self.idle_timer >= max_idle_time
-
-    def get_direction_symbol(self):
-        if self.direction == "up":
-            return "↑"
-        elif self.direction == "down":
-            return "↓"
-        return "○"
-
-    def start_emergency_reset(self):
-        self.emergency_reset = True
-        self.target_floors = deque()
-        if self.current_floor != "0":
-            if self.floors.index(self.current_floor) > self.floors.index("0"):
-                self.direction = "down"
-            else:
-                self.direction = "up"
+from blit_chart import BlitChart
+from chart_support import create_tk_chart
+from dispatchers import DISPATCHERS
+from elevator_engine import ElevatorEngine, build_floors, parse_peak_periods
 
 class ElevatorSystemGUI:
     def __init__(self, master):
@@ -80,7 +33,22 @@ class ElevatorSystemGUI:
         self.dark_mode = False
         self.running = False
         self.timer = None
-        self.elevator_animations = {}
+        self.frame_timer = None
+        self.sim_interval = 500
+        self.frame_interval = 100
+        self.rendered_ticks = -1
+        # 图表按自己的节拍刷新，间隔长于仿真步长，只在引擎推进后 blit 柱高
+        self.chart_timer = None
+        self.chart_interval = 1000
+        self.charted_ticks = -1
+        self.chart_order = []
+        self.chart_bars = []
+        # 保留模式画布：布局键变化时才重建静态元素，*_state 记录上一帧已绘制的状态
+        self.canvas_layout = None
+        self.floor_items = []
+        self.elevator_items = []
+        self.floor_state = []
+        self.elevator_state = []
         self.use_real_time = False
         self.last_real_time_update = 0
 
@@ -108,6 +76,12 @@ class ElevatorSystemGUI:
         tk.Label(self.peak_frame, text="晚高峰:", bg=self.colors["bg_panel"], fg=self.colors["fg_text"]).grid(row=1, column=0, padx=5, pady=5, sticky="e")
         self.peak_evening_var = tk.StringVar(value="18:00-21:00")
         tk.Entry(self.peak_frame, textvariable=self.peak_evening_var, width=10, bg=self.colors["bg_main"], fg=self.colors["fg_text"]).grid(row=1, column=1, padx=5, pady=5)
+        # 派梯策略（见 dispatchers.py），缺省为原先的最近空闲电梯
+        tk.Label(self.peak_frame, text="派梯策略:", bg=self.colors["bg_panel"], fg=self.colors["fg_text"]).grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.dispatcher_var = tk.StringVar(value="nearest_idle")
+        dispatcher_menu = tk.OptionMenu(self.peak_frame, self.dispatcher_var, *DISPATCHERS)
+        dispatcher_menu.config(bg=self.colors["bg_main"], fg=self.colors["fg_text"], highlightthickness=0)
+        dispatcher_menu.grid(row=2, column=1, padx=5, pady=5, sticky="w")
         self.btn_frame = tk.Frame(self.top_frame, bg=self.colors["bg_panel"])
         self.btn_frame.pack(side=tk.RIGHT, padx=5)
         self.elevator_floors_btn = self.create_hover_button(self.btn_frame, "设置停靠楼层", self.set_elevator_floors_dialog)
@@ -147,36 +121,21 @@ class ElevatorSystemGUI:
         self.stats_text.config(state=tk.DISABLED)
         self.chart_frame = tk.Frame(self.stats_frame, bg=self.colors["bg_panel"], relief=tk.SUNKEN, bd=1)
         self.chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        self.fig = Figure(figsize=(2.8, 3), dpi=100)
-        self.ax = self.fig.add_subplot(111)
-        self.canvas_chart = FigureCanvasTkAgg(self.fig, self.chart_frame)
-        self.canvas_chart.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # 图表（及 matplotlib 的导入、中文字体查找）推迟到第一次开始仿真时再建，见 ensure_chart
+        self.fig = None
+        self.ax = None
+        self.canvas_chart = None
+        self.chart = None
         self.elevator_floors = None
-        self.floors = []
-        self.elevators = []
-        self.waiting_passengers: Dict[str, Dict[str, Deque[Passenger]]] = {}
+        self.engine: Optional[ElevatorEngine] = None
         self.time = 360
-        self.peak_periods = {}
-        self.passenger_history = []
-        self.passenger_stats = {"total": 0, "boarded": 0, "wait_times": []}
-        self.max_idle_time = 10
         self.master.bind("<Configure>", self.on_window_resize)
-        self.setup_matplotlib_fonts()
 
-    def setup_matplotlib_fonts(self):
-        try:
-            import matplotlib.font_manager as fm
-            font_names = [f.name for f in fm.fontManager.ttflist]
-            chinese_fonts = ['Microsoft JianhengHei', 'WenQuanYi Micro Hei', 'Heiti TC', 'Microsoft YaHei', 'SimSun']
-            available_font = None
-            for font in chinese_fonts:
-                if font in font_names:
-                    available_font = font
-                    break
-            if available_font:
-                matplotlib.rcParams["font.family"] = available_font
-        except Exception as e:
-            print(f"字体配置错误: {e}")
+    def ensure_chart(self):
+        if self.chart is None:
+            self.fig, self.ax, self.canvas_chart = create_tk_chart(
+                self.chart_frame, candidates=('Microsoft JianhengHei', 'WenQuanYi Micro Hei', 'Heiti TC', 'Microsoft YaHei', 'SimSun'))
+            self.chart = BlitChart(self.canvas_chart)
 
     def create_hover_button(self, parent, text, command):
         button = tk.Button(parent, text=text, command=command,
@@ -199,7 +158,7 @@ class ElevatorSystemGUI:
         if n_up < 1 or n_down < 0:
             messagebox.showerror("错误", "楼层数必须为正整数")
             return
-        all_floors = [f"F{i}" for i in range(n_up, 0, -1)] + ["0"] + [f"B{i}" for i in range(1, n_down+1)]
+        all_floors = build_floors(n_up, n_down)
         top = tk.Toplevel(self.master)
         top.title("电梯停靠楼层设置")
         top.transient(self.master)
@@ -248,40 +207,39 @@ class ElevatorSystemGUI:
         if n_up < 1 or n_down < 0:
             messagebox.showerror("错误", "楼层数必须为正整数")
             return
-        self.floors = [f"F{i}" for i in range(n_up, 0, -1)] + ["0"] + [f"B{i}" for i in range(1, n_down+1)]
-        if self.elevator_floors is None or len(self.elevator_floors) != n_elevators:
-            self.elevator_floors = [self.floors.copy() for _ in range(n_elevators)]
-        else:
-            if len(self.elevator_floors) < n_elevators:
-                for _ in range(n_elevators - len(self.elevator_floors)):
-                    self.elevator_floors.append(self.floors.copy())
-            elif len(self.elevator_floors) > n_elevators:
-                self.elevator_floors = self.elevator_floors[:n_elevators]
-        self.elevators = []
-        for i in range(n_elevators):
-            if not self.elevator_floors[i]:
-                self.elevator_floors[i] = self.floors.copy()
-            initial_floor = self.elevator_floors[i][-1]
-            elevator = Elevator(i, self.elevator_floors[i], capacity)
-            elevator.current_floor = initial_floor
-            elevator.current_y = 40 + self.floors.index(initial_floor) * 40
-            elevator.floors = self.floors
-            elevator.busy_for_call = {}
-            self.elevators.append(elevator)
-        self.waiting_passengers = {floor: {"up": deque(), "down": deque()} for floor in self.floors}
-        self.parse_peak_periods()
-        self.passenger_stats = {"total": 0, "boarded": 0, "wait_times": []}
+        try:
+            self.engine = ElevatorEngine(n_elevators, n_up, n_down, capacity,
+                                         elevator_floors=self.elevator_floors,
+                                         peak_periods=self.parse_peak_periods(),
+                                         start_time=self.time,
+                                         dispatcher=DISPATCHERS[self.dispatcher_var.get()]())
+        except ValueError as exc:
+            # 修改楼层数后，之前设置的停靠楼层可能已不存在
+            messagebox.showerror("错误", f"{exc}，请重新设置停靠楼层")
+            return
+        self.rendered_ticks = -1
+        self.charted_ticks = -1
+        self.canvas_layout = None
+        self.setup_chart()
         self.running = True
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         self.emergency_btn.config(state=tk.NORMAL)
         self.status_label.config(text="运行中（仿真时间）" if not self.use_real_time else "运行中（真实时间）")
         self.update_simulation()
+        self.render_frame()
+        self.refresh_chart()
 
     def stop_simulation(self):
         self.running = False
         if self.timer:
             self.master.after_cancel(self.timer)
+        if self.frame_timer:
+            self.master.after_cancel(self.frame_timer)
+            self.frame_timer = None
+        if self.chart_timer:
+            self.master.after_cancel(self.chart_timer)
+            self.chart_timer = None
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         self.emergency_btn.config(state=tk.DISABLED)
@@ -292,6 +250,8 @@ class ElevatorSystemGUI:
         if self.use_real_time:
             self.time_mode_btn.config(text="使用真实时间")
             self.time = self.get_current_hour_minute()
+            if self.engine:
+                self.engine.time = self.time
         else:
             self.time_mode_btn.config(text="使用仿真时间")
         self.status_label.config(text="运行中（真实时间）" if self.use_real_time else "运行中（仿真时间）")
@@ -302,370 +262,198 @@ class ElevatorSystemGUI:
         return current_time.tm_hour * 60 + current_time.tm_min
 
     def parse_peak_periods(self):
-        morning_str = self.peak_morning_var.get()
-        evening_str = self.peak_evening_var.get()
-        try:
-            start, end = morning_str.split('-')
-            start_hour, start_min = map(int, start.strip().split(':'))
-            end_hour, end_min = map(int, end.strip().split(':'))
-            self.peak_periods["morning"] = (start_hour * 60 + start_min, end_hour * 60 + end_min)
-            start, end = evening_str.split('-')
-            start_hour, start_min = map(int, start.strip().split(':'))
-            end_hour, end_min = map(int, end.strip().split(':'))
-            self.peak_periods["evening"] = (start_hour * 60 + start_min, end_hour * 60 + end_min)
-        except:
-            self.peak_periods["morning"] = (420, 540)
-            self.peak_periods["evening"] = (1080, 1260)
+        return parse_peak_periods(self.peak_morning_var.get(), self.peak_evening_var.get())
 
     def is_peak_time(self):
-        if "morning" in self.peak_periods:
-            start, end = self.peak_periods["morning"]
-            if start <= self.time < end:
-                return True
-        if "evening" in self.peak_periods:
-            start, end = self.peak_periods["evening"]
-            if start <= self.time < end:
-                return True
-        return False
-
-    def generate_passengers(self):
-        base_rate = 0.025
-        if self.is_peak_time():
-            base_rate = 0.075
-        for floor in self.floors:
-            if random.random() < base_rate:
-                if floor == self.floors[0]:
-                    direction = "down"
-                elif floor == self.floors[-1]:
-                    direction = "up"
-                else:
-                    direction = "up" if random.random() < 0.5 else "down"
-                if direction == "up":
-                    possible_targets = self.floors[:self.floors.index(floor)]
-                else:
-                    possible_targets = self.floors[self.floors.index(floor)+1:]
-                if not possible_targets:
-                    continue
-                target_floor = random.choice(possible_targets)
-                passenger = Passenger(floor, target_floor, direction)
-                self.waiting_passengers[floor][direction].append(passenger)
-                self.passenger_stats["total"] += 1
-
-    def assign_elevators(self):
-        for elevator in self.elevators:
-            remove_list = []
-            for key, reqdir in elevator.busy_for_call.items():
-                if key == (elevator.current_floor, reqdir):
-                    remove_list.append(key)
-            for key in remove_list:
-                del elevator.busy_for_call[key]
-        for floor in self.floors:
-            for direction in ["up", "down"]:
-                if not self.waiting_passengers[floor][direction]:
-                    continue
-                already_assigned = False
-                for elevator in self.elevators:
-                    if (floor, direction) in elevator.busy_for_call:
-                        already_assigned = True
-                        break
-                if already_assigned:
-                    continue
-                best_elevator = None
-                min_dist = float('inf')
-                for elevator in self.elevators:
-                    if elevator.resetting or elevator.emergency_reset or floor not in elevator.allowed_floors:
-                        continue
-                    if elevator.direction == "idle" and not elevator.target_floors:
-                        dist = abs(self.floors.index(floor) - self.floors.index(elevator.current_floor))
-                        if dist < min_dist:
-                            min_dist = dist
-                            best_elevator = elevator
-                if best_elevator:
-                    best_elevator.target_floors.append(floor)
-                    best_elevator.busy_for_call[(floor, direction)] = direction
-                    if self.floors.index(floor) < self.floors.index(best_elevator.current_floor):
-                        best_elevator.direction = "up"
-                    elif self.floors.index(floor) > self.floors.index(best_elevator.current_floor):
-                        best_elevator.direction = "down"
-                    else:
-                        best_elevator.direction = direction
-
-    def move_elevators(self):
-        for elevator in self.elevators:
-            if getattr(elevator, "resetting", False):
-                curr_idx = self.floors.index(elevator.current_floor)
-                zero_idx = self.floors.index("0")
-                if curr_idx > zero_idx:
-                    elevator.current_floor = self.floors[curr_idx - 1]
-                    elevator.current_y += 40
-                    elevator.direction = "down"
-                elif curr_idx < zero_idx:
-                    elevator.current_floor = self.floors[curr_idx + 1]
-                    elevator.current_y -= 40
-                    elevator.direction = "up"
-                else:
-                    elevator.resetting = False
-                    elevator.direction = "idle"
-                    elevator.door_open = False
-                    elevator.door_timer = 0
-                    elevator.target_floors.clear()
-                    elevator.passengers.clear()
-                    # 全部电梯到0层才清空系统等待和统计
-                    if all(not elev.resetting and elev.current_floor == "0" for elev in self.elevators):
-                        for floor in self.floors:
-                            self.waiting_passengers[floor]["up"].clear()
-                            self.waiting_passengers[floor]["down"].clear()
-                        self.passenger_stats = {"total": 0, "boarded": 0, "wait_times": []}
-                continue
-            if elevator.door_open:
-                elevator.door_timer += 1
-                if elevator.door_timer >= 3:
-                    elevator.door_open = False
-                    elevator.door_timer = 0
-                continue
-            curr_idx = self.floors.index(elevator.current_floor)
-            if elevator.direction == "up" and curr_idx == 0:
-                if elevator.passengers or elevator.target_floors:
-                    elevator.direction = "down"
-                else:
-                    elevator.direction = "idle"
-            elif elevator.direction == "down" and curr_idx == len(self.floors) - 1:
-                if elevator.passengers or elevator.target_floors:
-                    elevator.direction = "up"
-                else:
-                    elevator.direction = "idle"
-            if elevator.direction == "idle" and elevator.target_floors:
-                next_floor = elevator.target_floors[0]
-                curr_idx = self.floors.index(elevator.current_floor)
-                target_idx = self.floors.index(next_floor)
-                if target_idx < curr_idx:
-                    elevator.direction = "up"
-                elif target_idx > curr_idx:
-                    elevator.direction = "down"
-                else:
-                    elevator.direction = "idle"
-            if not elevator.target_floors and not elevator.passengers:
-                elevator.direction = "idle"
-                elevator.idle_timer += 1
-                continue
-            else:
-                elevator.idle_timer = 0
-            move_next = False
-            if elevator.direction == "up":
-                next_idx = self.floors.index(elevator.current_floor) - 1
-                if next_idx >= 0:
-                    elevator.current_floor = self.floors[next_idx]
-                    elevator.current_y -= 40
-                    move_next = True
-            elif elevator.direction == "down":
-                next_idx = self.floors.index(elevator.current_floor) + 1
-                if next_idx < len(self.floors):
-                    elevator.current_floor = self.floors[next_idx]
-                    elevator.current_y += 40
-                    move_next = True
-            else:
-                move_next = False
-            stop = False
-            if elevator.passengers and any(p.target_floor == elevator.current_floor for p in elevator.passengers):
-                stop = True
-            if elevator.direction == "up" and self.waiting_passengers[elevator.current_floor]["up"]:
-                stop = True
-            if elevator.direction == "down" and self.waiting_passengers[elevator.current_floor]["down"]:
-                stop = True
-            curr_idx = self.floors.index(elevator.current_floor)
-            if curr_idx == 0 and (self.waiting_passengers[elevator.current_floor]["up"] or self.waiting_passengers[elevator.current_floor]["down"]):
-                stop = True
-            if curr_idx == len(self.floors) - 1 and (self.waiting_passengers[elevator.current_floor]["up"] or self.waiting_passengers[elevator.current_floor]["down"]):
-                stop = True
-            if stop:
-                elevator.door_open = True
-                self.handle_passengers(elevator)
-                self.update_direction_after_stop(elevator)
-                curr_idx = self.floors.index(elevator.current_floor)
-                if elevator.direction == "up" and curr_idx == 0:
-                    if elevator.passengers or elevator.target_floors:
-                        elevator.direction = "down"
-                    else:
-                        elevator.direction = "idle"
-                elif elevator.direction == "down" and curr_idx == len(self.floors) - 1:
-                    if elevator.passengers or elevator.target_floors:
-                        elevator.direction = "up"
-                    else:
-                        elevator.direction = "idle"
-            if elevator.direction == "up":
-                curr_idx = self.floors.index(elevator.current_floor)
-                targets = [self.floors.index(p.target_floor) for p in elevator.passengers if self.floors.index(p.target_floor) < curr_idx]
-                waiting_above = any(self.waiting_passengers[self.floors[i]]["up"]
-                                    for i in range(0, curr_idx))
-                if not targets and not waiting_above and not elevator.target_floors:
-                    elevator.direction = "idle"
-            elif elevator.direction == "down":
-                curr_idx = self.floors.index(elevator.current_floor)
-                targets = [self.floors.index(p.target_floor) for p in elevator.passengers if self.floors.index(p.target_floor) > curr_idx]
-                waiting_below = any(self.waiting_passengers[self.floors[i]]["down"]
-                                    for i in range(curr_idx + 1, len(self.floors)))
-                if not targets and not waiting_below and not elevator.target_floors:
-                    elevator.direction = "idle"
-
-    def handle_passengers(self, elevator):
-        current_floor = elevator.current_floor
-        leaving = [p for p in elevator.passengers if p.target_floor == current_floor]
-        for p in leaving:
-            elevator.passengers.remove(p)
-            self.passenger_stats["boarded"] += 1
-            self.passenger_stats["wait_times"].append(p.waiting_time)
-        available_space = elevator.max_capacity - len(elevator.passengers)
-        curr_idx = self.floors.index(current_floor)
-        if curr_idx == 0 or curr_idx == len(self.floors) - 1:
-            direction_list = ["up", "down"]
-        else:
-            direction_list = [elevator.direction]
-        for direction in direction_list:
-            if available_space <= 0:
-                break
-            queue = self.waiting_passengers[current_floor][direction]
-            to_board = min(available_space, len(queue))
-            for _ in range(to_board):
-                p = queue.popleft()
-                elevator.passengers.append(p)
-                available_space -= 1
-        for floor in self.floors:
-            for d in ["up", "down"]:
-                for p in self.waiting_passengers[floor][d]:
-                    p.waiting_time += 1
-
-    def update_direction_after_stop(self, elevator):
-        curr_idx = self.floors.index(elevator.current_floor)
-        remove_list = []
-        for key, reqdir in elevator.busy_for_call.items():
-            if key == (elevator.current_floor, reqdir):
-                remove_list.append(key)
-        for key in remove_list:
-            del elevator.busy_for_call[key]
-        if elevator.direction == "up":
-            targets = [self.floors.index(p.target_floor) for p in elevator.passengers if self.floors.index(p.target_floor) < curr_idx]
-            waiting_above = any(self.waiting_passengers[self.floors[i]]["up"]
-                                for i in range(0, curr_idx))
-            if targets or waiting_above or elevator.target_floors:
-                elevator.direction = "up"
-            else:
-                elevator.direction = "idle"
-        elif elevator.direction == "down":
-            targets = [self.floors.index(p.target_floor) for p in elevator.passengers if self.floors.index(p.target_floor) > curr_idx]
-            waiting_below = any(self.waiting_passengers[self.floors[i]]["down"]
-                                for i in range(curr_idx + 1, len(self.floors)))
-            if targets or waiting_below or elevator.target_floors:
-                elevator.direction = "down"
-            else:
-                elevator.direction = "idle"
+        return self.engine is not None and self.engine.is_peak_time()
 
     def update_stats(self):
         self.stats_text.config(state=tk.NORMAL)
         self.stats_text.delete(1.0, tk.END)
-        total_passengers = self.passenger_stats["total"]
-        boarded_passengers = self.passenger_stats["boarded"]
-        avg_wait_time = sum(self.passenger_stats["wait_times"]) / len(self.passenger_stats["wait_times"]) if self.passenger_stats["wait_times"] else 0
+        passenger_stats = self.engine.passenger_stats
+        total_passengers = passenger_stats["total"]
+        boarded_passengers = passenger_stats["boarded"]
+        wait = self.engine.trip_stats.wait.summary()
+        ride = self.engine.trip_stats.ride.summary()
         self.stats_text.insert(tk.END, f"总乘客数: {total_passengers}\n")
         self.stats_text.insert(tk.END, f"已运送乘客: {boarded_passengers}\n")
         self.stats_text.insert(tk.END, f"等待中乘客: {total_passengers - boarded_passengers}\n")
-        self.stats_text.insert(tk.END, f"平均等待时间: {avg_wait_time:.1f} 时间单位\n\n")
-        for i, elevator in enumerate(self.elevators):
+        self.stats_text.insert(tk.END, f"平均等待时间: {wait['avg']:.1f} 时间单位\n")
+        self.stats_text.insert(tk.END, f"等待 P50/P90/P99/最长: {wait['p50']:.0f}/{wait['p90']:.0f}/{wait['p99']:.0f}/{wait['max']:.0f}\n")
+        self.stats_text.insert(tk.END, f"平均乘梯时间: {ride['avg']:.1f} 时间单位（P90 {ride['p90']:.0f}，最长 {ride['max']:.0f}）\n\n")
+        for i, elevator in enumerate(self.engine.elevators):
             run_status = "空闲" if elevator.direction == "idle" else "运行"
             door_status = "开门" if elevator.door_open else "关门"
             self.stats_text.insert(
                 tk.END, 
-                f"电梯 {i+1}: {elevator.current_floor} 层, {run_status}, {len(elevator.passengers)}/{elevator.max_capacity} 人, {door_status}\n"
+                f"电梯 {i+1}: {self.engine.floor_label(elevator.current_floor)} 层, {run_status}, {len(elevator.passengers)}/{elevator.max_capacity} 人, {door_status}\n"
             )
         self.stats_text.config(state=tk.DISABLED)
-        self.update_chart()
 
-    def update_chart(self):
+    def setup_chart(self):
+        # 柱子、坐标轴和布局在每次开始仿真时建一次，之后只改柱高
+        self.ensure_chart()
         self.ax.clear()
-        floor_waiting_counts = {floor: len(self.waiting_passengers[floor]["up"]) + len(self.waiting_passengers[floor]["down"]) for floor in self.floors}
-        sorted_floors = sorted(self.floors, key=lambda x: (x[0] == 'B', int(x[1:]) if x[0] == 'B' else -int(x[1:]) if x != '0' else 0))
-        floors_labels = sorted_floors
-        counts = [floor_waiting_counts[floor] for floor in sorted_floors]
-        self.ax.bar(floors_labels, counts, color='#3b82f6')
+        self.chart.clear()
+        floors = self.engine.floors
+        self.chart_order = sorted(range(len(floors)), key=lambda i: (floors[i][0] == 'B', int(floors[i][1:]) if floors[i][0] == 'B' else -int(floors[i][1:]) if floors[i] != '0' else 0))
+        floors_labels = [floors[i] for i in self.chart_order]
+        self.chart_bars = self.chart.add(self.ax.bar(floors_labels, [0] * len(floors_labels), color='#3b82f6'))
+        self.ax.set_ylim(0, 5)
         self.ax.set_xlabel('楼层')
         self.ax.set_ylabel('等待人数')
         self.ax.set_title('各楼层等待人数')
         self.ax.tick_params(axis='x', rotation=45)
         self.fig.tight_layout()
-        self.canvas_chart.draw()
+        self.chart.redraw()
+
+    def update_chart(self):
+        counts = [self.engine.waiting_count(i) for i in self.chart_order]
+        for bar, count in zip(self.chart_bars, counts):
+            bar.set_height(count)
+        # 纵轴留出余量，只有超出或明显偏大时才调整范围并全量重绘
+        peak = max(counts, default=0)
+        top = self.ax.get_ylim()[1]
+        if peak > top or (top > 5 and peak * 4 < top):
+            self.ax.set_ylim(0, max(5, math.ceil(peak * 1.5)))
+            self.chart.redraw()
+        else:
+            self.chart.refresh()
+
+    def refresh_chart(self):
+        if not self.running:
+            return
+        if self.engine.ticks != self.charted_ticks:
+            self.charted_ticks = self.engine.ticks
+            self.update_chart()
+        self.chart_timer = self.master.after(self.chart_interval, self.refresh_chart)
 
     def update_canvas(self):
-        self.canvas.delete("all")
+        # 保留模式绘制：静态元素只在布局（画布尺寸、楼层/电梯数、配色）变化时重建，
+        # 之后每帧只对状态变化了的楼层和电梯调用 coords/itemconfig
+        floors = self.engine.floors
+        elevators = self.engine.elevators
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
-        floor_height = min(40, canvas_height / (len(self.floors) + 2))
-        elevator_width = min(60, canvas_width / (len(self.elevators) + 2))
-        for i, floor in enumerate(self.floors):
-            y_top = 40 + i * floor_height
-            y_center = y_top + floor_height / 2
+        layout = (canvas_width, canvas_height, len(floors), len(elevators), self.dark_mode)
+        if layout != self.canvas_layout:
+            self.build_canvas(floors, elevators, canvas_width, canvas_height)
+            self.canvas_layout = layout
+        for i, queues in enumerate(self.engine.waiting_passengers):
+            state = (len(queues["up"]), len(queues["down"]))
+            if state != self.floor_state[i]:
+                self.floor_state[i] = state
+                self.update_floor_items(i, *state)
+        for i, elevator in enumerate(elevators):
+            state = (elevator.current_floor, elevator.direction, elevator.door_open, len(elevator.passengers))
+            if state != self.elevator_state[i]:
+                self.elevator_state[i] = state
+                self.update_elevator_items(i, elevator)
+
+    def build_canvas(self, floors, elevators, canvas_width, canvas_height):
+        self.canvas.delete("all")
+        self.floor_height = floor_height = min(40, canvas_height / (len(floors) + 2))
+        self.elevator_width = elevator_width = min(60, canvas_width / (len(elevators) + 2))
+        self.floor_items = []
+        for i, floor in enumerate(floors):
+            y_center = 40 + i * floor_height + floor_height / 2
             self.canvas.create_line(0, y_center, canvas_width, y_center, fill=self.colors["grid_line"])
             self.canvas.create_text(20, y_center, text=floor, fill=self.colors["fg_text"], font=("Arial", 10, "bold"))
-            up_passengers = self.waiting_passengers[floor]["up"]
-            down_passengers = self.waiting_passengers[floor]["down"]
-            if up_passengers:
-                self.canvas.create_text(40, y_center, text=str(len(up_passengers)), fill=self.colors["passenger_wait"], font=("Arial", 10, "bold"))
-                self.canvas.create_text(50, y_center, text="↑", fill=self.colors["elevator_up"], font=("Arial", 10, "bold"))
-            if down_passengers:
-                self.canvas.create_text(70, y_center, text=str(len(down_passengers)), fill=self.colors["passenger_wait"], font=("Arial", 10, "bold"))
-                self.canvas.create_text(80, y_center, text="↓", fill=self.colors["elevator_down"], font=("Arial", 10, "bold"))
-        for i, elevator in enumerate(self.elevators):
+            # 候梯人数和方向箭头，无人等待时隐藏
+            self.floor_items.append((
+                self.canvas.create_text(40, y_center, text="", fill=self.colors["passenger_wait"], font=("Arial", 10, "bold"), state=tk.HIDDEN),
+                self.canvas.create_text(50, y_center, text="↑", fill=self.colors["elevator_up"], font=("Arial", 10, "bold"), state=tk.HIDDEN),
+                self.canvas.create_text(70, y_center, text="", fill=self.colors["passenger_wait"], font=("Arial", 10, "bold"), state=tk.HIDDEN),
+                self.canvas.create_text(80, y_center, text="↓", fill=self.colors["elevator_down"], font=("Arial", 10, "bold"), state=tk.HIDDEN),
+            ))
+        self.elevator_items = []
+        for i in range(len(elevators)):
             x = 100 + i * (elevator_width + 20)
-            self.canvas.create_rectangle(x, 40, x + elevator_width, 40 + len(self.floors) * floor_height,
+            self.canvas.create_rectangle(x, 40, x + elevator_width, 40 + len(floors) * floor_height,
                                         fill=self.colors["bg_main"], outline=self.colors["grid_line"])
-            floor_index = self.floors.index(elevator.current_floor)
-            y_top = 40 + floor_index * floor_height
-            y_center = y_top + floor_height / 2
-            elevator_color = self.colors["elevator_idle"]
-            if elevator.direction == "up":
-                elevator_color = self.colors["elevator_up"]
-            elif elevator.direction == "down":
-                elevator_color = self.colors["elevator_down"]
-            self.canvas.create_rectangle(
-                x, y_center - floor_height/2, x + elevator_width, y_center + floor_height/2,
-                fill=elevator_color, outline=self.colors["shadow"], width=2
-            )
-            door_width = elevator_width / 2
-            if elevator.door_open:
-                self.canvas.create_rectangle(x, y_center - floor_height/2, x + door_width - 5, y_center + floor_height/2,
-                                            fill=self.colors["bg_main"], outline=self.colors["shadow"])
-                self.canvas.create_rectangle(x + door_width + 5, y_center - floor_height/2, x + elevator_width, y_center + floor_height/2,
-                                            fill=self.colors["bg_main"], outline=self.colors["shadow"])
-            else:
-                self.canvas.create_line(x + door_width, y_center - floor_height/2, x + door_width, y_center + floor_height/2,
-                                       fill=self.colors["shadow"], width=2)
-            self.canvas.create_text(x + elevator_width/2, y_center, text=str(len(elevator.passengers)),
-                                   fill=self.colors["fg_text"], font=("Arial", 12, "bold"))
-            status_text = f"电梯 {elevator.eid+1}"
-            direction_symbol = elevator.get_direction_symbol()
-            status_text += f" {direction_symbol}"
-            self.canvas.create_text(x + elevator_width/2, y_center - floor_height/2 - 10,
-                                   text=status_text, fill=self.colors["fg_text"], font=("Arial", 9, "bold"))
-            self.canvas.create_text(x + elevator_width/2, y_center + floor_height/2 + 10,
-                                   text=elevator.current_floor, fill=self.colors["fg_text"], font=("Arial", 9, "bold"))
+            # 轿厢相关元素先建在原点，首帧由 update_elevator_items 移到实际位置
+            self.elevator_items.append({
+                "x": x,
+                "car": self.canvas.create_rectangle(0, 0, 0, 0, outline=self.colors["shadow"], width=2),
+                "door_left": self.canvas.create_rectangle(0, 0, 0, 0, fill=self.colors["bg_main"], outline=self.colors["shadow"], state=tk.HIDDEN),
+                "door_right": self.canvas.create_rectangle(0, 0, 0, 0, fill=self.colors["bg_main"], outline=self.colors["shadow"], state=tk.HIDDEN),
+                "door_line": self.canvas.create_line(0, 0, 0, 0, fill=self.colors["shadow"], width=2),
+                "count": self.canvas.create_text(0, 0, fill=self.colors["fg_text"], font=("Arial", 12, "bold")),
+                "status": self.canvas.create_text(0, 0, fill=self.colors["fg_text"], font=("Arial", 9, "bold")),
+                "floor": self.canvas.create_text(0, 0, fill=self.colors["fg_text"], font=("Arial", 9, "bold")),
+            })
+        self.floor_state = [None] * len(floors)
+        self.elevator_state = [None] * len(elevators)
+
+    def update_floor_items(self, i, n_up, n_down):
+        up_count, up_arrow, down_count, down_arrow = self.floor_items[i]
+        up_state = tk.NORMAL if n_up else tk.HIDDEN
+        down_state = tk.NORMAL if n_down else tk.HIDDEN
+        self.canvas.itemconfig(up_count, text=str(n_up), state=up_state)
+        self.canvas.itemconfig(up_arrow, state=up_state)
+        self.canvas.itemconfig(down_count, text=str(n_down), state=down_state)
+        self.canvas.itemconfig(down_arrow, state=down_state)
+
+    def update_elevator_items(self, i, elevator):
+        items = self.elevator_items[i]
+        x = items["x"]
+        floor_height = self.floor_height
+        elevator_width = self.elevator_width
+        y_top = 40 + elevator.current_floor * floor_height
+        y_bottom = y_top + floor_height
+        y_center = y_top + floor_height / 2
+        elevator_color = self.colors["elevator_idle"]
+        if elevator.direction == "up":
+            elevator_color = self.colors["elevator_up"]
+        elif elevator.direction == "down":
+            elevator_color = self.colors["elevator_down"]
+        self.canvas.coords(items["car"], x, y_top, x + elevator_width, y_bottom)
+        self.canvas.itemconfig(items["car"], fill=elevator_color)
+        door_width = elevator_width / 2
+        if elevator.door_open:
+            self.canvas.coords(items["door_left"], x, y_top, x + door_width - 5, y_bottom)
+            self.canvas.coords(items["door_right"], x + door_width + 5, y_top, x + elevator_width, y_bottom)
+            self.canvas.itemconfig(items["door_left"], state=tk.NORMAL)
+            self.canvas.itemconfig(items["door_right"], state=tk.NORMAL)
+            self.canvas.itemconfig(items["door_line"], state=tk.HIDDEN)
+        else:
+            self.canvas.coords(items["door_line"], x + door_width, y_top, x + door_width, y_bottom)
+            self.canvas.itemconfig(items["door_left"], state=tk.HIDDEN)
+            self.canvas.itemconfig(items["door_right"], state=tk.HIDDEN)
+            self.canvas.itemconfig(items["door_line"], state=tk.NORMAL)
+        self.canvas.coords(items["count"], x + elevator_width / 2, y_center)
+        self.canvas.itemconfig(items["count"], text=str(len(elevator.passengers)))
+        self.canvas.coords(items["status"], x + elevator_width / 2, y_top - 10)
+        self.canvas.itemconfig(items["status"], text=f"电梯 {elevator.eid+1} {elevator.get_direction_symbol()}")
+        self.canvas.coords(items["floor"], x + elevator_width / 2, y_bottom + 10)
+        self.canvas.itemconfig(items["floor"], text=self.engine.floors[elevator.current_floor])
 
     def update_simulation(self):
+        # 仿真节拍：只推进引擎，不做任何绘制
         if not self.running:
             return
         if self.use_real_time:
             current_time = self.get_current_hour_minute()
             if current_time != self.last_real_time_update:
-                self.time = current_time
+                self.engine.time = current_time
                 self.last_real_time_update = current_time
-            self.status_label.config(text="运行中（真实时间）")
+            self.engine.tick()
         else:
-            self.time = (self.time + 1) % 1440
-            self.status_label.config(text="运行中（仿真时间）")
-        self.update_time_display()
-        self.generate_passengers()
-        self.assign_elevators()
-        self.move_elevators()
-        self.update_canvas()
-        self.update_stats()
-        self.timer = self.master.after(500, self.update_simulation)
+            self.engine.step()
+        self.time = self.engine.time
+        self.timer = self.master.after(self.sim_interval, self.update_simulation)
+
+    def render_frame(self):
+        # 绘制节拍：按自己的帧率采样引擎状态，引擎未推进时跳过重绘
+        if not self.running:
+            return
+        if self.engine.ticks != self.rendered_ticks:
+            self.rendered_ticks = self.engine.ticks
+            self.status_label.config(text="运行中（真实时间）" if self.use_real_time else "运行中（仿真时间）")
+            self.update_time_display()
+            self.update_canvas()
+            self.update_stats()
+        self.frame_timer = self.master.after(self.frame_interval, self.render_frame)
 
     def update_time_display(self):
         if self.use_real_time:
@@ -750,16 +538,7 @@ class ElevatorSystemGUI:
             self.update_canvas()
 
     def emergency_reset(self):
-        for elevator in self.elevators:
-            elevator.resetting = True
-            elevator.door_open = False
-            elevator.door_timer = 0
-            if self.floors.index(elevator.current_floor) > self.floors.index("0"):
-                elevator.direction = "down"
-            elif self.floors.index(elevator.current_floor) < self.floors.index("0"):
-                elevator.direction = "up"
-            else:
-                elevator.direction = "idle"
+        self.engine.emergency_reset()
 
 if __name__ == "__main__":
     root = tk.Tk()
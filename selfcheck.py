@@ -0,0 +1,180 @@
+"""回归自检：逐项运行下列检查，全部通过时退出码为 0
+
+    python selfcheck.py [检查名 ...]
+
+    cli    elevator_cli 在高负载配置下（会出现满载）的标准输出能被 json 解析，engine 和 qt 的候梯统计覆盖全部完成行程
+    modes  Building 的事件驱动模式与逐帧模式（update，dt = 1/60 秒）回放同一条轨迹，完成行程数和平均等待时间一致
+    trace  按 elevator13-4 楼层约定记录的带同行人数轨迹，在 SimulationModel 中按人数回放
+    assign min_cost_assignment 在随机长方形矩阵（行多于列、列多于行，含 1e12 的不可行配对）上与穷举结果的总代价一致；
+           Building 开启定期改派（reoptimize_assignments）后，同一条轨迹的完成行程数不减少、平均等待不变长
+    parking 各停靠策略下，空闲电梯（门已关、无人、无任务）始终停在自己可停靠的楼层（含地下层和高区直达梯）
+"""
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import elevator_cli
+from arrival_trace import load_trace, qt_floors, record_building_trace, record_qt_trace
+from assignment import min_cost_assignment
+from building_model import Building, create_default_elevators
+from elevator13_model import SimulationModel
+from parking import PARKING_POLICIES
+
+
+def check_cli():
+    configs = [
+        ({"family": "building", "arrival_rate": 0.3, "seed": 1}, 3600),
+        ({"family": "qt", "seed": 1}, 3600),
+        ({"family": "engine", "seed": 1}, 120),
+    ]
+    stdin = sys.stdin
+    for config, duration in configs:
+        out = io.StringIO()
+        # main() 从文件或标准输入读配置，这里换成内存里的标准输入
+        sys.stdin = io.StringIO(json.dumps(config))
+        try:
+            with redirect_stdout(out):
+                elevator_cli.main(["-", "--duration", str(duration)])
+        finally:
+            sys.stdin = stdin
+        try:
+            result = json.loads(out.getvalue())
+        except json.JSONDecodeError as exc:
+            raise AssertionError(f"{config['family']} 输出不是 JSON: {exc}")
+        assert result["family"] == config["family"], result["family"]
+        summary = result["summary"]
+        if config["family"] in ("engine", "qt"):
+            assert summary["wait"]["count"] == summary["completed_trips"], \
+                f"{config['family']} 候梯统计 {summary['wait']['count']} 条 / 完成行程 {summary['completed_trips']}"
+
+
+def check_modes(duration=1800, dt=1 / 60):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "modes.trace")
+        record_building_trace(path, 20, duration, 0.1, seed=3)
+        results = []
+        for frames in (False, True):
+            building = Building(20)
+            for elevator in create_default_elevators(20):
+                building.add_elevator(elevator)
+            building.load_arrival_trace(load_trace(path))
+            if frames:
+                for _ in range(round(duration / dt)):
+                    building.generate_random_passenger(dt)
+                    building.update(dt)
+                stats = building.get_statistics()
+            else:
+                stats = building.run_events(duration)
+            results.append(stats)
+    events, frames = results
+    assert abs(frames["completed_trips"] - events["completed_trips"]) <= 0.05 * events["completed_trips"], \
+        f"完成行程数 事件 {events['completed_trips']} / 逐帧 {frames['completed_trips']}"
+    assert abs(frames["avg_waiting_time"] - events["avg_waiting_time"]) <= 0.25 * events["avg_waiting_time"], \
+        f"平均等待 事件 {events['avg_waiting_time']:.1f}s / 逐帧 {frames['avg_waiting_time']:.1f}s"
+
+
+def check_trace(total_floors=20, basement_floors=2, n_steps=7200):
+    floors = qt_floors(total_floors, basement_floors)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "qt.trace")
+        record_qt_trace(path, total_floors, basement_floors, n_steps, seed=5)
+        trace = load_trace(path)
+        assert trace.group_sizes is not None, "轨迹缺少同行人数列"
+        assert trace.group_sizes.max() > 1, "没有多人同行的记录"
+        assert set(trace.origins) | set(trace.destinations) <= set(floors), "楼层号不符合 elevator13-4 的约定"
+        assert (trace.origins != trace.destinations).all(), "起止楼层相同"
+        expected = int(trace.group_sizes.sum())
+
+        model = SimulationModel()
+        model.load_arrival_trace(trace)
+        model.setup([(10, floors, 1)] * 3, total_floors, basement_floors, 1, 0)
+        for _ in range(n_steps):
+            model.step()
+    assert len(model.passengers) == expected, f"回放 {len(model.passengers)} 人 / 轨迹 {expected} 人"
+
+
+def brute_force_assignment(cost):
+    """逐一枚举较短一边到较长一边的单射，返回最小总代价"""
+    n, m = cost.shape
+    if n > m:
+        return brute_force_assignment(cost.T)
+    return min(sum(cost[i, j] for i, j in enumerate(columns)) for columns in itertools.permutations(range(m), n))
+
+
+def check_assign(trials=300, unreachable=1e12):
+    rng = np.random.default_rng(7)
+    for trial in range(trials):
+        n, m = rng.integers(1, 7, 2)
+        cost = rng.integers(0, 50, (n, m)).astype(float)
+        cost[rng.random((n, m)) < 0.3] = unreachable
+        pairs = min_cost_assignment(cost)
+        rows = [i for i, _ in pairs]
+        columns = [j for _, j in pairs]
+        assert len(pairs) == min(n, m), f"第 {trial} 个 {n}×{m} 矩阵配了 {len(pairs)} 对"
+        assert rows == sorted(set(rows)) and len(set(columns)) == len(columns), f"第 {trial} 个 {n}×{m} 矩阵有重复配对"
+        total = sum(cost[i, j] for i, j in pairs)
+        best = brute_force_assignment(cost)
+        assert total == best, f"第 {trial} 个 {n}×{m} 矩阵总代价 {total} / 穷举 {best}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "assign.trace")
+        record_building_trace(path, 20, 1800, 0.1, seed=3)
+        results = []
+        for reassign_interval in (None, 1):
+            building = Building(20)
+            for elevator in create_default_elevators(20):
+                building.add_elevator(elevator)
+            building.reassign_interval = reassign_interval
+            building.load_arrival_trace(load_trace(path))
+            results.append(building.run_events(1800))
+    once, batched = results
+    assert batched["completed_trips"] >= 0.95 * once["completed_trips"], \
+        f"完成行程数 一次指派 {once['completed_trips']} / 改派 {batched['completed_trips']}"
+    assert batched["avg_waiting_time"] <= 1.1 * once["avg_waiting_time"], \
+        f"平均等待 一次指派 {once['avg_waiting_time']:.1f}s / 改派 {batched['avg_waiting_time']:.1f}s"
+
+
+def check_parking(n_steps=3000):
+    floors = qt_floors(20, 2)
+    express = [1] + list(range(10, 21))
+    for name, policy in PARKING_POLICIES.items():
+        random.seed(2)
+        model = SimulationModel()
+        model.parking = policy()
+        model.setup([(10, floors, 1), (10, floors, 1), (10, express, 1)], 20, 2, 1, 5)
+        for _ in range(n_steps):
+            model.step()
+            for elevator in model.elevators:
+                if elevator.door_open or elevator.passengers or elevator.destination_floors:
+                    continue
+                assert elevator.current_floor in elevator.allowed_floors, \
+                    f"{name}: 电梯{elevator.id} 空闲停在 {elevator.current_floor}F（第 {model.simulation_time} 步）"
+
+
+CHECKS = {"cli": check_cli, "modes": check_modes, "trace": check_trace, "assign": check_assign,
+          "parking": check_parking}
+
+
+def main(argv=None):
+    names = (argv if argv is not None else sys.argv[1:]) or list(CHECKS)
+    failed = 0
+    for name in names:
+        try:
+            CHECKS[name]()
+        except AssertionError as exc:
+            failed += 1
+            print(f"{name:<10}失败  {exc}")
+        else:
+            print(f"{name:<10}通过")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""流式统计：每条样本 O(1) 更新、内存固定，不随运行时长增长
+
+StreamingStats 同时维护运行均值/方差（Welford 算法）和对数分桶直方图（HDR 风格），
+可随时给出均值、标准差、最大值和任意分位数；分位数取所在桶的代表值，相对误差约 1/sub_buckets：
+
+    waits = StreamingStats()
+    waits.add(12.5)
+    waits.quantile(0.99)
+
+TripStats 把一次行程的等待时间和乘梯时间分别计入两个 StreamingStats。
+"""
+import math
+from typing import Dict
+
+
+class StreamingStats:
+    def __init__(self, resolution: float = 0.01, sub_buckets: int = 128):
+        # resolution 以下的差别不区分；sub_buckets 必须是 2 的幂，越大分位数越精确
+        if sub_buckets < 2 or sub_buckets & (sub_buckets - 1):
+            raise ValueError("sub_buckets 必须是 2 的幂")
+        self.resolution = resolution
+        self.sub_buckets = sub_buckets
+        self._linear_exp = sub_buckets.bit_length()  # frexp 指数不超过该值时落在线性区
+        self.buckets: Dict[int, int] = {}
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets.clear()
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        index = self._bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def _bucket_index(self, value):
+        x = max(value, 0.0) / self.resolution
+        if x < self.sub_buckets:
+            return int(x)
+        # x = m * 2**e，m ∈ [0.5, 1)；每个 2 倍区间再均分为 sub_buckets/2 个桶
+        m, e = math.frexp(x)
+        half = self.sub_buckets // 2
+        return self.sub_buckets + (e - self._linear_exp) * half + int((m - 0.5) * self.sub_buckets)
+
+    def _bucket_bounds(self, index):
+        if index < self.sub_buckets:
+            low, high = index, index + 1
+        else:
+            half = self.sub_buckets // 2
+            e = (index - self.sub_buckets) // half + self._linear_exp
+            k = (index - self.sub_buckets) % half
+            low = (0.5 + k / self.sub_buckets) * 2.0 ** e
+            high = (0.5 + (k + 1) / self.sub_buckets) * 2.0 ** e
+        return low * self.resolution, high * self.resolution
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> float:
+        """第 q 分位数（0 ≤ q ≤ 1）的近似值，无样本时返回 0"""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                low, high = self._bucket_bounds(index)
+                # 线性区的桶宽就是 resolution，取下界使按 resolution 取整的数据得到精确值
+                value = low if index < self.sub_buckets else (low + high) / 2
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0, "avg": 0.0, "std": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0,
+                    "p99": 0.0, "max": 0.0}
+        return {
+            "count": self.count,
+            "avg": self.mean,
+            "std": self.std,
+            "p50": self.quantile(0.50),
+            "p90": self.quantile(0.90),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class TripStats:
+    """已完成行程的等待时间和乘梯时间"""
+
+    def __init__(self, resolution: float = 0.01):
+        self.wait = StreamingStats(resolution)
+        self.ride = StreamingStats(resolution)
+
+    @property
+    def count(self) -> int:
+        return self.wait.count
+
+    def record(self, wait: float, ride: float):
+        self.wait.add(wait)
+        self.ride.add(ride)
+
+    def clear(self):
+        self.wait.clear()
+        self.ride.clear()
@@ -0,0 +1,149 @@
+"""参数扫描：在进程池中无界面批量运行 ElevatorEngine，每次运行输出一行汇总
+
+    python sweep.py --elevators 3 4 6 --capacity 10 13 --floors 10:2 30:3 \\
+        --peaks 07:00-09:00,17:00-19:00 08:00-10:00,18:00-21:00 --replications 3 -o result.csv
+
+网格各维度做笛卡尔积，每个组合按 --replications 重复运行；第 r 次重复的随机种子为 --seed + r，
+各组合共用同一组种子，结果可复现，输出行的顺序与网格顺序一致，与进程完成先后无关。
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from elevator_engine import ElevatorEngine, build_floors, parse_peak_periods
+
+SUMMARY_FIELDS = ["n_elevators", "capacity", "n_up", "n_down", "elevator_floors", "peak_morning",
+                  "peak_evening", "seed", "ticks", "passengers", "boarded", "avg_wait", "p50_wait",
+                  "p90_wait", "p95_wait", "p99_wait", "max_wait", "avg_ride", "p90_ride",
+                  "throughput_per_hour", "max_waiting"]
+
+
+def expand_grid(elevators: Sequence[int], capacities: Sequence[int], floors: Sequence[str],
+                peaks: Sequence[str], elevator_floors: Sequence[str] = ("all",),
+                replications: int = 1, seed: int = 0, ticks: int = 1440) -> List[Dict]:
+    """把各维度取值展开为运行配置列表
+
+    floors 形如 "10:2"（地上10层、地下2层）；peaks 形如 "07:00-09:00,17:00-19:00"；
+    elevator_floors 为 "all" 或各电梯停靠楼层名列表的 JSON，如 '[["F1","F5"],["B1","0","F1"]]'，
+    楼层名须是该楼层范围内的 F1…Fn、0、B1…，否则抛出 ValueError。
+    """
+    configs = []
+    for n_elevators, capacity, floor_spec, peak_spec, stops, rep in itertools.product(
+            elevators, capacities, floors, peaks, elevator_floors, range(replications)):
+        n_up, n_down = (int(x) for x in floor_spec.split(":"))
+        if stops != "all":
+            check_elevator_floors(json.loads(stops), build_floors(n_up, n_down))
+        morning, evening = peak_spec.split(",")
+        configs.append({
+            "n_elevators": n_elevators,
+            "capacity": capacity,
+            "n_up": n_up,
+            "n_down": n_down,
+            "elevator_floors": stops,
+            "peak_morning": morning.strip(),
+            "peak_evening": evening.strip(),
+            "seed": seed + rep,
+            "ticks": ticks,
+        })
+    return configs
+
+
+def check_elevator_floors(elevator_floors: Sequence[Sequence[str]], floors: Sequence[str]):
+    """停靠楼层名不在 floors 中时抛出 ValueError，避免带着配置错误的运行结果进入汇总"""
+    known = set(floors)
+    for i, stops in enumerate(elevator_floors):
+        unknown = [f for f in stops if f not in known]
+        if unknown:
+            raise ValueError(f"电梯{i + 1}的停靠楼层 {', '.join(map(str, unknown))} 不存在"
+                             f"（可选 {', '.join(floors)}）")
+
+
+def run_config(config: Dict) -> Dict:
+    """运行单个配置并返回汇总行（在工作进程中执行）"""
+    stops = config["elevator_floors"]
+    engine = ElevatorEngine(
+        n_elevators=config["n_elevators"],
+        n_up=config["n_up"],
+        n_down=config["n_down"],
+        capacity=config["capacity"],
+        elevator_floors=None if stops == "all" else json.loads(stops),
+        peak_periods=parse_peak_periods(config["peak_morning"], config["peak_evening"]),
+        seed=config["seed"],
+    )
+    stats = engine.passenger_stats
+    max_waiting = 0
+    for _ in range(config["ticks"]):
+        engine.step()
+        max_waiting = max(max_waiting, stats["total"] - stats["boarded"])
+
+    wait = engine.trip_stats.wait.summary()
+    ride = engine.trip_stats.ride.summary()
+    row = dict(config)
+    row.update({
+        "passengers": stats["total"],
+        "boarded": stats["boarded"],
+        "avg_wait": round(wait["avg"], 3),
+        "p50_wait": wait["p50"],
+        "p90_wait": wait["p90"],
+        "p95_wait": wait["p95"],
+        "p99_wait": wait["p99"],
+        "max_wait": wait["max"],
+        "avg_ride": round(ride["avg"], 3),
+        "p90_ride": ride["p90"],
+        "throughput_per_hour": round(stats["boarded"] * 60 / config["ticks"], 3) if config["ticks"] else 0,
+        "max_waiting": max_waiting,
+    })
+    return row
+
+
+def run_sweep(configs: Iterable[Dict], workers: Optional[int] = None) -> Iterable[Dict]:
+    """在进程池中运行全部配置，按输入顺序逐行产出结果"""
+    configs = list(configs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(run_config, configs)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap(run_config, configs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电梯调度参数扫描（无界面，多进程）")
+    parser.add_argument("--elevators", type=int, nargs="+", default=[3], help="电梯数量")
+    parser.add_argument("--capacity", type=int, nargs="+", default=[13], help="电梯容量")
+    parser.add_argument("--floors", nargs="+", default=["10:2"], help="楼层范围，地上:地下，如 10:2")
+    parser.add_argument("--peaks", nargs="+", default=["07:00-09:00,18:00-21:00"],
+                        help="早晚高峰，如 07:00-09:00,18:00-21:00")
+    parser.add_argument("--elevator-floors", nargs="+", default=["all"],
+                        help='各电梯停靠楼层 JSON，如 \'[["F1","F5"],["B1","0","F1"]]\'，默认 all')
+    parser.add_argument("--ticks", type=int, default=1440, help="每次运行的时间单位数（默认一天）")
+    parser.add_argument("--replications", type=int, default=1, help="每个组合重复次数")
+    parser.add_argument("--seed", type=int, default=0, help="基准随机种子")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认使用全部核心")
+    parser.add_argument("-o", "--output", help="输出 CSV 文件，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    try:
+        configs = expand_grid(args.elevators, args.capacity, args.floors, args.peaks,
+                              args.elevator_floors, args.replications, args.seed, args.ticks)
+    except ValueError as exc:
+        parser.error(str(exc))
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for row in run_sweep(configs, args.workers):
+            writer.writerow(row)
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
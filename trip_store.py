@@ -0,0 +1,78 @@
+"""已完成行程的列式存储
+
+每完成一次行程追加一行（起始楼层、目标楼层、产生/上梯/下梯时刻、电梯编号），
+各列为按倍增扩容的 NumPy 数组，每条行程约 36 字节；统计量用向量化运算求得，不再逐个遍历乘客对象：
+
+    trips = TripStore()
+    trips.append(origin, destination, spawn_time, board_time, alight_time, elevator_id)
+    trips.wait_times().mean()
+"""
+from typing import Dict
+
+import numpy as np
+
+FIELDS = (
+    ("origin", np.int32),
+    ("destination", np.int32),
+    ("spawn_time", np.float64),
+    ("board_time", np.float64),
+    ("alight_time", np.float64),
+    ("elevator_id", np.int32),
+)
+
+
+class TripStore:
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._columns = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in FIELDS}
+
+    def __len__(self):
+        return self._size
+
+    def append(self, origin, destination, spawn_time, board_time, alight_time, elevator_id):
+        if self._size == len(self._columns["origin"]):
+            self._grow()
+        i = self._size
+        columns = self._columns
+        columns["origin"][i] = origin
+        columns["destination"][i] = destination
+        columns["spawn_time"][i] = spawn_time
+        columns["board_time"][i] = board_time
+        columns["alight_time"][i] = alight_time
+        columns["elevator_id"][i] = elevator_id
+        self._size = i + 1
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.empty(len(column) * 2, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def clear(self):
+        self._size = 0
+
+    def column(self, name: str) -> np.ndarray:
+        """返回某一列已写入部分的视图（不复制）"""
+        return self._columns[name][:self._size]
+
+    def wait_times(self) -> np.ndarray:
+        return self.column("board_time") - self.column("spawn_time")
+
+    def ride_times(self) -> np.ndarray:
+        return self.column("alight_time") - self.column("board_time")
+
+    def summary(self) -> Dict[str, float]:
+        """行程数及等待/乘梯时间的均值、95 分位和最大值"""
+        if not self._size:
+            return {"trips": 0, "avg_wait": 0.0, "p95_wait": 0.0, "max_wait": 0.0,
+                    "avg_ride": 0.0, "p95_ride": 0.0, "max_ride": 0.0}
+        waits, rides = self.wait_times(), self.ride_times()
+        return {
+            "trips": self._size,
+            "avg_wait": float(waits.mean()),
+            "p95_wait": float(np.percentile(waits, 95)),
+            "max_wait": float(waits.max()),
+            "avg_ride": float(rides.mean()),
+            "p95_ride": float(np.percentile(rides, 95)),
+            "max_ride": float(rides.max()),
+        }
@@ -0,0 +1,68 @@
+"""按电梯可停靠楼层筛选候选电梯：楼层的电梯位集合、(起点, 终点) 路线表和空中大堂换乘
+
+    zones = ZoneMap([elevator.accessible_floors for elevator in elevators])
+    zones.at(floor)                      # 停靠该层的电梯位集合，第 k 位为第 k 部电梯
+    zones.route(origin, destination)     # (第一程可乘的电梯位集合, 换乘楼层；可直达时为 None)
+    for k in members(mask): ...
+
+派梯只用这两张表做候选电梯的过滤，不按分区划分电梯的职责：能直达的电梯都参与比较。
+没有电梯能直达的 (起点, 终点) 在建表时选一个换乘楼层：
+起点和终点各有电梯停靠，且总行程层数最少，层数相同时取停靠电梯更多的楼层（通常是空中大堂）。
+需要换乘两次及以上的行程不支持，route() 返回 (0, None)。
+路线表在构造时一次算好，派梯时只做查表和按位与，不再逐部电梯扫描楼层列表；电梯的可停靠楼层改变后需重建。
+"""
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+
+def members(mask: int) -> Iterator[int]:
+    """按从低到高的顺序产出位集合中的电梯下标"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class ZoneMap:
+    def __init__(self, elevator_floors: Sequence[Sequence[int]]):
+        self.floor_masks: Dict[int, int] = {}
+        for k, floors in enumerate(elevator_floors):
+            for floor in floors:
+                self.floor_masks[floor] = self.floor_masks.get(floor, 0) | 1 << k
+
+        floors = sorted(self.floor_masks)
+        self.routes: Dict[Tuple[int, int], Tuple[int, Optional[int]]] = {}
+        for origin in floors:
+            origin_mask = self.floor_masks[origin]
+            # 从起点出发一程可到的楼层
+            reachable = [t for t in floors if t != origin and origin_mask & self.floor_masks[t]]
+            for destination in floors:
+                if destination == origin:
+                    continue
+                direct = origin_mask & self.floor_masks[destination]
+                if direct:
+                    self.routes[origin, destination] = (direct, None)
+                    continue
+                destination_mask = self.floor_masks[destination]
+                best, best_key = None, None
+                for transfer in reachable:
+                    if not self.floor_masks[transfer] & destination_mask:
+                        continue
+                    key = (abs(transfer - origin) + abs(destination - transfer),
+                           -bin(self.floor_masks[transfer]).count("1"), abs(transfer - origin))
+                    if best_key is None or key < best_key:
+                        best, best_key = transfer, key
+                if best is not None:
+                    self.routes[origin, destination] = (origin_mask & self.floor_masks[best], best)
+
+    def at(self, floor: int) -> int:
+        return self.floor_masks.get(floor, 0)
+
+    def serves(self, k: int, floor: int) -> bool:
+        return bool(self.floor_masks.get(floor, 0) >> k & 1)
+
+    def direct(self, origin: int, destination: int) -> int:
+        """可从 origin 直达 destination 的电梯位集合"""
+        return self.floor_masks.get(origin, 0) & self.floor_masks.get(destination, 0)
+
+    def route(self, origin: int, destination: int) -> Tuple[int, Optional[int]]:
+        return self.routes.get((origin, destination), (0, None))